@@ -0,0 +1,68 @@
+import argparse
+from typing import Optional
+
+from samples.benchmarks.benchmark_utils import (
+    BenchmarkResult,
+    BenchmarkRunner,
+    add_benchmark_arguments,
+    report_benchmark_results
+)
+from samples.benchmarks.synthetic_data import create_line_items
+from samples.evaluation.accuracy_evaluator import AccuracyEvaluator
+
+SUITE = "accuracy"
+ROWS = [10, 100, 500]
+
+
+def run_accuracy_benchmarks(
+    rows: list[int] = ROWS,
+    max_rounds: int = 10,
+    max_time: float = 2.0
+) -> list[BenchmarkResult]:
+    """
+    Runs the accuracy evaluation benchmarks over synthetic invoices with line item tables of increasing size.
+
+    Each table is evaluated with and without match keys, using both greedy and optimal list matching.
+
+    Args:
+        rows: The line item counts of the synthetic invoices.
+        max_rounds: The maximum number of timed rounds of each benchmark.
+        max_time: The number of seconds after which no further rounds of a benchmark are started.
+
+    Returns:
+        list[BenchmarkResult]: The results of each benchmark at each scale.
+    """
+
+    benchmark = BenchmarkRunner(max_rounds, max_time)
+
+    for row_count in rows:
+        expected, actual = create_line_items(row_count)
+
+        for list_matching in ("greedy", "optimal"):
+            for match_keys in ([], ["product_code", "description"]):
+                def evaluate():
+                    return AccuracyEvaluator(
+                        match_keys=match_keys, list_matching=list_matching).evaluate(expected, actual)
+
+                benchmark("evaluate", evaluate,
+                          rows=row_count, list_matching=list_matching, match_keys=len(match_keys))
+
+    return benchmark.results
+
+
+def main(args: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Runs the accuracy evaluation benchmarks, stores the results, and compares them with a previous run.")
+    parser.add_argument("--rows", type=int, nargs="+", default=ROWS,
+                        help="The line item counts of the synthetic invoices.")
+    add_benchmark_arguments(parser)
+    args = parser.parse_args(args)
+
+    results = run_accuracy_benchmarks(args.rows, args.max_rounds, args.max_time)
+
+    report_benchmark_results(
+        SUITE, results, args.results_dir, args.compare, args.threshold, save=not args.no_save)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from samples.utils.storage_utils import create_json_file
+
+
+class BenchmarkResult:
+    """
+    A class representing the timings of a benchmark at a given scale.
+
+    Attributes:
+        name (str): The name of the benchmark, e.g., 'extract_lines'.
+        params (dict): The parameters of the benchmark, e.g., {'pages': 100}.
+        timings (list[float]): The elapsed time of each round in seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        params: dict,
+        timings: list[float]
+    ):
+        """
+        Initializes a new instance of the BenchmarkResult class.
+
+        Args:
+            name: The name of the benchmark.
+            params: The parameters of the benchmark.
+            timings: The elapsed time of each round in seconds.
+        """
+
+        self.name = name
+        self.params = params
+        self.timings = timings
+
+    @property
+    def id(self) -> str:
+        """
+        Gets the identifier of the benchmark and its parameters, used to compare results across runs.
+
+        Returns:
+            str: The identifier, e.g., 'extract_lines[pages=100]'.
+        """
+
+        params = ",".join(f"{key}={value}" for key, value in self.params.items())
+        return f"{self.name}[{params}]"
+
+    def to_dict(self) -> dict:
+        """
+        Converts the BenchmarkResult object to a dictionary.
+
+        Returns:
+            dict: The BenchmarkResult object as a dictionary.
+        """
+
+        return {
+            'id': self.id,
+            'name': self.name,
+            'params': self.params,
+            'rounds': len(self.timings),
+            'min': min(self.timings),
+            'mean': statistics.mean(self.timings),
+            'median': statistics.median(self.timings),
+            'stdev': statistics.stdev(self.timings) if len(self.timings) > 1 else 0.0,
+            'timings': self.timings
+        }
+
+
+def run_benchmark(
+    name: str,
+    func: Callable[[], any],
+    params: Optional[dict] = None,
+    max_rounds: int = 10,
+    max_time: float = 2.0,
+    warmup: bool = True
+) -> BenchmarkResult:
+    """
+    Times a function over several rounds.
+
+    Rounds are repeated until either max_rounds or max_time is reached, so that slow benchmarks at large scales still complete in a reasonable time.
+    The inputs of the function should be created beforehand so that only the function itself is timed.
+
+    Args:
+        name: The name of the benchmark.
+        func: The function to time, taking no arguments.
+        params: The parameters of the benchmark, e.g., the scale of the inputs.
+        max_rounds: The maximum number of timed rounds.
+        max_time: The number of seconds after which no further rounds are started. At least one round is always timed.
+        warmup: Whether to run the function once before timing it. A warmup that exceeds max_time is used as the only round.
+
+    Returns:
+        BenchmarkResult: The timings of the benchmark.
+    """
+
+    timings = []
+    if warmup:
+        warmup_start = time.perf_counter()
+        func()
+        warmup_time = time.perf_counter() - warmup_start
+
+        # A warmup that takes longer than the time budget is kept as the only round rather than timing the function again
+        if warmup_time >= max_time:
+            return BenchmarkResult(name, params or {}, [warmup_time])
+
+    start = time.perf_counter()
+    while len(timings) < max_rounds and (not timings or time.perf_counter() - start < max_time):
+        round_start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - round_start)
+
+    return BenchmarkResult(name, params or {}, timings)
+
+
+class BenchmarkRunner:
+    """
+    A class representing the benchmarks of a suite, run with the same round limits and collected in the order they ran.
+
+    Attributes:
+        max_rounds (int): The maximum number of timed rounds of each benchmark.
+        max_time (float): The number of seconds after which no further rounds of a benchmark are started.
+        results (list[BenchmarkResult]): The results of each benchmark that has run.
+    """
+
+    def __init__(
+        self,
+        max_rounds: int = 10,
+        max_time: float = 2.0
+    ):
+        """
+        Initializes a new instance of the BenchmarkRunner class.
+
+        Args:
+            max_rounds: The maximum number of timed rounds of each benchmark.
+            max_time: The number of seconds after which no further rounds of a benchmark are started.
+        """
+
+        self.max_rounds = max_rounds
+        self.max_time = max_time
+        self.results: list[BenchmarkResult] = []
+
+    def __call__(self, name: str, func: Callable[[], any], **params) -> BenchmarkResult:
+        """
+        Times a function with run_benchmark, prints its fastest round, and adds its result to the results of the suite.
+
+        Args:
+            name: The name of the benchmark.
+            func: The function to time, taking no arguments.
+            **params: The parameters of the benchmark, e.g., the scale of the inputs.
+
+        Returns:
+            BenchmarkResult: The timings of the benchmark.
+        """
+
+        result = run_benchmark(
+            name, func, params, max_rounds=self.max_rounds, max_time=self.max_time)
+        print(f"{result.id}: {min(result.timings) * 1000:.3f} ms", flush=True)
+        self.results.append(result)
+        return result
+
+
+def get_environment_info() -> dict:
+    """
+    Gets information about the environment the benchmarks ran in, so that stored results can be compared like for like.
+
+    Returns:
+        dict: The commit, Python version, platform, and CPU count.
+    """
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def save_benchmark_results(
+    suite: str,
+    results: list[BenchmarkResult],
+    results_dir: str
+) -> str:
+    """
+    Stores the results of a benchmark suite run as a timestamped JSON file, building up a history for trend comparison.
+
+    Args:
+        suite: The name of the benchmark suite, used as the folder of its results.
+        results: The benchmark results of the run.
+        results_dir: The root directory of the stored results.
+
+    Returns:
+        str: The path of the stored results file.
+    """
+
+    environment = get_environment_info()
+    timestamp = datetime.now(timezone.utc)
+    fname = f"{timestamp.strftime('%Y%m%dT%H%M%SZ')}_{environment['commit'] or 'unknown'}.json"
+    fpath = os.path.join(results_dir, suite, fname)
+
+    create_json_file(fpath, {
+        'suite': suite,
+        'timestamp': timestamp.isoformat(),
+        'environment': environment,
+        'results': results
+    })
+
+    return fpath
+
+
+def load_benchmark_results(fpath: str) -> dict:
+    """
+    Loads a stored benchmark suite run.
+
+    Args:
+        fpath: The path of the stored results file.
+
+    Returns:
+        dict: The stored run, including its environment and results.
+    """
+
+    with open(fpath, 'r') as f:
+        return json.load(f)
+
+
+def get_latest_benchmark_results(suite: str, results_dir: str) -> Optional[str]:
+    """
+    Gets the path of the most recently stored run of a benchmark suite.
+
+    Args:
+        suite: The name of the benchmark suite.
+        results_dir: The root directory of the stored results.
+
+    Returns:
+        Optional[str]: The path of the stored results file, or None if the suite has not been stored.
+    """
+
+    suite_dir = os.path.join(results_dir, suite)
+    if not os.path.isdir(suite_dir):
+        return None
+
+    fnames = sorted(fname for fname in os.listdir(suite_dir) if fname.endswith('.json'))
+    return os.path.join(suite_dir, fnames[-1]) if fnames else None
+
+
+def compare_benchmark_results(
+    baseline: dict,
+    results: list[BenchmarkResult],
+    threshold: float = 0.1
+) -> list[dict]:
+    """
+    Compares benchmark results against a stored baseline run using the minimum round time, which is the least sensitive to noise.
+
+    Args:
+        baseline: The stored baseline run.
+        results: The benchmark results of the current run.
+        threshold: The relative change in time above which a benchmark is reported as regressed or improved.
+
+    Returns:
+        list[dict]: The comparison of each benchmark, with the baseline and current times, their ratio, and a status.
+    """
+
+    baseline_results = {result['id']: result for result in baseline['results']}
+
+    comparisons = []
+    for result in results:
+        current = min(result.timings)
+        baseline_result = baseline_results.get(result.id)
+        previous = baseline_result['min'] if baseline_result else None
+        ratio = current / previous if previous else None
+
+        if ratio is None:
+            status = 'new'
+        elif ratio > 1 + threshold:
+            status = 'regressed'
+        elif ratio < 1 - threshold:
+            status = 'improved'
+        else:
+            status = 'unchanged'
+
+        comparisons.append({
+            'id': result.id,
+            'baseline': previous,
+            'current': current,
+            'ratio': ratio,
+            'status': status
+        })
+
+    return comparisons
+
+
+def format_benchmark_results(
+    results: list[BenchmarkResult],
+    comparisons: Optional[list[dict]] = None
+) -> str:
+    """
+    Formats benchmark results as a plain text table, including the comparison with a baseline if provided.
+
+    Args:
+        results: The benchmark results.
+        comparisons: The comparison of the results with a baseline.
+
+    Returns:
+        str: The formatted table.
+    """
+
+    comparisons_by_id = {comparison['id']: comparison for comparison in comparisons or []}
+    width = max([len(result.id) for result in results] + [len("benchmark")])
+
+    lines = [f"{'benchmark':<{width}}  {'min (ms)':>12}  {'median (ms)':>12}  {'rounds':>6}  {'vs baseline':>20}"]
+    for result in results:
+        summary = result.to_dict()
+        comparison = comparisons_by_id.get(result.id)
+        change = ""
+        if comparison and comparison['ratio'] is not None:
+            change = f"{comparison['ratio']:.2f}x {comparison['status']}"
+        elif comparison:
+            change = comparison['status']
+
+        lines.append(
+            f"{result.id:<{width}}  {summary['min'] * 1000:>12.3f}  {summary['median'] * 1000:>12.3f}  {summary['rounds']:>6}  {change:>20}")
+
+    return "\n".join(lines)
+
+
+def report_benchmark_results(
+    suite: str,
+    results: list[BenchmarkResult],
+    results_dir: str,
+    compare: Optional[str] = None,
+    threshold: float = 0.1,
+    save: bool = True
+) -> list[dict]:
+    """
+    Prints the results of a benchmark suite run, compared with a baseline run if provided, and stores them.
+
+    Args:
+        suite: The name of the benchmark suite.
+        results: The benchmark results of the run.
+        results_dir: The root directory of the stored results.
+        compare: The stored results file to compare with, or 'latest' for the most recently stored run.
+        threshold: The relative change in time above which a benchmark is reported as regressed or improved.
+        save: Whether to store the results.
+
+    Returns:
+        list[dict]: The comparison of each benchmark with the baseline, or an empty list if there is no baseline.
+    """
+
+    baseline_fpath = compare
+    if baseline_fpath == "latest":
+        baseline_fpath = get_latest_benchmark_results(suite, results_dir)
+
+    comparisons = []
+    if baseline_fpath:
+        comparisons = compare_benchmark_results(
+            load_benchmark_results(baseline_fpath), results, threshold)
+
+    print()
+    print(format_benchmark_results(results, comparisons))
+
+    if save:
+        print(f"\nResults stored in {save_benchmark_results(suite, results, results_dir)}")
+
+    return comparisons
+
+
+def add_benchmark_arguments(parser: argparse.ArgumentParser):
+    """
+    Adds the command-line arguments shared by all benchmark suites to a parser.
+
+    Args:
+        parser: The parser of the benchmark suite.
+    """
+
+    parser.add_argument("--max-rounds", type=int, default=10,
+                        help="The maximum number of timed rounds of each benchmark.")
+    parser.add_argument("--max-time", type=float, default=2.0,
+                        help="The number of seconds after which no further rounds of a benchmark are started.")
+    parser.add_argument("--results-dir", default="benchmark_results",
+                        help="The directory the results are stored in.")
+    parser.add_argument("--compare",
+                        help="The stored results file to compare with, or 'latest' for the most recent run.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="The relative change in time above which a benchmark is reported as regressed or improved.")
+    parser.add_argument("--no-save", action="store_true",
+                        help="Whether to skip storing the results.")
@@ -0,0 +1,118 @@
+import argparse
+from typing import Optional
+
+from samples.benchmarks.benchmark_utils import (
+    BenchmarkResult,
+    BenchmarkRunner,
+    add_benchmark_arguments,
+    report_benchmark_results
+)
+from samples.benchmarks.synthetic_data import (
+    create_analyze_result,
+    create_completion_choice,
+    create_confidence,
+    create_extract_result,
+    create_invoice
+)
+from samples.confidence.confidence_utils import (
+    get_confidence_values,
+    get_schema_confidence_values,
+    merge_confidence_values
+)
+from samples.confidence.document_intelligence_confidence import (
+    evaluate_confidence as evaluate_di_confidence,
+    extract_lines,
+    find_matching_lines
+)
+from samples.confidence.openai_confidence import evaluate_confidence as evaluate_openai_confidence
+from samples.models.invoice import Invoice
+
+SUITE = "confidence"
+PAGES = [1, 10, 100, 500]
+TOKENS = [100, 1000, 10000, 50000]
+
+
+def run_confidence_benchmarks(
+    pages: list[int] = PAGES,
+    tokens: list[int] = TOKENS,
+    model: str = "gpt-4o",
+    max_rounds: int = 10,
+    max_time: float = 2.0
+) -> list[BenchmarkResult]:
+    """
+    Runs the confidence benchmarks over synthetic analysis results and logprob streams of increasing size.
+
+    The Azure AI Document Intelligence benchmarks scale with the number of pages, and the OpenAI and merging benchmarks with the number of completion tokens.
+
+    Args:
+        pages: The page counts of the synthetic analysis results.
+        tokens: The token counts of the synthetic chat completions.
+        model: The OpenAI model name used to determine the token encoding.
+        max_rounds: The maximum number of timed rounds of each benchmark.
+        max_time: The number of seconds after which no further rounds of a benchmark are started.
+
+    Returns:
+        list[BenchmarkResult]: The results of each benchmark at each scale.
+    """
+
+    benchmark = BenchmarkRunner(max_rounds, max_time)
+
+    for page_count in pages:
+        analyze_result = create_analyze_result(page_count)
+        extract_result = create_extract_result(analyze_result)
+        di_lines = extract_lines(analyze_result)
+        line_value = extract_result["items"][0]["description"]
+
+        benchmark("extract_lines",
+                  lambda: extract_lines(analyze_result), pages=page_count)
+        benchmark("find_matching_lines",
+                  lambda: find_matching_lines(line_value, di_lines), pages=page_count, value="line")
+        benchmark("find_matching_lines",
+                  lambda: find_matching_lines("not present", di_lines), pages=page_count, value="missing")
+        benchmark("di_evaluate_confidence",
+                  lambda: evaluate_di_confidence(extract_result, analyze_result), pages=page_count)
+
+    for token_count in tokens:
+        extract_result, choice = create_completion_choice(token_count)
+        confidence_a = create_confidence(extract_result, seed=1)
+        confidence_b = create_confidence(extract_result, seed=2)
+
+        benchmark("openai_evaluate_confidence",
+                  lambda: evaluate_openai_confidence(extract_result, choice, model), tokens=token_count)
+        benchmark("merge_confidence_values",
+                  lambda: merge_confidence_values(confidence_a, confidence_b), tokens=token_count)
+        benchmark("get_confidence_values",
+                  lambda: get_confidence_values(confidence_a), tokens=token_count)
+
+        # The schema walker needs a confidence evaluation of a known model, with the line items of the same number of tokens
+        invoice_confidence = create_confidence(create_invoice(max(token_count // 50, 1)), seed=3)
+
+        benchmark("get_confidence_values",
+                  lambda: get_confidence_values(invoice_confidence), tokens=token_count, model="Invoice")
+        benchmark("get_schema_confidence_values",
+                  lambda: get_schema_confidence_values(invoice_confidence, Invoice), tokens=token_count, model="Invoice")
+
+    return benchmark.results
+
+
+def main(args: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Runs the confidence microbenchmarks, stores the results, and compares them with a previous run.")
+    parser.add_argument("--pages", type=int, nargs="+", default=PAGES,
+                        help="The page counts of the synthetic analysis results.")
+    parser.add_argument("--tokens", type=int, nargs="+", default=TOKENS,
+                        help="The token counts of the synthetic chat completions.")
+    parser.add_argument("--model", default="gpt-4o",
+                        help="The OpenAI model name used to determine the token encoding.")
+    add_benchmark_arguments(parser)
+    args = parser.parse_args(args)
+
+    results = run_confidence_benchmarks(
+        args.pages, args.tokens, args.model, args.max_rounds, args.max_time)
+
+    report_benchmark_results(
+        SUITE, results, args.results_dir, args.compare, args.threshold, save=not args.no_save)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+from typing import Optional
+
+from samples.benchmarks.benchmark_utils import (
+    BenchmarkResult,
+    BenchmarkRunner,
+    add_benchmark_arguments,
+    report_benchmark_results
+)
+from samples.benchmarks.synthetic_data import create_document_fields
+from samples.utils.document_intelligence_result_parser import parse_document_fields, parse_many_document_fields
+
+SUITE = "parser"
+FORMS = [100, 1000]
+ASSET = os.path.join(os.path.dirname(__file__), "../../../../assets/us_tax/us-tax-1040.json")
+
+
+def run_parser_benchmarks(
+    asset: str = ASSET,
+    forms: list[int] = FORMS,
+    max_workers: Optional[int] = None,
+    max_rounds: int = 10,
+    max_time: float = 2.0
+) -> list[BenchmarkResult]:
+    """
+    Runs the parser benchmarks over Azure AI Document Intelligence fields created from the expected values of the forms of a tax return.
+
+    Each form of the return, e.g., the 1040 and its schedules, is parsed on its own, and batches of forms are parsed sequentially and in worker processes.
+
+    Args:
+        asset: The path to the metadata of the tax return, with the expected values of each form, e.g., '0_expected'.
+        forms: The number of forms in each batch.
+        max_workers: The maximum number of worker processes. Defaults to the number of CPUs.
+        max_rounds: The maximum number of timed rounds of each benchmark.
+        max_time: The number of seconds after which no further rounds of a benchmark are started.
+
+    Returns:
+        list[BenchmarkResult]: The results of each benchmark at each scale.
+    """
+
+    benchmark = BenchmarkRunner(max_rounds, max_time)
+
+    with open(asset, "r") as f:
+        metadata = json.load(f)
+
+    expected_outputs = [metadata[key] for key in metadata if key.endswith("_expected")]
+    document_fields = [create_document_fields(expected, seed=idx) for idx, expected in enumerate(expected_outputs)]
+
+    for idx, fields in enumerate(document_fields):
+        benchmark("document_field_as_dict",
+                  lambda: {key: field.as_dict() for key, field in fields.items()}, form=idx)
+        benchmark("parse_document_fields",
+                  lambda: parse_document_fields(fields), form=idx)
+
+    for form_count in forms:
+        batch = [document_fields[idx % len(document_fields)] for idx in range(form_count)]
+
+        benchmark("parse_document_fields_sequential",
+                  lambda: [parse_document_fields(fields) for fields in batch], forms=form_count)
+        benchmark("parse_many_document_fields",
+                  lambda: parse_many_document_fields(batch, max_workers), forms=form_count)
+
+    return benchmark.results
+
+
+def main(args: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Runs the parser microbenchmarks, stores the results, and compares them with a previous run.")
+    parser.add_argument("--asset", default=ASSET,
+                        help="The path to the metadata of the tax return, with the expected values of each form.")
+    parser.add_argument("--forms", type=int, nargs="+", default=FORMS,
+                        help="The number of forms in each batch.")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="The maximum number of worker processes.")
+    add_benchmark_arguments(parser)
+    args = parser.parse_args(args)
+
+    results = run_parser_benchmarks(
+        args.asset, args.forms, args.max_workers, args.max_rounds, args.max_time)
+
+    report_benchmark_results(
+        SUITE, results, args.results_dir, args.compare, args.threshold, save=not args.no_save)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import tempfile
+from typing import Optional
+
+from samples.benchmarks.benchmark_utils import (
+    BenchmarkResult,
+    BenchmarkRunner,
+    add_benchmark_arguments,
+    report_benchmark_results
+)
+from samples.benchmarks.synthetic_data import create_analyze_result, create_extract_result
+from samples.confidence.document_intelligence_confidence import evaluate_confidence
+from samples.utils.custom_json_encoder import CustomJsonEncoder
+from samples.utils.json_utils import JsonStreamWriter, dumps_json
+
+SUITE = "serialization"
+PAGES = [1, 10, 50]
+
+
+def run_serialization_benchmarks(
+    pages: list[int] = PAGES,
+    max_rounds: int = 10,
+    max_time: float = 2.0
+) -> list[BenchmarkResult]:
+    """
+    Runs the serialization benchmarks over Azure AI Document Intelligence confidence evaluations of synthetic analysis results of increasing size.
+
+    The confidence evaluations contain the matching lines and words of each field, which make up most of the serialized results.
+
+    Args:
+        pages: The page counts of the synthetic analysis results.
+        max_rounds: The maximum number of timed rounds of each benchmark.
+        max_time: The number of seconds after which no further rounds of a benchmark are started.
+
+    Returns:
+        list[BenchmarkResult]: The results of each benchmark at each scale.
+    """
+
+    benchmark = BenchmarkRunner(max_rounds, max_time)
+
+    def write_stream(fpath: str, confidence: dict):
+        with JsonStreamWriter(fpath, "object") as writer:
+            for key, value in confidence.items():
+                writer.write_entry(key, value)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fpath = os.path.join(temp_dir, "confidence.json")
+
+        for page_count in pages:
+            analyze_result = create_analyze_result(page_count)
+            confidence = evaluate_confidence(create_extract_result(analyze_result), analyze_result)
+
+            benchmark("json_dumps",
+                      lambda: json.dumps(confidence, indent=4, cls=CustomJsonEncoder), pages=page_count)
+            benchmark("dumps_json",
+                      lambda: dumps_json(confidence), pages=page_count, indent="none")
+            benchmark("dumps_json",
+                      lambda: dumps_json(confidence, indent=2), pages=page_count, indent="2")
+            benchmark("json_stream_writer",
+                      lambda: write_stream(fpath, confidence), pages=page_count)
+
+    return benchmark.results
+
+
+def main(args: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Runs the serialization microbenchmarks, stores the results, and compares them with a previous run.")
+    parser.add_argument("--pages", type=int, nargs="+", default=PAGES,
+                        help="The page counts of the synthetic analysis results.")
+    add_benchmark_arguments(parser)
+    args = parser.parse_args(args)
+
+    results = run_serialization_benchmarks(args.pages, args.max_rounds, args.max_time)
+
+    report_benchmark_results(
+        SUITE, results, args.results_dir, args.compare, args.threshold, save=not args.no_save)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import json
+from typing import Optional
+from pydantic import TypeAdapter
+
+from samples.benchmarks.benchmark_utils import (
+    BenchmarkResult,
+    BenchmarkRunner,
+    add_benchmark_arguments,
+    report_benchmark_results
+)
+from samples.benchmarks.synthetic_data import create_invoice
+from samples.models.invoice import Invoice
+from samples.utils.structured_output import get_prompt_schema, parse_json_response
+
+SUITE = "structured_output"
+INVOICES = [100, 1000]
+
+
+def run_structured_output_benchmarks(
+    invoices: list[int] = INVOICES,
+    items: int = 20,
+    max_rounds: int = 10,
+    max_time: float = 2.0
+) -> list[BenchmarkResult]:
+    """
+    Runs the structured output benchmarks over batches of synthetic invoice responses, as returned in a JSON Markdown code block by models without structured outputs.
+
+    Each batch builds the prompt schema and parses the response of every invoice, with the per-document schema generation and dictionary
+    validation of the Phi extraction sample, and with the cached prompt schema and TypeAdapter.
+
+    Args:
+        invoices: The number of invoices in each batch.
+        items: The number of line items of each invoice.
+        max_rounds: The maximum number of timed rounds of each benchmark.
+        max_time: The number of seconds after which no further rounds of a benchmark are started.
+
+    Returns:
+        list[BenchmarkResult]: The results of each benchmark at each scale.
+    """
+
+    benchmark = BenchmarkRunner(max_rounds, max_time)
+
+    def parse_dict(content: str) -> Invoice:
+        content = content.replace("```json", "").replace("```", "").strip()
+        return Invoice.model_validate(json.loads(content))
+
+    def extract_uncached(responses: list[str]) -> list[tuple[str, Invoice]]:
+        return [
+            (f"Strictly use the following JSON schema: {json.dumps(Invoice.model_json_schema())}", parse_dict(content))
+            for content in responses
+        ]
+
+    def extract_cached(responses: list[str]) -> list[tuple[str, Invoice]]:
+        return [
+            (f"Strictly use the following JSON schema: {get_prompt_schema(Invoice)}", parse_json_response(content, Invoice))
+            for content in responses
+        ]
+
+    # Startup costs, paid per document without the caches
+    benchmark("model_json_schema", lambda: json.dumps(Invoice.model_json_schema()))
+    benchmark("get_prompt_schema", lambda: get_prompt_schema(Invoice))
+    benchmark("type_adapter", lambda: TypeAdapter(Invoice))
+
+    for invoice_count in invoices:
+        responses = [
+            f"```json\n{json.dumps(create_invoice(items, seed=idx), default=str)}\n```"
+            for idx in range(invoice_count)
+        ]
+
+        benchmark("parse_dict",
+                  lambda: [parse_dict(content) for content in responses], invoices=invoice_count)
+        benchmark("parse_json_response",
+                  lambda: [parse_json_response(content, Invoice) for content in responses], invoices=invoice_count)
+        benchmark("extract_uncached",
+                  lambda: extract_uncached(responses), invoices=invoice_count)
+        benchmark("extract_cached",
+                  lambda: extract_cached(responses), invoices=invoice_count)
+
+    return benchmark.results
+
+
+def main(args: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Runs the structured output microbenchmarks, stores the results, and compares them with a previous run.")
+    parser.add_argument("--invoices", type=int, nargs="+", default=INVOICES,
+                        help="The number of invoices in each batch.")
+    parser.add_argument("--items", type=int, default=20,
+                        help="The number of line items of each invoice.")
+    add_benchmark_arguments(parser)
+    args = parser.parse_args(args)
+
+    results = run_structured_output_benchmarks(args.invoices, args.items, args.max_rounds, args.max_time)
+
+    report_benchmark_results(
+        SUITE, results, args.results_dir, args.compare, args.threshold, save=not args.no_save)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+import json
+import random
+import re
+from azure.ai.documentintelligence.models import AnalyzeResult, DocumentField
+from openai.types.chat.chat_completion import Choice
+from samples.models.invoice import Invoice
+
+VOCABULARY = [
+    "invoice", "total", "amount", "due", "date", "customer", "vendor", "address", "street", "city",
+    "quantity", "price", "tax", "discount", "shipping", "payment", "terms", "order", "product", "service",
+    "description", "account", "reference", "balance", "subtotal", "contoso", "fabrikam", "northwind", "unit", "hours"
+]
+
+_TOKEN_PATTERN = re.compile(r"\w{1,6}|\s+|[^\w\s]")
+
+
+def _create_word(rng: random.Random) -> str:
+    if rng.random() < 0.2:
+        return f"{rng.randint(1, 99999)}"
+    return rng.choice(VOCABULARY)
+
+
+def create_analyze_result(
+    pages: int,
+    lines_per_page: int = 40,
+    words_per_line: int = 8,
+    seed: int = 0
+) -> AnalyzeResult:
+    """
+    Creates a synthetic Azure AI Document Intelligence layout analysis result with lines, words, spans, and polygons on each page.
+
+    Args:
+        pages: The number of pages.
+        lines_per_page: The number of lines on each page.
+        words_per_line: The number of words on each line.
+        seed: The seed of the random content, for reproducible results.
+
+    Returns:
+        AnalyzeResult: The synthetic analysis result.
+    """
+
+    rng = random.Random(seed)
+    content = []
+    offset = 0
+    result_pages = []
+
+    for page_number in range(1, pages + 1):
+        page_offset = offset
+        lines = []
+        words = []
+
+        for line_index in range(lines_per_page):
+            y = 0.5 + line_index * 0.25
+            line_words = [_create_word(rng) for _ in range(words_per_line)]
+            line_content = " ".join(line_words)
+            line_offset = offset
+
+            x = 0.5
+            for word in line_words:
+                width = 0.08 * len(word)
+                words.append({
+                    "content": word,
+                    "polygon": [x, y, x + width, y, x + width, y + 0.2, x, y + 0.2],
+                    "confidence": round(rng.uniform(0.6, 1.0), 3),
+                    "span": {"offset": offset, "length": len(word)}
+                })
+                x += width + 0.05
+                offset += len(word) + 1
+
+            lines.append({
+                "content": line_content,
+                "polygon": [0.5, y, x, y, x, y + 0.2, 0.5, y + 0.2],
+                "spans": [{"offset": line_offset, "length": len(line_content)}]
+            })
+            content.append(line_content)
+
+        result_pages.append({
+            "pageNumber": page_number,
+            "width": 8.5,
+            "height": 11,
+            "unit": "inch",
+            "spans": [{"offset": page_offset, "length": offset - page_offset}],
+            "words": words,
+            "lines": lines
+        })
+
+    return AnalyzeResult({
+        "apiVersion": "2024-11-30",
+        "modelId": "prebuilt-layout",
+        "content": "\n".join(content),
+        "pages": result_pages
+    })
+
+
+def create_document_fields(
+    values: dict,
+    seed: int = 0
+) -> dict[str, DocumentField]:
+    """
+    Creates synthetic Azure AI Document Intelligence document fields, as analyzed by a prebuilt model, with the given values, e.g., the expected values of a tax form.
+
+    Dictionaries become object fields, or address fields if they contain a 'road' or 'streetAddress', lists of strings become selection groups,
+    and other lists become array fields. Empty strings become string fields without a value, as for fields that are not found.
+
+    Args:
+        values: The values of the fields.
+        seed: The seed of the random confidence scores and positions, for reproducible results.
+
+    Returns:
+        dict[str, DocumentField]: The synthetic fields, keyed by field name.
+    """
+
+    rng = random.Random(seed)
+
+    def create_field(value: any) -> dict:
+        if isinstance(value, dict) and ("road" in value or "streetAddress" in value):
+            field = {"type": "address", "valueAddress": value, "content": " ".join(str(item) for item in value.values())}
+        elif isinstance(value, dict):
+            return {"type": "object", "valueObject": {key: create_field(item) for key, item in value.items()}}
+        elif isinstance(value, list) and all(isinstance(item, str) for item in value):
+            field = {"type": "selectionGroup", "valueSelectionGroup": value}
+        elif isinstance(value, list):
+            return {"type": "array", "valueArray": [create_field(item) for item in value]}
+        elif isinstance(value, bool):
+            field = {"type": "boolean", "valueBoolean": value}
+        elif isinstance(value, (int, float)):
+            field = {"type": "number", "valueNumber": value, "content": f"{value}"}
+        elif value:
+            field = {"type": "string", "valueString": value, "content": value}
+        else:
+            return {"type": "string"}
+
+        x, y = rng.uniform(0.5, 7.5), rng.uniform(0.5, 10.5)
+        field.update({
+            "confidence": round(rng.uniform(0.6, 1.0), 3),
+            "boundingRegions": [{"pageNumber": 1, "polygon": [x, y, x + 1, y, x + 1, y + 0.2, x, y + 0.2]}],
+            "spans": [{"offset": rng.randint(0, 10000), "length": len(field.get("content", ""))}]
+        })
+        return field
+
+    return {key: DocumentField(create_field(value)) for key, value in values.items()}
+
+
+def create_extract_result(
+    analyze_result: AnalyzeResult,
+    items: int = 20,
+    seed: int = 0
+) -> dict:
+    """
+    Creates a synthetic invoice-like extraction result whose values are taken from the lines and words of an analysis result.
+
+    Descriptions match whole lines, while the other values only match part of a line, exercising both line matchers.
+
+    Args:
+        analyze_result: The analysis result to take the values from.
+        items: The number of line items.
+        seed: The seed of the random values, for reproducible results.
+
+    Returns:
+        dict: The synthetic extraction result.
+    """
+
+    rng = random.Random(seed)
+    lines = [line for page in analyze_result.pages for line in page.lines]
+    words = [word for page in analyze_result.pages for word in page.words]
+
+    return {
+        "invoice_id": rng.choice(words).content,
+        "vendor_name": rng.choice(lines).content,
+        "customer_name": rng.choice(lines).content,
+        "invoice_date": "2024-01-01",
+        "items": [{
+            "product_code": rng.choice(words).content,
+            "description": rng.choice(lines).content,
+            "quantity": rng.randint(1, 100),
+            "unit_price": round(rng.uniform(1, 1000), 2),
+            "total": round(rng.uniform(1, 10000), 2)
+        } for _ in range(items)],
+        "total": round(rng.uniform(1, 100000), 2)
+    }
+
+
+def create_completion_choice(
+    tokens: int,
+    seed: int = 0
+) -> tuple[dict, Choice]:
+    """
+    Creates a synthetic chat completion choice with logprobs whose content is the JSON of an invoice-like extraction result.
+
+    The content is split into short chunks that approximate the model's tokens, so that the choice has roughly the requested number of tokens.
+
+    Args:
+        tokens: The approximate number of tokens in the completion.
+        seed: The seed of the random values, for reproducible results.
+
+    Returns:
+        tuple[dict, Choice]: The extraction result and the chat completion choice it was parsed from.
+    """
+
+    rng = random.Random(seed)
+
+    # Each line item serializes to roughly 50 tokens
+    extract_result = {
+        "invoice_id": f"INV-{rng.randint(1, 99999)}",
+        "vendor_name": " ".join(rng.choice(VOCABULARY) for _ in range(3)),
+        "items": [{
+            "product_code": f"{rng.choice(VOCABULARY).upper()}-{rng.randint(1, 999)}",
+            "description": " ".join(rng.choice(VOCABULARY) for _ in range(4)),
+            "quantity": rng.randint(1, 100),
+            "total": round(rng.uniform(1, 10000), 2)
+        } for _ in range(max(tokens // 50, 1))],
+        "total": round(rng.uniform(1, 100000), 2)
+    }
+
+    content = json.dumps(extract_result)
+    chunks = _TOKEN_PATTERN.findall(content)
+
+    return extract_result, Choice.model_validate({
+        "index": 0,
+        "finish_reason": "stop",
+        "message": {"role": "assistant", "content": content},
+        "logprobs": {
+            "content": [{
+                "token": chunk,
+                "logprob": -rng.expovariate(20),
+                "bytes": list(chunk.encode('utf-8')),
+                "top_logprobs": []
+            } for chunk in chunks]
+        }
+    })
+
+
+def create_confidence(
+    extract_result: dict,
+    seed: int = 0
+) -> dict:
+    """
+    Creates a synthetic confidence evaluation with the same structure as an extraction result.
+
+    Args:
+        extract_result: The extraction result to create the confidence evaluation for.
+        seed: The seed of the random scores, for reproducible results.
+
+    Returns:
+        dict: The synthetic confidence evaluation.
+    """
+
+    rng = random.Random(seed)
+
+    def create_field_confidence(value: any) -> any:
+        if isinstance(value, dict):
+            return {key: create_field_confidence(val) for key, val in value.items()}
+        if isinstance(value, list):
+            return [create_field_confidence(item) for item in value]
+        return {"confidence": round(rng.uniform(0.0, 1.0), 3), "value": value}
+
+    confidence = create_field_confidence(extract_result)
+    confidence['_overall'] = rng.uniform(0.0, 1.0)
+    return confidence
+
+
+def create_line_items(
+    rows: int,
+    mismatch_rate: float = 0.2,
+    shuffle: bool = True,
+    seed: int = 0
+) -> tuple[dict, dict]:
+    """
+    Creates a synthetic pair of expected and actual invoices with line item tables, for benchmarking accuracy evaluation.
+
+    Args:
+        rows: The number of line items.
+        mismatch_rate: The fraction of actual line items with a wrong product code and total.
+        shuffle: Whether the actual line items are in a different order from the expected line items.
+        seed: The seed of the random values, for reproducible results.
+
+    Returns:
+        tuple[dict, dict]: The expected and actual invoices.
+    """
+
+    rng = random.Random(seed)
+    expected_items = [{
+        "product_code": f"{rng.choice(VOCABULARY).upper()}-{idx}",
+        "description": " ".join(rng.choice(VOCABULARY) for _ in range(4)),
+        "quantity": rng.randint(1, 10),
+        "unit_price": round(rng.uniform(1, 1000), 2),
+        "total": round(rng.uniform(1, 10000), 2)
+    } for idx in range(rows)]
+
+    actual_items = [dict(item) for item in expected_items]
+    for item in rng.sample(actual_items, int(rows * mismatch_rate)):
+        item["product_code"] = None
+        item["total"] = 0.0
+
+    if shuffle:
+        rng.shuffle(actual_items)
+
+    return (
+        {"invoice_id": "INV-1", "items": expected_items},
+        {"invoice_id": "inv-1", "items": actual_items}
+    )
+
+
+def create_invoice(
+    items: int = 20,
+    seed: int = 0
+) -> dict:
+    """
+    Creates a synthetic invoice with the nested structure of the Invoice model, including addresses, currency amounts, and line items.
+
+    Args:
+        items: The number of line items.
+        seed: The seed of the random values, for reproducible results.
+
+    Returns:
+        dict: The synthetic invoice, as dumped from an Invoice model.
+    """
+
+    rng = random.Random(seed)
+
+    def text(words: int) -> str:
+        return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+    def address() -> dict:
+        return {
+            "street": f"{rng.randint(1, 9999)} {text(2)} St.",
+            "city": text(1),
+            "state": text(1),
+            "postal_code": f"{rng.randint(10000, 99999)}",
+            "country": "USA"
+        }
+
+    def currency(maximum: float) -> dict:
+        return {"currency_code": "USD", "amount": round(rng.uniform(0, maximum), 2)}
+
+    return Invoice.model_validate({
+        "customer_name": text(2),
+        "customer_tax_id": f"{rng.randint(100000, 999999)}-{rng.randint(1, 9)}",
+        "customer_address": address(),
+        "shipping_address": address(),
+        "purchase_order": f"PO-{rng.randint(1, 9999)}",
+        "invoice_id": f"INV-{rng.randint(1, 99999)}",
+        "invoice_date": "2024-01-01",
+        "due_date": "2024-02-01",
+        "vendor_name": text(2),
+        "vendor_tax_id": f"{rng.randint(100000, 999999)}-{rng.randint(1, 9)}",
+        "vendor_address": address(),
+        "remittance_address": address(),
+        "subtotal": currency(100000),
+        "total_discount": currency(1000),
+        "total_tax": currency(10000),
+        "invoice_total": currency(100000),
+        "payment_term": "Net 30",
+        "items": [{
+            "product_code": f"{rng.choice(VOCABULARY).upper()}-{idx}",
+            "description": text(4),
+            "quantity": rng.randint(1, 100),
+            "tax": currency(100),
+            "unit_price": currency(1000),
+            "total": currency(10000)
+        } for idx in range(items)],
+        "customer_signature": {"signatory": text(2), "date": "2024-01-01", "has_written_signature": True}
+    }).model_dump()
@@ -0,0 +1,62 @@
+import argparse
+from typing import Optional
+
+from samples.benchmarks.benchmark_utils import (
+    BenchmarkResult,
+    BenchmarkRunner,
+    add_benchmark_arguments,
+    report_benchmark_results
+)
+from samples.benchmarks.synthetic_data import create_invoice
+from samples.utils.value_utils import flatten_dict
+
+SUITE = "value"
+ITEMS = [10, 100, 1000]
+
+
+def run_value_benchmarks(
+    items: list[int] = ITEMS,
+    max_rounds: int = 10,
+    max_time: float = 2.0
+) -> list[BenchmarkResult]:
+    """
+    Runs the value utility benchmarks over synthetic invoices with an increasing number of line items.
+
+    Args:
+        items: The line item counts of the synthetic invoices.
+        max_rounds: The maximum number of timed rounds of each benchmark.
+        max_time: The number of seconds after which no further rounds of a benchmark are started.
+
+    Returns:
+        list[BenchmarkResult]: The results of each benchmark at each scale.
+    """
+
+    benchmark = BenchmarkRunner(max_rounds, max_time)
+
+    for item_count in items:
+        invoice = create_invoice(item_count)
+
+        benchmark("flatten_dict",
+                  lambda: flatten_dict(invoice), items=item_count, keys="str")
+        benchmark("flatten_dict",
+                  lambda: flatten_dict(invoice, tuple_keys=True), items=item_count, keys="tuple")
+
+    return benchmark.results
+
+
+def main(args: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Runs the value utility microbenchmarks, stores the results, and compares them with a previous run.")
+    parser.add_argument("--items", type=int, nargs="+", default=ITEMS,
+                        help="The line item counts of the synthetic invoices.")
+    add_benchmark_arguments(parser)
+    args = parser.parse_args(args)
+
+    results = run_value_benchmarks(args.items, args.max_rounds, args.max_time)
+
+    report_benchmark_results(
+        SUITE, results, args.results_dir, args.compare, args.threshold, save=not args.no_save)
+
+
+if __name__ == "__main__":
+    main()
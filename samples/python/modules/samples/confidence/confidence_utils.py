@@ -1,3 +1,10 @@
+from functools import lru_cache
+from typing import Callable, Optional
+from pydantic import BaseModel
+
+from samples.utils.schema_plan import SchemaPlan, get_schema_plan
+
+
 def get_confidence_values(data, key='confidence'):
     """
     Finds all of the confidence values in a nested dictionary or list.
@@ -11,23 +18,172 @@ def get_confidence_values(data, key='confidence'):
     """
 
     confidence_values = []
+    _search_confidence_values(data, key, confidence_values)
+    return confidence_values
+
+
+def _search_confidence_values(data, key: str, confidence_values: list):
+    if isinstance(data, dict):
+        for k, v in data.items():
+            if k == key and (v is not None and v != 0):
+                confidence_values.append(v)
+            if isinstance(v, (dict, list)):
+                _search_confidence_values(v, key, confidence_values)
+    elif isinstance(data, list):
+        for item in data:
+            _search_confidence_values(item, key, confidence_values)
 
-    def recursive_search(d):
-        if isinstance(d, dict):
-            for k, v in d.items():
-                if k == key and (v is not None and v != 0):
-                    confidence_values.append(v)
-                if isinstance(v, (dict, list)):
-                    recursive_search(v)
-        elif isinstance(d, list):
-            for item in d:
-                recursive_search(item)
-
-    recursive_search(data)
+
+def get_schema_confidence_values(data: dict, model: type[BaseModel], key: str = 'confidence') -> list:
+    """
+    Finds all of the confidence values in a confidence evaluation of a Pydantic model, using a walker compiled once from the model's JSON schema.
+
+    The confidence of each field is read directly from the field's evaluation in schema order, without searching the rest of the evaluation,
+    e.g., its matching lines. Values that do not match the schema, e.g., a null nested object, are searched as by get_confidence_values.
+
+    Args:
+        data: The confidence evaluation, e.g., from evaluate_confidence.
+        model: The Pydantic model of the evaluated extraction result, e.g., Invoice.
+        key: The key of the confidence values. Defaults to 'confidence'.
+
+    Returns:
+        list: The list of confidence values found in the confidence evaluation.
+    """
+
+    confidence_values = []
+    _get_confidence_walker(model, key)(data, confidence_values)
     return confidence_values
 
 
-def merge_confidence_values(confidence_a: dict, confidence_b: dict):
+@lru_cache(maxsize=None)
+def _get_confidence_walker(model: type[BaseModel], key: str) -> Callable:
+    return _compile_confidence_walker(get_schema_plan(model), key, model.__name__)
+
+
+def _compile_confidence_walker(plan: SchemaPlan, key: str, name: str) -> Callable:
+    """
+    Generates and compiles a function that appends the confidence values of a confidence evaluation of a schema plan's object field by field.
+
+    Keys of the root object that are not in the schema, e.g., '_overall', are searched as by get_confidence_values.
+    """
+
+    if key in plan.keys:
+        # A root object with a field named like the confidence key is always searched generically
+        return lambda data, confidence_values: _search_confidence_values(data, key, confidence_values)
+
+    namespace = {
+        '_search': _search_confidence_values,
+        '_KEY': key,
+        '_KEYS_0': frozenset(plan.keys),
+        '_FIELDS_0': len(plan.keys)
+    }
+    lines = [
+        "def walk(data, confidence_values):",
+        "    if not isinstance(data, dict) or not data.keys() >= _KEYS_0:",
+        "        _search(data, _KEY, confidence_values)",
+        "        return",
+        "    node_0 = data"
+    ]
+    _compile_confidence_fields(plan.fields, 0, len(plan.fields), 1, key, name, lines, namespace)
+    lines += [
+        "    if len(data) != _FIELDS_0:",
+        "        _search({extra: data[extra] for extra in data if extra not in _KEYS_0}, _KEY, confidence_values)"
+    ]
+
+    exec(compile("\n".join(lines), f"<{name} confidence walker>", "exec"), namespace)
+    return namespace['walk']
+
+
+def _compile_confidence_fields(
+    fields: list,
+    start: int,
+    stop: int,
+    depth: int,
+    key: str,
+    name: str,
+    lines: list[str],
+    namespace: dict
+):
+    indent = "    " * depth
+    idx = start
+    while idx < stop:
+        field = fields[idx]
+        number = idx + 1
+        lines.append(f"{indent}node = node_{field.parent + 1}[{field.key!r}]")
+
+        if field.kind == "object" and key in field.keys:
+            # Objects with a field named like the confidence key are always searched generically
+            lines.append(f"{indent}_search(node, _KEY, confidence_values)")
+            idx += field.descendants + 1
+            continue
+
+        if field.kind == "object":
+            namespace[f'_KEYS_{number}'] = frozenset(field.keys)
+            lines += [
+                f"{indent}if isinstance(node, dict) and node.keys() == _KEYS_{number}:",
+                f"{indent}    node_{number} = node"
+            ]
+            _compile_confidence_fields(fields, idx + 1, idx + 1 + field.descendants, depth + 1, key, name, lines, namespace)
+        elif field.kind == "list" and field.items is not None:
+            namespace[f'_ITEMS_{number}'] = _compile_confidence_walker(field.items, key, f"{name}.{field.key}")
+            lines += [
+                f"{indent}if isinstance(node, list):",
+                f"{indent}    for item in node:",
+                f"{indent}        _ITEMS_{number}(item, confidence_values)"
+            ]
+        elif field.kind == "list":
+            lines += [
+                f"{indent}if isinstance(node, list):",
+                f"{indent}    for item in node:",
+                f"{indent}        if isinstance(item, dict) and _KEY in item:",
+                f"{indent}            confidence = item[_KEY]",
+                f"{indent}            if confidence is not None and confidence != 0:",
+                f"{indent}                confidence_values.append(confidence)",
+                f"{indent}        else:",
+                f"{indent}            _search(item, _KEY, confidence_values)"
+            ]
+        else:
+            lines += [
+                f"{indent}if isinstance(node, dict) and _KEY in node:",
+                f"{indent}    confidence = node[_KEY]",
+                f"{indent}    if confidence is not None and confidence != 0:",
+                f"{indent}        confidence_values.append(confidence)"
+            ]
+
+        # Values that do not match the schema are searched generically
+        lines += [
+            f"{indent}else:",
+            f"{indent}    _search(node, _KEY, confidence_values)"
+        ]
+        idx += field.descendants + 1
+
+
+def get_overall_confidence(confidence: dict, response_format: Optional[type[BaseModel]] = None) -> float:
+    """
+    Computes the overall confidence of a confidence evaluation as the mean of its non-zero confidence values.
+
+    Args:
+        confidence: The confidence evaluation, without its '_overall' confidence.
+        response_format: The Pydantic model of the evaluated extraction result, if known, to find the confidence values with
+            get_schema_confidence_values rather than searching the whole evaluation.
+
+    Returns:
+        float: The overall confidence, or 0.0 if the evaluation has no confidence values.
+    """
+
+    if response_format is not None:
+        confidence_scores = get_schema_confidence_values(confidence, response_format)
+    else:
+        confidence_scores = get_confidence_values(confidence)
+
+    return sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
+
+
+def merge_confidence_values(
+    confidence_a: dict,
+    confidence_b: dict,
+    response_format: Optional[type[BaseModel]] = None
+):
     """
     Merges to evaluations of confidence for the same set of fields as one.
     This is achieved by summing the confidence values and averaging the scores.
@@ -35,6 +191,7 @@ def merge_confidence_values(confidence_a: dict, confidence_b: dict):
     Args:
         confidence_a: The first confidence evaluation.
         confidence_b: The second confidence evaluation.
+        response_format: The Pydantic model of the evaluated extraction result, if known, to compute the overall confidence with its compiled walker.
 
     Returns:
         dict: The merged confidence evaluation.
@@ -79,11 +236,6 @@ def merge_confidence_values(confidence_a: dict, confidence_b: dict):
     merged_confidence = merge_field_confidence_value(
         confidence_a, confidence_b)
 
-    confidence_scores = get_confidence_values(merged_confidence)
-    if confidence_scores:
-        merged_confidence['_overall'] = sum(
-            confidence_scores) / len(confidence_scores)
-    else:
-        merged_confidence['_overall'] = 0.0
+    merged_confidence['_overall'] = get_overall_confidence(merged_confidence, response_format)
 
     return merged_confidence
@@ -1,7 +1,10 @@
 import copy
 from typing import Iterable, Optional
 from azure.ai.documentintelligence.models import AnalyzeResult, DocumentPage, DocumentLine, DocumentWord
-from samples.confidence.confidence_utils import get_confidence_values
+from pydantic import BaseModel
+from samples.confidence.confidence_utils import get_overall_confidence
+from samples.utils.profiling import profiled
+from samples.utils.tracing import bind_context
 from samples.utils.value_utils import value_contains, value_match
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -145,6 +148,7 @@ def normalize_polygon(
     return result
 
 
+@profiled("extract_lines")
 def extract_lines(
     analyze_result: AnalyzeResult,
     multiple_score_resolver: callable = min
@@ -196,6 +200,7 @@ def extract_lines(
     return di_lines
 
 
+@profiled("find_matching_lines")
 def find_matching_lines(
     value: str,
     di_lines: list[DIDocumentLine],
@@ -255,9 +260,11 @@ def get_field_confidence_score(
     return multiple_score_resolver(scores)
 
 
+@profiled("document_intelligence_confidence")
 def evaluate_confidence(
     extract_result: dict,
-    analyze_result: AnalyzeResult
+    analyze_result: AnalyzeResult,
+    response_format: Optional[type[BaseModel]] = None
 ):
     """
     Evaluate the confidence of extracted fields based on the Azure AI Document Intelligence analysis result.
@@ -265,6 +272,7 @@ def evaluate_confidence(
     Args:
         extract_result: The extracted fields to evaluate.
         analyze_result: The Azure AI Document Intelligence analysis result to evaluate against.
+        response_format: The Pydantic model of the extracted fields, if known, to compute the overall confidence with its compiled walker.
 
     Returns:
         dict: The confidence evaluation of the extracted fields.
@@ -315,18 +323,16 @@ def evaluate_confidence(
 
     confidence = dict()
 
-    # Process each field concurrently.
+    # Process each field concurrently, in the context of the caller so that spans and profiles are attributed to its document.
     with ThreadPoolExecutor() as executor:
         future_to_field = {
-            executor.submit(evaluate_field_value_confidence, value): field
+            executor.submit(bind_context(evaluate_field_value_confidence), value): field
             for field, value in extract_result.items()
         }
         for future in as_completed(future_to_field):
             field = future_to_field[future]
             confidence[field] = future.result()
 
-    confidence_scores = get_confidence_values(confidence)
-    confidence['_overall'] = sum(
-        confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
+    confidence['_overall'] = get_overall_confidence(confidence, response_format)
 
     return confidence
@@ -1,13 +1,18 @@
 import tiktoken
 import math
+from typing import Optional
 from openai.types.chat.chat_completion import Choice
-from samples.confidence.confidence_utils import get_confidence_values
+from pydantic import BaseModel
+from samples.confidence.confidence_utils import get_overall_confidence
+from samples.utils.profiling import profiled
 
 
+@profiled("openai_confidence")
 def evaluate_confidence(
     extract_result: dict,
     choice: Choice,
-    model: str = "gpt-4o"
+    model: str = "gpt-4o",
+    response_format: Optional[type[BaseModel]] = None
 ):
     """
     Evaluate confidence for each field value in the extracted result based on the logprobs of the response from Azure OpenAI.
@@ -16,6 +21,7 @@ def evaluate_confidence(
         extract_result: The extraction result.
         choice: The choice object from the OpenAI response.
         model: The model used for the response.
+        response_format: The Pydantic model of the extraction result, if known, to compute the overall confidence with its compiled walker.
 
     Returns:
         dict: The confidence evaluation of the extraction result. 
@@ -161,12 +167,6 @@ def evaluate_confidence(
     for field, value in extract_result.items():
         confidence[field] = evaluate_field_value_confidence(value)
 
-    confidence_scores = get_confidence_values(confidence)
-
-    if confidence_scores:
-        confidence['_overall'] = sum(
-            confidence_scores) / len(confidence_scores)
-    else:
-        confidence['_overall'] = 0.0
+    confidence['_overall'] = get_overall_confidence(confidence, response_format)
 
     return confidence
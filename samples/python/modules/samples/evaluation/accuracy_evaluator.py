@@ -1,189 +1,678 @@
+import bisect
+import json
+from collections import deque
+from functools import lru_cache, partial
+from typing import Callable, Literal, Optional
+import numpy as np
+from pydantic import BaseModel
+
+from samples.utils.profiling import profiled
+from samples.utils.schema_plan import SchemaPlan, get_schema_plan
+
+ListMatching = Literal["greedy", "optimal"]
+
+_EMPTY = {}
+
+# The weight of a match_keys match relative to a full match of all values, so that key matches take precedence in optimal matching
+_MATCH_KEY_WEIGHT = 2.0
+
+
+def _normalize_value(value: any) -> any:
+    """
+    Normalizes a primitive value so that two values are equal, and hash equally, when the evaluator treats them as a match.
+
+    Strings are compared case-insensitively. Values that never match, e.g., NaN or unhashable values, are normalized to a unique object.
+    """
+
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return (True, value.lower())
+    if isinstance(value, float) and value != value:
+        return object()
+    try:
+        hash(value)
+    except TypeError:
+        return object()
+    return (False, value)
+
+
+def _values_match(expected: any, actual: any) -> bool:
+    if expected is None and actual is None:
+        return True
+    if expected is None or actual is None:
+        return False
+
+    # Handle strings (case-insensitive)
+    if isinstance(expected, str) and isinstance(actual, str):
+        return expected.lower() == actual.lower()
+
+    # Handle other primitive types
+    return expected == actual
+
+
+def _get_fingerprint(value: any) -> any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, default=str).lower()
+    return _normalize_value(value)
+
+
+def _remove_sorted(values: list[int], value: int):
+    idx = bisect.bisect_left(values, value)
+    if idx < len(values) and values[idx] == value:
+        del values[idx]
+
+
+def _get_value(item: any, path: tuple) -> any:
+    for key in path:
+        item = item.get(key) if isinstance(item, dict) else None
+    return item
+
+
+class _ListIndex:
+    """
+    Lookup tables over the actual items of a list, built once per list and shared by all of its expected items.
+
+    Tracks the actual items that have been matched so that lookups only return unmatched items, in their original order.
+    """
+
+    def __init__(self, items: list):
+        self.items = items
+        self.used = set()
+        self.first_unused = 0
+        self._unused = list(range(len(items)))
+        self._key_indices = {}
+        self._path_values = {}
+        self._path_unused = {}
+        self._vector_indices = {}
+
+    def count_unused(self, stop: Optional[int] = None) -> int:
+        return len(self._unused) if stop is None else bisect.bisect_left(self._unused, stop)
+
+    def unused_indices(self):
+        for idx in range(self.first_unused, len(self.items)):
+            if idx not in self.used:
+                yield idx
+
+    def mark_used(self, idx: int):
+        self.used.add(idx)
+        _remove_sorted(self._unused, idx)
+        for path, unused_by_value in self._path_unused.items():
+            _remove_sorted(unused_by_value[self._path_values[path][idx]], idx)
+        while self.first_unused in self.used:
+            self.first_unused += 1
+
+    def find_by_key(self, key: str, value: any, key_matcher: callable) -> Optional[int]:
+        try:
+            hash(value)
+        except TypeError:
+            # Unhashable values can only be matched by scanning
+            for idx in self.unused_indices():
+                act_item = self.items[idx]
+                act_val = act_item.get(key) if isinstance(act_item, dict) else None
+                if act_val is not None and key_matcher(value, act_val):
+                    return idx
+            return None
+
+        if key not in self._key_indices:
+            index = {}
+            for idx, act_item in enumerate(self.items):
+                act_val = act_item.get(key) if isinstance(act_item, dict) else None
+                if act_val is not None:
+                    index.setdefault(_normalize_value(act_val), deque()).append(idx)
+            self._key_indices[key] = index
+
+        bucket = self._key_indices[key].get(_normalize_value(value))
+        return self._find_first_unused(bucket, lambda idx: key_matcher(value, self.items[idx].get(key)))
+
+    def find_full_match(self, paths: tuple, vector: tuple) -> Optional[int]:
+        if not paths:
+            # An item without values matches any item
+            return self.first_unused if self.first_unused < len(self.items) else None
+
+        if paths not in self._vector_indices:
+            index = {}
+            columns = [self.get_path_values(path) for path in paths]
+            for idx, item_vector in enumerate(zip(*columns)):
+                index.setdefault(item_vector, deque()).append(idx)
+            self._vector_indices[paths] = index
+
+        return self._find_first_unused(self._vector_indices[paths].get(vector))
+
+    def get_path_values(self, path: tuple) -> list:
+        if path not in self._path_values:
+            self._path_values[path] = [
+                _normalize_value(_get_value(item, path)) for item in self.items]
+        return self._path_values[path]
+
+    def count_unused_matches(self, path: tuple, value: any, stop: Optional[int] = None) -> int:
+        if path not in self._path_unused:
+            values = self.get_path_values(path)
+            unused_by_value = {}
+            for idx in self._unused:
+                unused_by_value.setdefault(values[idx], []).append(idx)
+            self._path_unused[path] = unused_by_value
+
+        unused = self._path_unused[path].get(value)
+        if not unused:
+            return 0
+        return len(unused) if stop is None else bisect.bisect_left(unused, stop)
+
+    def _find_first_unused(self, bucket: Optional[deque], verify: Optional[callable] = None) -> Optional[int]:
+        if not bucket:
+            return None
+
+        while bucket and bucket[0] in self.used:
+            bucket.popleft()
+
+        for idx in bucket:
+            if idx not in self.used and (verify is None or verify(idx)):
+                return idx
+        return None
+
+
+class _Tally:
+    """
+    The number of matches and comparisons counted during a single evaluation.
+    """
+
+    def __init__(self):
+        self.matches = 0
+        self.comparisons = 0
+
+
 class AccuracyEvaluator:
     """
     A class for evaluating the accuracy of the comparison between two objects.
 
     Attributes:
         match_keys (list[str]): The list of keys to use for matching objects in a list.
-        total_matches (int): The total number of matches found.
-        total_comparisons (int): The total number of comparisons made.
         ignore_keys (list[str]): The list of keys to ignore during comparison.
+        list_matching (ListMatching): How expected list items are paired with actual list items.
     """
 
-    def __init__(self, match_keys: list[str] = None, ignore_keys: list[str] = None):
+    def __init__(self, match_keys: list[str] = None, ignore_keys: list[str] = None, list_matching: ListMatching = "greedy"):
         """
         Initializes a new instance of the AccuracyEvaluator class.
 
         Args:
             match_keys (list[str]): The list of keys to use for matching objects in a list.
             ignore_keys (list[str]): The list of keys to ignore during comparison.
+            list_matching (ListMatching): How expected list items are paired with actual list items.
+                'greedy' pairs each expected item with the first actual item that has the same match key value, or otherwise matches fully.
+                'optimal' pairs the items to maximize the total similarity of all pairs, also pairing items that only match partially.
+                Each value of a pair is counted once in the overall accuracy, whereas 'greedy' also counts the values of matched items again.
         """
 
         self.match_keys = match_keys or []
         self.ignore_keys = ignore_keys or []
-        self.total_matches = 0
-        self.total_comparisons = 0
+        self.list_matching = list_matching
 
+    @profiled("accuracy")
     def evaluate(self, expected, actual):
         """
         Evaluates the accuracy of the comparison between two objects.
 
+        The evaluator holds no state between evaluations, so one instance can be reused across documents and shared across threads.
+
         Args:
             expected: The expected object.
             actual: The actual object.
+
+        Returns:
+            dict: The accuracy of each value and the overall accuracy.
         """
 
-        accuracy = self._compare_objects(expected, actual)
-        if self.total_comparisons == 0:
+        tally = _Tally()
+        accuracy, _, _, _ = self._compare_document(expected, actual, tally)
+        if tally.comparisons == 0:
             overall_accuracy = 1.0  # If nothing to compare, treat as accurate
         else:
-            overall_accuracy = self.total_matches / self.total_comparisons
+            overall_accuracy = tally.matches / tally.comparisons
         return {'accuracy': accuracy, 'overall': overall_accuracy}
 
-    def _compare_objects(self, expected, actual):
+    def _compare_document(self, expected, actual, tally: _Tally) -> tuple[any, int, int, bool]:
+        return self._compare_objects(expected, actual, tally)
+
+    def _compare_objects(self, expected, actual, tally: _Tally) -> tuple[any, int, int, bool]:
+        """
+        Compares two objects in a single traversal.
+
+        Returns the accuracy tree, the number of matched and compared values in the tree, and whether every value in the tree matched,
+        so that matched list items do not have to be traversed again to be counted or checked.
+        """
+
         if isinstance(expected, dict):
             accuracy = {}
+            matches = 0
+            comparisons = 0
+            fully_matched = True
             for key, exp_val in expected.items():
                 if key in self.ignore_keys:
                     continue  # Skip keys that are in the ignore_keys list
                 act_val = actual.get(key) if isinstance(actual, dict) else None
-                accuracy[key] = self._compare_objects(exp_val, act_val)
-            return accuracy
+                accuracy[key], val_matches, val_comparisons, val_fully_matched = self._compare_objects(
+                    exp_val, act_val, tally)
+                matches += val_matches
+                comparisons += val_comparisons
+                fully_matched = fully_matched and val_fully_matched
+            return accuracy, matches, comparisons, fully_matched
 
         elif isinstance(expected, list):
             if not isinstance(actual, list):
                 # All expected items are mismatches
-                self.total_comparisons += len(expected)
-                return [0 for _ in expected]
-
-            accuracy_list = []
-            used_indices = set()  # To keep track of matched actual items
-
-            for exp_item in expected:
-                match_found = False
-                matched_accuracy = 0
-
-                # Attempt to match using the provided match_keys
-                if self.match_keys and isinstance(exp_item, dict):
-                    for key in self.match_keys:
-                        exp_key_val = exp_item.get(key)
-                        if exp_key_val is None:
-                            continue  # Skip if the expected item doesn't have this key
-
-                        # Search for a matching actual item based on the current key
-                        for idx, act_item in enumerate(actual):
-                            if idx in used_indices:
-                                continue  # Skip already matched items
-                            act_key_val = act_item.get(key) if isinstance(
-                                act_item, dict) else None
-                            if act_key_val is None:
-                                continue  # Skip if actual item doesn't have this key
-
-                            # For strings, perform case-insensitive comparison
-                            if isinstance(exp_key_val, str) and isinstance(act_key_val, str):
-                                key_match = exp_key_val.lower() == act_key_val.lower()
-                            else:
-                                key_match = exp_key_val == act_key_val
-                            if key_match:
-                                # Match found based on the current key
-                                matched_accuracy = self._compare_objects(
-                                    exp_item, act_item)
-                                used_indices.add(idx)
-                                match_found = True
-                                break
-                        if match_found:
-                            break  # Stop trying other keys once a match is found
-
-                if not match_found:
-                    # Attempt to match without specific keys
-                    for idx, act_item in enumerate(actual):
-                        if idx in used_indices:
-                            continue
-                        matched_accuracy = self._compare_objects(
-                            exp_item, act_item)
-                        if isinstance(matched_accuracy, int) and matched_accuracy == 1:
-                            used_indices.add(idx)
-                            match_found = True
-                            break
-                        elif isinstance(matched_accuracy, dict) or isinstance(matched_accuracy, list):
-                            # Define a match as fully matched (all sub-attributes matched)
-                            if self._is_fully_matched(matched_accuracy):
-                                used_indices.add(idx)
-                                match_found = True
-                                break
-
-                if match_found:
-                    if isinstance(matched_accuracy, int):
-                        accuracy_list.append(matched_accuracy)
-                        if matched_accuracy == 1:
-                            self.total_matches += 1
-                        self.total_comparisons += 1
-                    else:
-                        # matched_accuracy is dict or list
-                        accuracy_list.append(matched_accuracy)
-                        # Traverse matched_accuracy to count matches and comparisons
-                        matches, comparisons = self._count_matches(
-                            matched_accuracy)
-                        self.total_matches += matches
-                        self.total_comparisons += comparisons
-                else:
-                    # No matching actual item found
-                    accuracy_list.append(0)
-                    self.total_comparisons += 1
+                tally.comparisons += len(expected)
+                return [0 for _ in expected], 0, len(expected), not expected
 
-            return accuracy_list
+            if self.list_matching == "optimal":
+                return self._compare_lists_optimal(expected, actual, tally)
+            return self._compare_lists(expected, actual, tally)
 
         else:
             # Handle primitive values
-            self.total_comparisons += 1
-            if expected is None and actual is None:
-                self.total_matches += 1
-                return 1
-            if expected is None or actual is None:
-                return 0
-
-            # Handle strings (case-insensitive)
-            if isinstance(expected, str) and isinstance(actual, str):
-                if expected.lower() == actual.lower():
-                    self.total_matches += 1
-                    return 1
+            tally.comparisons += 1
+            if _values_match(expected, actual):
+                tally.matches += 1
+                return 1, 1, 1, True
+            return 0, 0, 1, False
+
+    def _compare_lists(
+        self,
+        expected: list,
+        actual: list,
+        tally: _Tally,
+        compare_item: Optional[Callable] = None
+    ) -> tuple[list, int, int, bool]:
+        compare_item = compare_item or self._compare_objects
+        accuracy_list = []
+        index = _ListIndex(actual)  # Tracks the matched actual items
+        matches = 0
+        comparisons = 0
+        fully_matched = True
+
+        for exp_item in expected:
+            match_found = False
+            comparison = None
+            match_idx = None
+
+            # Attempt to match using the provided match_keys
+            if self.match_keys and isinstance(exp_item, dict):
+                for key in self.match_keys:
+                    exp_key_val = exp_item.get(key)
+                    if exp_key_val is None:
+                        continue  # Skip if the expected item doesn't have this key
+
+                    match_idx = index.find_by_key(key, exp_key_val, self._key_match)
+                    if match_idx is not None:
+                        # Match found based on the current key
+                        comparison = compare_item(
+                            exp_item, actual[match_idx], tally)
+                        index.mark_used(match_idx)
+                        match_found = True
+                        break
+
+            if not match_found:
+                # Attempt to match without specific keys
+                paths = self._get_leaf_paths(exp_item)
+                if paths is not None:
+                    comparison = self._find_full_match(exp_item, paths, index, tally, compare_item)
+                    match_found = comparison is not None
                 else:
-                    return 0
+                    for idx in index.unused_indices():
+                        comparison = compare_item(
+                            exp_item, actual[idx], tally)
+                        # Define a match as fully matched (all sub-attributes matched)
+                        if comparison[3]:
+                            index.mark_used(idx)
+                            match_found = True
+                            break
 
-            # Handle other primitive types
-            if expected == actual:
-                self.total_matches += 1
-                return 1
+            if match_found:
+                self._add_matched_accuracy(accuracy_list, comparison, tally)
+                matches += comparison[1]
+                comparisons += comparison[2]
+                fully_matched = fully_matched and comparison[3]
             else:
-                return 0
-
-    def _is_fully_matched(self, accuracy):
-        if isinstance(accuracy, int):
-            return accuracy == 1
-        elif isinstance(accuracy, dict):
-            return all(self._is_fully_matched(v) for v in accuracy.values())
-        elif isinstance(accuracy, list):
-            return all(self._is_fully_matched(v) for v in accuracy)
-        else:
-            return False
+                # No matching actual item found
+                accuracy_list.append(0)
+                tally.comparisons += 1
+                comparisons += 1
+                fully_matched = False
 
-    def _count_matches(self, accuracy):
-        if isinstance(accuracy, int):
-            return (1 if accuracy == 1 else 0, 1)
-        elif isinstance(accuracy, dict):
-            matches = 0
-            comparisons = 0
-            for v in accuracy.values():
-                m, c = self._count_matches(v)
-                matches += m
-                comparisons += c
-            return (matches, comparisons)
-        elif isinstance(accuracy, list):
-            matches = 0
-            comparisons = 0
-            for v in accuracy:
-                m, c = self._count_matches(v)
-                matches += m
-                comparisons += c
-            return (matches, comparisons)
+        return accuracy_list, matches, comparisons, fully_matched
+
+    def _compare_lists_optimal(
+        self,
+        expected: list,
+        actual: list,
+        tally: _Tally,
+        compare_item: Optional[Callable] = None
+    ) -> tuple[list, int, int, bool]:
+        compare_item = compare_item or self._compare_objects
+        accuracy_list = []
+        assignment = {}
+        matches = 0
+        comparisons = 0
+        fully_matched = True
+
+        if expected and actual:
+            # Imported on first use, so that importing the evaluator for greedy matching does not load scipy
+            from scipy.optimize import linear_sum_assignment
+
+            similarity = self._get_similarity_matrix(expected, actual)
+            rows, cols = linear_sum_assignment(similarity, maximize=True)
+            assignment = {
+                row: col for row, col in zip(rows, cols) if similarity[row, col] > 0}
+
+        for exp_idx, exp_item in enumerate(expected):
+            if exp_idx in assignment:
+                # Each assigned pair is compared once, so its values are tallied once, by the comparison itself
+                comparison = compare_item(
+                    exp_item, actual[assignment[exp_idx]], tally)
+                accuracy_list.append(comparison[0])
+                matches += comparison[1]
+                comparisons += comparison[2]
+                fully_matched = fully_matched and comparison[3]
+            else:
+                # No similar actual item left to pair with
+                accuracy_list.append(0)
+                tally.comparisons += 1
+                comparisons += 1
+                fully_matched = False
+
+        return accuracy_list, matches, comparisons, fully_matched
+
+    def _get_similarity_matrix(self, expected: list, actual: list) -> np.ndarray:
+        """
+        Computes the similarity of every pair of expected and actual list items in one vectorized pass.
+
+        The similarity is the fraction of the expected item's values that match, plus a weight for each match_keys value that matches.
+        Values are encoded as integers so that all pairs are compared at once.
+        """
+
+        item_paths = [self._get_similarity_paths(exp_item) for exp_item in expected]
+        paths = list(dict.fromkeys(path for exp_paths in item_paths for path in exp_paths))
+        codes = {}
+
+        def encode(value: any) -> int:
+            return codes.setdefault(_get_fingerprint(value), len(codes))
+
+        # -1 marks the values that are not compared for an expected item, and never equals an encoded value
+        expected_codes = np.full((len(expected), len(paths)), -1, dtype=np.int64)
+        actual_codes = np.empty((len(actual), len(paths)), dtype=np.int64)
+        for path_idx, path in enumerate(paths):
+            for act_idx, act_item in enumerate(actual):
+                actual_codes[act_idx, path_idx] = encode(_get_value(act_item, path))
+
+        path_indices = {path: path_idx for path_idx, path in enumerate(paths)}
+        for exp_idx, (exp_item, exp_paths) in enumerate(zip(expected, item_paths)):
+            for path in exp_paths:
+                expected_codes[exp_idx, path_indices[path]] = encode(_get_value(exp_item, path))
+
+        matches = (expected_codes[:, None, :] == actual_codes[None, :, :]).sum(axis=2)
+        value_counts = np.array([len(exp_paths) for exp_paths in item_paths], dtype=np.float64)
+        similarity = np.where(
+            value_counts[:, None] > 0, matches / np.maximum(value_counts, 1)[:, None], 1.0)
+
+        for key in self.match_keys:
+            expected_keys = np.array([
+                encode(exp_item[key]) if isinstance(exp_item, dict) and exp_item.get(key) is not None else -1
+                for exp_item in expected], dtype=np.int64)
+            actual_keys = np.array([
+                encode(act_item[key]) if isinstance(act_item, dict) and act_item.get(key) is not None else -2
+                for act_item in actual], dtype=np.int64)
+            similarity += _MATCH_KEY_WEIGHT * (expected_keys[:, None] == actual_keys[None, :])
+
+        return similarity
+
+    def _get_similarity_paths(self, expected, path: tuple = ()) -> list[tuple]:
+        if isinstance(expected, dict):
+            paths = []
+            for key, exp_val in expected.items():
+                if key not in self.ignore_keys:
+                    paths.extend(self._get_similarity_paths(exp_val, path + (key,)))
+            return paths
+
+        # Lists are compared as a whole
+        return [path]
+
+    def _add_matched_accuracy(self, accuracy_list: list, comparison: tuple[any, int, int, bool], tally: _Tally):
+        # The matched item's values are tallied again from the counts of its comparison, without traversing its accuracy tree
+        matched_accuracy, matches, comparisons, _ = comparison
+        accuracy_list.append(matched_accuracy)
+        tally.matches += matches
+        tally.comparisons += comparisons
+
+    def _find_full_match(
+        self,
+        exp_item,
+        paths: tuple,
+        index: _ListIndex,
+        tally: _Tally,
+        compare_item: Callable
+    ) -> Optional[tuple[any, int, int, bool]]:
+        """
+        Finds the first unmatched actual item whose values all match the expected item, using a hash of the normalized values as a fingerprint.
+
+        The candidates compared before a match is found contribute to the tallies as if each had been fully compared, so that the result is
+        identical to comparing the candidates one by one.
+        """
+
+        vector = tuple(_normalize_value(_get_value(exp_item, path))
+                       for path in paths)
+        match_idx = index.find_full_match(paths, vector)
+
+        # Tally the values of the unmatched candidates before the match, or of all unmatched candidates if there is none
+        tally.comparisons += len(paths) * index.count_unused(match_idx)
+        tally.matches += sum(
+            index.count_unused_matches(path, value, match_idx) for path, value in zip(paths, vector))
+
+        if match_idx is None:
+            return None
+
+        comparison = compare_item(exp_item, index.items[match_idx], tally)
+        index.mark_used(match_idx)
+        return comparison
+
+    def _get_leaf_paths(self, expected, path: tuple = ()) -> Optional[tuple]:
+        """
+        Gets the paths of the values compared for an expected item, or None if the item contains a list or a value that cannot be fingerprinted.
+        """
+
+        if isinstance(expected, dict):
+            paths = []
+            for key, exp_val in expected.items():
+                if key in self.ignore_keys:
+                    continue
+                child_paths = self._get_leaf_paths(exp_val, path + (key,))
+                if child_paths is None:
+                    return None
+                paths.extend(child_paths)
+            return tuple(paths)
+
+        if isinstance(expected, list):
+            return None
+
+        try:
+            hash(expected)
+        except TypeError:
+            return None
+        return (path,)
+
+    @staticmethod
+    def _key_match(exp_key_val, act_key_val) -> bool:
+        # For strings, perform case-insensitive comparison
+        if isinstance(exp_key_val, str) and isinstance(act_key_val, str):
+            return exp_key_val.lower() == act_key_val.lower()
+        return exp_key_val == act_key_val
+
+
+class CompiledAccuracyEvaluator(AccuracyEvaluator):
+    """
+    A class for evaluating the accuracy of documents of a fixed Pydantic model, using a comparator compiled once from the model's JSON schema.
+
+    Objects that match the schema are compared field by field by generated code, without recursing on the type of each value.
+    Values that do not match the schema, e.g., a null nested object, are compared as by AccuracyEvaluator, so the results are identical.
+
+    Attributes:
+        model (type[BaseModel]): The Pydantic model of the compared documents.
+        match_keys (list[str]): The list of keys to use for matching objects in a list.
+        ignore_keys (list[str]): The list of keys to ignore during comparison.
+        list_matching (ListMatching): How expected list items are paired with actual list items.
+    """
+
+    def __init__(
+        self,
+        model: type[BaseModel],
+        match_keys: list[str] = None,
+        ignore_keys: list[str] = None,
+        list_matching: ListMatching = "greedy"
+    ):
+        """
+        Initializes a new instance of the CompiledAccuracyEvaluator class.
+
+        Args:
+            model (type[BaseModel]): The Pydantic model of the compared documents, e.g., Invoice.
+            match_keys (list[str]): The list of keys to use for matching objects in a list.
+            ignore_keys (list[str]): The list of keys to ignore during comparison.
+            list_matching (ListMatching): How expected list items are paired with actual list items.
+        """
+
+        super().__init__(match_keys, ignore_keys, list_matching)
+        self.model = model
+        self._ignore_keys = tuple(sorted(self.ignore_keys))
+
+        # Compile the comparator up front rather than when the first document is compared
+        _get_comparator(self.model, self._ignore_keys)
+
+    def _compare_document(self, expected, actual, tally: _Tally) -> tuple[any, int, int, bool]:
+        return _get_comparator(self.model, self._ignore_keys)(self, expected, actual, tally)
+
+    def _compare_list(self, expected: list, actual: list, tally: _Tally, compare_item: Optional[Callable]) -> tuple[list, int, int, bool]:
+        if compare_item is not None:
+            compare_item = partial(compare_item, self)
+        if self.list_matching == "optimal":
+            return self._compare_lists_optimal(expected, actual, tally, compare_item)
+        return self._compare_lists(expected, actual, tally, compare_item)
+
+
+@lru_cache(maxsize=None)
+def _get_comparator(model: type[BaseModel], ignore_keys: tuple[str, ...]) -> Callable:
+    return _compile_comparator(get_schema_plan(model, list(ignore_keys)), model.__name__)
+
+
+def _compile_comparator(plan: SchemaPlan, name: str) -> Callable:
+    """
+    Generates and compiles a function that compares an object of a schema plan field by field, with the same results as AccuracyEvaluator.
+
+    The function takes the evaluator, whose generic comparison is used for values that do not match the schema and whose list matching
+    is used for lists, followed by the expected object, the actual object, and the tally.
+    Objects are only compared field by field if their keys are in schema order, so that their accuracy has the same key order as the expected object.
+    """
+
+    namespace = {'_EMPTY': _EMPTY, '_KEYS_0': plan.keys}
+    lines = [
+        "def compare(evaluator, expected, actual, tally):",
+        "    if not isinstance(expected, dict) or tuple(expected) != _KEYS_0:",
+        "        return evaluator._compare_objects(expected, actual, tally)",
+        "    expected_0 = expected",
+        "    actual_0 = actual if isinstance(actual, dict) else _EMPTY",
+        "    matches = comparisons = value_matches = value_comparisons = 0",
+        "    fully_matched = True"
+    ]
+    children = _compile_fields(plan.fields, 0, len(plan.fields), 1, name, lines, namespace)
+    lines += [
+        "    tally.matches += value_matches",
+        "    tally.comparisons += value_comparisons",
+        f"    return {_get_tree_source(children)}, matches + value_matches, comparisons + value_comparisons, fully_matched"
+    ]
+
+    exec(compile("\n".join(lines), f"<{name} comparator>", "exec"), namespace)
+    return namespace['compare']
+
+
+def _get_tree_source(children: list[tuple[str, str]]) -> str:
+    return "{" + ", ".join(f"{key}: {value}" for key, value in children) + "}"
+
+
+def _compile_fields(
+    fields: list,
+    start: int,
+    stop: int,
+    depth: int,
+    name: str,
+    lines: list[str],
+    namespace: dict
+) -> list[tuple[str, str]]:
+    """
+    Generates the comparison of the fields of an object, storing the accuracy of each field in a local variable.
+
+    Returns:
+        list[tuple[str, str]]: The source of the key and the variable of each field, to build the object's accuracy from.
+    """
+
+    indent = "    " * depth
+    children = []
+    idx = start
+    while idx < stop:
+        field = fields[idx]
+        key = repr(field.key)
+        parent = field.parent + 1
+        number = idx + 1
+        tree = f"tree_{number}"
+        children.append((key, tree))
+        lines += [
+            f"{indent}expected_value = expected_{parent}[{key}]",
+            f"{indent}actual_value = actual_{parent}.get({key})"
+        ]
+
+        if field.kind == "object":
+            namespace[f'_KEYS_{number}'] = field.keys
+            lines += [
+                f"{indent}if isinstance(expected_value, dict) and tuple(expected_value) == _KEYS_{number}:",
+                f"{indent}    expected_{number} = expected_value",
+                f"{indent}    actual_{number} = actual_value if isinstance(actual_value, dict) else _EMPTY"
+            ]
+            object_children = _compile_fields(fields, idx + 1, idx + 1 + field.descendants, depth + 1, name, lines, namespace)
+            lines.append(f"{indent}    {tree} = {_get_tree_source(object_children)}")
+        elif field.kind == "list":
+            namespace[f'_ITEMS_{number}'] = _compile_comparator(
+                field.items, f"{name}.{field.key}") if field.items is not None else None
+            lines += [
+                f"{indent}if isinstance(expected_value, list) and isinstance(actual_value, list):",
+                f"{indent}    {tree}, field_matches, field_comparisons, field_fully_matched = evaluator._compare_list(",
+                f"{indent}        expected_value, actual_value, tally, _ITEMS_{number})",
+                f"{indent}    matches += field_matches",
+                f"{indent}    comparisons += field_comparisons",
+                f"{indent}    fully_matched = fully_matched and field_fully_matched"
+            ]
         else:
-            return (0, 0)
+            lines += [
+                f"{indent}if not isinstance(expected_value, (dict, list)):",
+                f"{indent}    value_comparisons += 1",
+                f"{indent}    if expected_value is None or actual_value is None:",
+                f"{indent}        matched = expected_value is actual_value",
+                f"{indent}    elif isinstance(expected_value, str) and isinstance(actual_value, str):",
+                f"{indent}        matched = expected_value.lower() == actual_value.lower()",
+                f"{indent}    else:",
+                f"{indent}        matched = expected_value == actual_value",
+                f"{indent}    if matched:",
+                f"{indent}        value_matches += 1",
+                f"{indent}        {tree} = 1",
+                f"{indent}    else:",
+                f"{indent}        fully_matched = False",
+                f"{indent}        {tree} = 0"
+            ]
+
+        # Values that do not match the schema are compared generically, including the fields nested in them
+        lines += [
+            f"{indent}else:",
+            f"{indent}    {tree}, field_matches, field_comparisons, field_fully_matched = evaluator._compare_objects(",
+            f"{indent}        expected_value, actual_value, tally)",
+            f"{indent}    matches += field_matches",
+            f"{indent}    comparisons += field_comparisons",
+            f"{indent}    fully_matched = fully_matched and field_fully_matched"
+        ]
+        idx += field.descendants + 1
+
+    return children
@@ -0,0 +1,369 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Literal, Optional
+import numpy as np
+
+from samples.evaluation.accuracy_evaluator import CompiledAccuracyEvaluator
+from samples.evaluation.corpus_evaluation import merge_accuracy_results
+from samples.models.document_processing_result import DataExtractionResult
+from samples.models.invoice import Invoice
+from samples.models.vehicle_insurance_policy import VehicleInsurancePolicy
+from samples.pipelines.extraction_pipeline import ExtractionPipeline
+from samples.pipelines.recorded_clients import RecordedChatCompletionsClient, RecordedDocumentIntelligenceClient
+from samples.utils.profiling import PROFILE_MODES, get_profiler
+from samples.utils.results_sink import JsonlResultSink
+from samples.utils.storage_utils import create_json_file
+from samples.utils.tracing import get_tracer
+
+PipelineKind = Literal["text", "vision", "multimodal"]
+RunMode = Literal["live", "record", "replay"]
+ResultsFormat = Literal["json", "jsonl"]
+
+SCHEMAS = {
+    "invoice": {
+        "response_format": Invoice,
+        "match_keys": ['product_code', 'description'],
+        "user_prompt": """Extract the data from this invoice.
+- If a value is not present, provide null.
+- Dates should be in the format YYYY-MM-DD."""
+    },
+    "vehicle_insurance": {
+        "response_format": VehicleInsurancePolicy,
+        "match_keys": [],
+        "user_prompt": """Extract the data from this insurance policy.
+- If a value is not present, provide null.
+- Some values must be inferred based on the rules defined in the policy.
+- Dates should be in the format YYYY-MM-DD."""
+    }
+}
+
+
+def load_asset_documents(assets_dir: str) -> list[tuple[str, dict]]:
+    """
+    Loads the documents and their expected values from an asset folder, e.g., 'samples/assets/invoices'.
+
+    Each metadata JSON file in the folder contains the 'fname' of the PDF and its 'expected' (or '0_expected') values.
+
+    Args:
+        assets_dir: The asset folder to load.
+
+    Returns:
+        list[tuple[str, dict]]: The PDF file path and expected values of each document, ordered by file name.
+    """
+
+    documents = []
+    for fname in sorted(os.listdir(assets_dir)):
+        if not fname.endswith('.json'):
+            continue
+
+        with open(os.path.join(assets_dir, fname), 'r') as f:
+            metadata = json.load(f)
+
+        expected = metadata.get('expected', metadata.get('0_expected'))
+        documents.append(
+            (os.path.join(assets_dir, metadata['fname']), expected))
+
+    return documents
+
+
+def summarize_results(
+    results: dict[str, DataExtractionResult],
+    wall_time: float,
+    errors: Optional[dict[str, str]] = None
+) -> dict:
+    """
+    Summarizes the accuracy, confidence, latency, and throughput of a batch of extraction results.
+
+    Args:
+        results: The extraction results, keyed by document file name.
+        wall_time: The total elapsed time of the batch in seconds.
+        errors: The errors of documents that failed, keyed by document file name.
+
+    Returns:
+        dict: The summary of the batch.
+    """
+
+    latencies = [result.execution_time for result in results.values()]
+    accuracies = [
+        result.accuracy['overall'] for result in results.values() if result.accuracy]
+    corpus_accuracy = merge_accuracy_results({
+        name: result.accuracy for name, result in results.items() if result.accuracy})
+    confidences = [
+        result.confidence['_overall'] for result in results.values() if result.confidence]
+    prompt_tokens = sum(
+        result.prompt_tokens or 0 for result in results.values())
+    completion_tokens = sum(
+        result.completion_tokens or 0 for result in results.values())
+
+    def percentile(values: list[float], q: float) -> Optional[float]:
+        return float(np.percentile(values, q)) if values else None
+
+    def mean(values: list[float]) -> Optional[float]:
+        return float(np.mean(values)) if values else None
+
+    return {
+        'documents': len(results),
+        'failed_documents': len(errors or {}),
+        'errors': errors or {},
+        'accuracy': mean(accuracies),
+        'corpus_accuracy': corpus_accuracy.overall if accuracies else None,
+        'field_accuracy': corpus_accuracy.fields,
+        'confidence': mean(confidences),
+        'latency': {
+            'mean': mean(latencies),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99)
+        },
+        'wall_time': wall_time,
+        'docs_per_second': len(results) / wall_time if wall_time else None,
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'tokens_per_second': (prompt_tokens + completion_tokens) / wall_time if wall_time else None
+    }
+
+
+async def run_batch_evaluation(
+    pipeline: ExtractionPipeline,
+    documents: list[tuple[str, dict]],
+    output_dir: Optional[str] = None,
+    results_format: ResultsFormat = "json"
+) -> tuple[dict[str, DataExtractionResult], dict]:
+    """
+    Runs an extraction pipeline over a batch of documents and summarizes the results.
+
+    Args:
+        pipeline: The extraction pipeline to run, configured with the required concurrency.
+        documents: The PDF file path and expected values of each document.
+        output_dir: The directory to write each document's result and the summary to, if provided, and the profiles and spans if profiling or tracing is enabled.
+        results_format: Whether each document's result is written to its own JSON file, or appended to the JSON Lines shards of a JsonlResultSink in the 'results' folder of the output directory.
+
+    Returns:
+        tuple[dict[str, DataExtractionResult], dict]: The extraction results keyed by document file name, and the summary.
+    """
+
+    profiler = get_profiler()
+    start = time.perf_counter()
+    with profiler.sampling():
+        outcomes = await pipeline.run_many(
+            [pdf_fpath for pdf_fpath, _ in documents],
+            [expected for _, expected in documents],
+            return_exceptions=True
+        )
+    wall_time = time.perf_counter() - start
+
+    results = {}
+    errors = {}
+    for (pdf_fpath, _), outcome in zip(documents, outcomes):
+        pdf_fname = os.path.basename(pdf_fpath)
+        if isinstance(outcome, BaseException):
+            errors[pdf_fname] = repr(outcome)
+        else:
+            results[pdf_fname] = outcome
+
+    summary = summarize_results(results, wall_time, errors)
+
+    if output_dir:
+        if results_format == "jsonl":
+            with JsonlResultSink(os.path.join(output_dir, "results")) as sink:
+                for pdf_fname, result in results.items():
+                    sink.write(pdf_fname, result)
+        else:
+            for pdf_fname, result in results.items():
+                # The results include the matching lines of each field's confidence, which are large and only written compactly
+                create_json_file(os.path.join(
+                    output_dir, f"{pdf_fname}.json"), result, compact=True)
+        create_json_file(os.path.join(output_dir, "summary.json"), summary)
+
+        if profiler.enabled:
+            profiler.dump(os.path.join(output_dir, "profiles"))
+
+        if pipeline.tracer.enabled:
+            pipeline.tracer.dump(os.path.join(output_dir, "traces"))
+
+    return results, summary
+
+
+def create_pipeline(
+    schema: str,
+    pipeline_kind: PipelineKind = "multimodal",
+    mode: RunMode = "live",
+    recordings_dir: Optional[str] = None,
+    max_concurrency: int = 4,
+    env_fpath: str = ".env",
+    replay_latency: bool = False,
+    mock_endpoint: Optional[str] = None,
+    pages_per_shard: Optional[int] = None
+) -> ExtractionPipeline:
+    """
+    Creates an extraction pipeline for one of the sample schemas, using live, recording, or replaying service clients.
+
+    Args:
+        schema: The sample schema to extract, one of the keys of SCHEMAS.
+        pipeline_kind: Whether the prompt includes the document text ('text'), the page images ('vision'), or both ('multimodal').
+        mode: Whether to call the live services, record their responses, or replay recorded responses offline.
+        recordings_dir: The directory the recordings are stored in. Required for 'record' and 'replay' modes.
+        max_concurrency: The maximum number of documents processed concurrently.
+        env_fpath: The path of the environment file with the Azure resource settings. Not used in 'replay' mode.
+        replay_latency: Whether replays wait for the originally recorded latency.
+        mock_endpoint: The endpoint of a MockServiceServer to call instead of the Azure resources in 'live' mode, e.g., 'http://127.0.0.1:8080'.
+        pages_per_shard: The maximum number of pages analyzed together by Azure AI Document Intelligence, with longer documents sharded.
+
+    Returns:
+        ExtractionPipeline: The configured extraction pipeline.
+    """
+
+    schema_config = SCHEMAS[schema]
+    include_markdown = pipeline_kind in ("text", "multimodal")
+    deployment = "replay"
+    openai_client = None
+    document_intelligence_client = None
+    credential = None
+
+    if mode == "live" and mock_endpoint:
+        from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+        from azure.core.credentials import AzureKeyCredential
+        from openai import AsyncAzureOpenAI
+
+        deployment = "mock"
+        openai_client = AsyncAzureOpenAI(
+            azure_endpoint=mock_endpoint,
+            api_key="mock",
+            api_version="2024-10-21"
+        )
+
+        if include_markdown:
+            document_intelligence_client = DocumentIntelligenceClient(
+                endpoint=mock_endpoint,
+                credential=AzureKeyCredential("mock"),
+                polling_interval=0.1
+            )
+    elif mode != "replay":
+        from dotenv import dotenv_values
+        from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+        from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
+        from openai import AsyncAzureOpenAI
+        from samples.app_settings import AppSettings
+
+        settings = AppSettings(dotenv_values(env_fpath))
+        deployment = settings.azure_openai_chat_deployment
+        credential = DefaultAzureCredential(
+            exclude_workload_identity_credential=True,
+            exclude_developer_cli_credential=True,
+            exclude_environment_credential=True,
+            exclude_managed_identity_credential=True,
+            exclude_powershell_credential=True,
+            exclude_shared_token_cache_credential=True,
+            exclude_interactive_browser_credential=True
+        )
+
+        openai_client = AsyncAzureOpenAI(
+            azure_endpoint=settings.azure_openai_endpoint,
+            azure_ad_token_provider=get_bearer_token_provider(
+                credential, 'https://cognitiveservices.azure.com/.default'),
+            api_version=settings.azure_openai_api_version
+        )
+
+        if include_markdown:
+            document_intelligence_client = DocumentIntelligenceClient(
+                endpoint=settings.azure_ai_services_endpoint,
+                credential=credential
+            )
+
+    if mode != "live":
+        if not recordings_dir:
+            raise ValueError(
+                "A recordings_dir is required in 'record' and 'replay' modes")
+
+        openai_client = RecordedChatCompletionsClient(
+            recordings_dir, mode, openai_client, replay_latency)
+        if include_markdown:
+            document_intelligence_client = RecordedDocumentIntelligenceClient(
+                recordings_dir, mode, document_intelligence_client, replay_latency)
+
+    return ExtractionPipeline(
+        openai_client=openai_client,
+        deployment=deployment,
+        response_format=schema_config["response_format"],
+        user_prompt=schema_config["user_prompt"],
+        document_intelligence_client=document_intelligence_client,
+        include_markdown=include_markdown,
+        include_images=pipeline_kind in ("vision", "multimodal"),
+        evaluator=CompiledAccuracyEvaluator(
+            schema_config["response_format"], match_keys=schema_config["match_keys"]),
+        max_concurrency=max_concurrency,
+        pages_per_shard=pages_per_shard,
+        credential=credential
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Runs a data extraction pipeline over an asset folder and reports accuracy, confidence, latency, and throughput.")
+    parser.add_argument("assets_dir",
+                        help="The asset folder to evaluate, e.g., samples/assets/invoices.")
+    parser.add_argument("--schema", choices=SCHEMAS.keys(), required=True,
+                        help="The sample schema to extract.")
+    parser.add_argument("--pipeline", choices=["text", "vision", "multimodal"], default="multimodal",
+                        help="Whether the prompt includes the document text, the page images, or both.")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="The maximum number of documents processed concurrently.")
+    parser.add_argument("--mode", choices=["live", "record", "replay"], default="live",
+                        help="Whether to call the live services, record their responses, or replay recorded responses offline.")
+    parser.add_argument("--recordings-dir",
+                        help="The directory the recordings are stored in.")
+    parser.add_argument("--replay-latency", action="store_true",
+                        help="Whether replays wait for the originally recorded latency.")
+    parser.add_argument("--output-dir",
+                        help="The directory to write each document's result and the summary to.")
+    parser.add_argument("--results-format", choices=["json", "jsonl"], default="json",
+                        help="Whether each document's result is written to its own JSON file, or to JSON Lines shards for large batches.")
+    parser.add_argument("--pages-per-shard", type=int,
+                        help="The maximum number of pages analyzed together by Azure AI Document Intelligence, with the page ranges of longer documents analyzed concurrently.")
+    parser.add_argument("--profile", nargs="+", choices=PROFILE_MODES,
+                        help="The profiling modes to enable, overriding the SAMPLES_PROFILE environment variable. The profiles are written to the 'profiles' folder of the output directory.")
+    parser.add_argument("--trace", action="store_true",
+                        help="Whether to record a span for each document and stage, overriding the SAMPLES_TRACING environment variable. The spans are written to the 'traces' folder of the output directory as OTLP JSON, folded stacks, and a summary.")
+    parser.add_argument("--mock-endpoint",
+                        help="The endpoint of a local mock service server to call instead of the Azure resources.")
+    parser.add_argument("--env-file", default=".env",
+                        help="The path of the environment file with the Azure resource settings.")
+    args = parser.parse_args()
+
+    if args.profile:
+        get_profiler().set_modes(args.profile)
+
+    if args.trace:
+        get_tracer().enabled = True
+
+    pipeline = create_pipeline(
+        args.schema,
+        pipeline_kind=args.pipeline,
+        mode=args.mode,
+        recordings_dir=args.recordings_dir,
+        max_concurrency=args.concurrency,
+        env_fpath=args.env_file,
+        replay_latency=args.replay_latency,
+        mock_endpoint=args.mock_endpoint,
+        pages_per_shard=args.pages_per_shard
+    )
+
+    async def evaluate() -> dict:
+        # The clients are closed in the event loop of their sessions, before asyncio.run closes it
+        try:
+            _, summary = await run_batch_evaluation(
+                pipeline, load_asset_documents(args.assets_dir), args.output_dir, args.results_format)
+            return summary
+        finally:
+            await pipeline.aclose()
+
+    summary = asyncio.run(evaluate())
+
+    print(json.dumps(summary, indent=4))
+
+
+if __name__ == "__main__":
+    main()
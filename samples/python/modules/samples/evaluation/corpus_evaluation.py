@@ -0,0 +1,170 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from samples.evaluation.accuracy_evaluator import AccuracyEvaluator
+
+
+class CorpusAccuracy:
+    """
+    A class representing the accuracy of a data extraction technique across a corpus of documents.
+
+    Attributes:
+        documents (dict[str, dict]): The accuracy evaluation of each document, keyed by document name.
+        matches (int): The number of matched values across all documents, counting each value of the accuracy of each document once.
+        comparisons (int): The number of values across all documents, counted as for matches.
+        overall (float): The fraction of matched values across all documents, weighting each document by its number of values, as for fields.
+        mean_document_accuracy (float): The mean of the overall accuracy of each document, weighting each document equally.
+        fields (dict[str, float]): The fraction of matched values of each top-level field across all documents.
+    """
+
+    def __init__(
+        self,
+        documents: dict[str, dict],
+        field_counts: dict[str, tuple[int, int]]
+    ):
+        """
+        Initializes a new instance of the CorpusAccuracy class.
+
+        Args:
+            documents: The accuracy evaluation of each document, keyed by document name.
+            field_counts: The number of matched values and the number of values of each top-level field across all documents.
+        """
+
+        self.documents = documents
+        self.matches = sum(matched for matched, _ in field_counts.values())
+        self.comparisons = sum(total for _, total in field_counts.values())
+        self.overall = self.matches / self.comparisons if self.comparisons else 1.0
+        self.mean_document_accuracy = sum(
+            result['overall'] for result in documents.values()) / len(documents) if documents else 1.0
+        self.fields = {
+            field: matched / total if total else 1.0
+            for field, (matched, total) in field_counts.items()
+        }
+
+    def to_dict(self) -> dict:
+        """
+        Converts the CorpusAccuracy object to a dictionary.
+
+        Returns:
+            dict: The CorpusAccuracy object as a dictionary.
+        """
+
+        return {
+            'overall': self.overall,
+            'mean_document_accuracy': self.mean_document_accuracy,
+            'matches': self.matches,
+            'comparisons': self.comparisons,
+            'fields': self.fields,
+            'documents': self.documents
+        }
+
+
+def _count_values(accuracy: any) -> tuple[int, int]:
+    if isinstance(accuracy, dict):
+        counts = [_count_values(value) for value in accuracy.values()]
+    elif isinstance(accuracy, list):
+        counts = [_count_values(value) for value in accuracy]
+    else:
+        return (1 if accuracy == 1 else 0, 1)
+
+    return (sum(matched for matched, _ in counts), sum(total for _, total in counts))
+
+
+def _get_field_counts(result: dict) -> dict[str, tuple[int, int]]:
+    accuracy = result['accuracy']
+    if not isinstance(accuracy, dict):
+        return {}
+    return {field: _count_values(value) for field, value in accuracy.items()}
+
+
+def _merge_field_counts(
+    field_counts: dict[str, tuple[int, int]],
+    document_field_counts: dict[str, tuple[int, int]]
+):
+    for field, (matched, total) in document_field_counts.items():
+        corpus_matched, corpus_total = field_counts.get(field, (0, 0))
+        field_counts[field] = (corpus_matched + matched, corpus_total + total)
+
+
+def _evaluate_document(
+    evaluator: AccuracyEvaluator,
+    expected: dict,
+    actual: dict
+) -> tuple[dict, dict[str, tuple[int, int]]]:
+    result = evaluator.evaluate(expected, actual)
+    return result, _get_field_counts(result)
+
+
+def merge_accuracy_results(results: dict[str, dict]) -> CorpusAccuracy:
+    """
+    Merges the accuracy evaluations of many documents, e.g., from the results of a batch extraction, into the accuracy of the corpus.
+
+    Args:
+        results: The result of AccuracyEvaluator.evaluate for each document, keyed by document name.
+
+    Returns:
+        CorpusAccuracy: The accuracy of the corpus.
+    """
+
+    field_counts = {}
+    for result in results.values():
+        _merge_field_counts(field_counts, _get_field_counts(result))
+
+    return CorpusAccuracy(results, field_counts)
+
+
+def evaluate_corpus(
+    evaluator: AccuracyEvaluator,
+    documents: dict[str, tuple[dict, dict]],
+    max_workers: Optional[int] = None,
+    use_processes: bool = True,
+    executor: Optional[Executor] = None
+) -> CorpusAccuracy:
+    """
+    Evaluates the accuracy of many documents in parallel workers and merges the results into the accuracy of the corpus.
+
+    The same evaluator is shared by all documents. Each worker evaluates a chunk of documents and counts their field values,
+    so that only the per-document results are merged.
+
+    Args:
+        evaluator: The evaluator to evaluate each document with.
+        documents: The expected and actual values of each document, keyed by document name.
+        max_workers: The maximum number of workers. Defaults to the number of CPUs.
+        use_processes: Whether to evaluate in worker processes, which run in parallel, rather than threads.
+        executor: An existing executor to evaluate in, instead of creating one.
+
+    Returns:
+        CorpusAccuracy: The accuracy of the corpus.
+    """
+
+    names = list(documents)
+    if not names:
+        return CorpusAccuracy({}, {})
+
+    max_workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(names) // (max_workers * 4))
+
+    def evaluate(pool: Executor) -> list[tuple[dict, dict[str, tuple[int, int]]]]:
+        return list(pool.map(
+            _evaluate_document,
+            [evaluator] * len(names),
+            [documents[name][0] for name in names],
+            [documents[name][1] for name in names],
+            chunksize=chunksize
+        ))
+
+    if executor is not None:
+        outcomes = evaluate(executor)
+    else:
+        pool_type = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with pool_type(max_workers=max_workers) as pool:
+            outcomes = evaluate(pool)
+
+    results = {}
+    field_counts = {}
+    for name, (result, document_field_counts) in zip(names, outcomes):
+        results[name] = result
+        _merge_field_counts(field_counts, document_field_counts)
+
+    return CorpusAccuracy(results, field_counts)
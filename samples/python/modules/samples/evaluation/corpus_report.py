@@ -0,0 +1,206 @@
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+from samples.models.document_processing_result import DataExtractionResult
+from samples.utils.value_utils import flatten_confidence, iter_flatten_fields
+
+
+class CorpusReport:
+    """
+    A class representing the field-level comparison of the extraction results of a corpus of documents as columnar DataFrames.
+
+    Attributes:
+        fields (pd.DataFrame): One row per field of each document, with 'doc', 'field', 'schema_field', 'expected', 'extracted', 'confidence', and 'match' columns.
+            Fields are named as by flatten_dict, e.g., 'items_0_description', and 'schema_field' replaces list indices with '*', e.g., 'items_*_description'.
+        documents (pd.DataFrame): One row per document, with 'doc', 'accuracy', 'confidence', 'execution_time', 'prompt_tokens', and 'completion_tokens' columns.
+        stages (pd.DataFrame): One row per stage of each document, with 'doc', 'stage', and 'seconds' columns.
+    """
+
+    def __init__(
+        self,
+        fields: pd.DataFrame,
+        documents: pd.DataFrame,
+        stages: pd.DataFrame
+    ):
+        """
+        Initializes a new instance of the CorpusReport class.
+
+        Args:
+            fields: One row per field of each document.
+            documents: One row per document.
+            stages: One row per stage of each document.
+        """
+
+        self.fields = fields
+        self.documents = documents
+        self.stages = stages
+
+    def field_accuracy(self, by: str = 'schema_field') -> pd.DataFrame:
+        """
+        Computes the accuracy and mean confidence of each field across all documents.
+
+        Args:
+            by: The column to group the fields by, either 'schema_field' to combine the items of lists, or 'field'.
+
+        Returns:
+            pd.DataFrame: The 'accuracy', 'confidence', and number of compared 'fields' of each field, sorted by ascending accuracy.
+        """
+
+        return self.fields.groupby(by, observed=True).agg(
+            accuracy=('match', 'mean'),
+            confidence=('confidence', 'mean'),
+            fields=('match', 'count')
+        ).sort_values('accuracy')
+
+    def confidence_calibration(self, bins: int = 10) -> pd.DataFrame:
+        """
+        Computes how well the confidence of fields predicts their accuracy, by grouping the compared fields into equal-width confidence bins.
+
+        Args:
+            bins: The number of confidence bins between 0 and 1.
+
+        Returns:
+            pd.DataFrame: The mean 'confidence', the 'accuracy', and the number of 'fields' in each non-empty bin.
+        """
+
+        compared = self.fields.dropna(subset=['confidence', 'match'])
+        confidence_bins = pd.cut(compared['confidence'], np.linspace(0.0, 1.0, bins + 1), include_lowest=True)
+        return compared.groupby(confidence_bins, observed=True).agg(
+            confidence=('confidence', 'mean'),
+            accuracy=('match', 'mean'),
+            fields=('match', 'count')
+        )
+
+    def expected_calibration_error(self, bins: int = 10) -> float:
+        """
+        Computes the expected calibration error, the mean absolute difference between the confidence and accuracy of each bin weighted by its number of fields.
+
+        Args:
+            bins: The number of confidence bins between 0 and 1.
+
+        Returns:
+            float: The expected calibration error, between 0 for perfectly calibrated confidence and 1.
+        """
+
+        calibration = self.confidence_calibration(bins)
+        if calibration.empty:
+            return 0.0
+
+        weights = calibration['fields'] / calibration['fields'].sum()
+        return float((weights * (calibration['accuracy'] - calibration['confidence']).abs()).sum())
+
+    def latency(self, percentiles: tuple[float, ...] = (50, 95, 99)) -> pd.DataFrame:
+        """
+        Computes the latency percentiles of each stage and of the whole extraction across all documents.
+
+        Args:
+            percentiles: The percentiles to compute, between 0 and 100.
+
+        Returns:
+            pd.DataFrame: The 'mean' and percentile columns, e.g., 'p95', in seconds, of each stage and of the 'total' execution time.
+        """
+
+        total = pd.DataFrame({
+            'stage': 'total',
+            'seconds': self.documents['execution_time']
+        })
+        timings = pd.concat([self.stages[['stage', 'seconds']], total], ignore_index=True).dropna()
+        grouped = timings.groupby('stage', sort=False)['seconds']
+
+        latency = grouped.mean().to_frame('mean')
+        for percentile in percentiles:
+            latency[f'p{percentile:g}'] = grouped.quantile(percentile / 100)
+        return latency
+
+
+def build_corpus_report(
+    results: dict[str, DataExtractionResult],
+    expected: Optional[dict[str, dict]] = None
+) -> CorpusReport:
+    """
+    Flattens the extraction results of a corpus of documents into one columnar report, e.g., the results of a batch evaluation.
+
+    Each result is flattened once into column lists, so that per-field accuracy, confidence calibration, and latency are computed with
+    vectorized groupbys across the corpus rather than per document.
+
+    Args:
+        results: The extraction results, keyed by document name.
+        expected: The expected values of each document, keyed by document name, if available.
+
+    Returns:
+        CorpusReport: The field-level comparison of the corpus.
+    """
+
+    expected = expected or {}
+    docs = []
+    fields = []
+    schema_fields = []
+    expected_values = []
+    extracted_values = []
+    confidences = []
+    matches = []
+    stage_docs = []
+    stage_names = []
+    stage_seconds = []
+
+    for doc, result in results.items():
+        expected_flat = {
+            field: (schema_field, value) for field, schema_field, value in iter_flatten_fields(expected.get(doc) or {})}
+        extracted_flat = {
+            field: (schema_field, value) for field, schema_field, value in iter_flatten_fields(result.data or {})}
+        accuracy_flat = {
+            field: value for field, _, value in iter_flatten_fields((result.accuracy or {}).get('accuracy') or {})}
+        confidence_flat = flatten_confidence(result.confidence or {})
+
+        # Expected fields first, followed by the fields that were only extracted
+        for field in {**expected_flat, **extracted_flat}:
+            schema_field, expected_value = expected_flat.get(field, (None, None))
+            extracted_schema_field, extracted_value = extracted_flat.get(field, (None, None))
+            accuracy = accuracy_flat.get(field)
+
+            docs.append(doc)
+            fields.append(field)
+            schema_fields.append(schema_field or extracted_schema_field)
+            expected_values.append(expected_value)
+            extracted_values.append(extracted_value)
+            confidences.append(confidence_flat.get(field))
+            matches.append(None if accuracy is None else accuracy == 1)
+
+        for stage, seconds in (result.stage_timings or {}).items():
+            stage_docs.append(doc)
+            stage_names.append(stage)
+            stage_seconds.append(seconds)
+
+    fields_df = pd.DataFrame({
+        'doc': pd.Categorical(docs),
+        'field': pd.Categorical(fields),
+        'schema_field': pd.Categorical(schema_fields),
+        'expected': pd.Series(expected_values, dtype=object),
+        'extracted': pd.Series(extracted_values, dtype=object),
+        'confidence': pd.Series(confidences, dtype='float64'),
+        'match': pd.array(matches, dtype='boolean')
+    })
+
+    documents_df = pd.DataFrame({
+        'doc': list(results),
+        'accuracy': [(result.accuracy or {}).get('overall') for result in results.values()],
+        'confidence': [(result.confidence or {}).get('_overall') for result in results.values()],
+        'execution_time': [result.execution_time for result in results.values()],
+        'prompt_tokens': [result.prompt_tokens for result in results.values()],
+        'completion_tokens': [result.completion_tokens for result in results.values()]
+    }).astype({
+        'accuracy': 'float64',
+        'confidence': 'float64',
+        'execution_time': 'float64',
+        'prompt_tokens': 'Int64',
+        'completion_tokens': 'Int64'
+    })
+
+    stages_df = pd.DataFrame({
+        'doc': pd.Categorical(stage_docs),
+        'stage': pd.Categorical(stage_names),
+        'seconds': pd.Series(stage_seconds, dtype='float64')
+    })
+
+    return CorpusReport(fields_df, documents_df, stages_df)
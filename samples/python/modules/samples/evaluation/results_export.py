@@ -0,0 +1,183 @@
+from typing import Iterable, Optional, Union
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from samples.models.document_processing_result import (
+    DataClassificationResult,
+    DataExtractionResult,
+    DataRedactionResult
+)
+from samples.utils.json_utils import dumps_json
+from samples.utils.value_utils import flatten_confidence, iter_flatten_fields
+
+ProcessingResult = Union[DataExtractionResult, DataClassificationResult, DataRedactionResult]
+
+RESULTS_SCHEMA = pa.schema([
+    pa.field('run', pa.string()),
+    pa.field('doc', pa.string()),
+    pa.field('result_type', pa.string()),
+    pa.field('field', pa.string()),
+    pa.field('schema_field', pa.string()),
+    pa.field('value', pa.string()),
+    pa.field('confidence', pa.float64()),
+    pa.field('accuracy', pa.float64()),
+    pa.field('document_confidence', pa.float64()),
+    pa.field('document_accuracy', pa.float64()),
+    pa.field('prompt_tokens', pa.int64()),
+    pa.field('completion_tokens', pa.int64()),
+    pa.field('execution_time', pa.float64()),
+    pa.field('stage_timings', pa.map_(pa.string(), pa.float64()))
+])
+"""
+The flattened field-level schema of exported results, with one row per field of each document, or a single row with a null 'field'
+for a document without fields.
+
+Fields are named as by flatten_dict, e.g., 'items_0_description', and 'schema_field' replaces list indices with '*'.
+Values are stored as JSON text, and the document-level columns are repeated on each field's row, which Parquet's dictionary and
+run-length encoding store compactly.
+"""
+
+
+def _get_result_fields(
+    result: ProcessingResult
+) -> tuple[dict[str, tuple[str, any]], dict[str, any], dict[str, float], Optional[float], Optional[float]]:
+    # The fields with their schema field and value, the per-field accuracy and confidence, and the document accuracy and confidence
+    fields = {}
+    field_accuracy = {}
+
+    if isinstance(result, DataExtractionResult):
+        accuracy = result.accuracy or {}
+        fields = {field: (schema_field, value) for field, schema_field, value in iter_flatten_fields(result.data or {})}
+        for field, schema_field, value in iter_flatten_fields(accuracy.get('accuracy') or {}):
+            # Fields that were expected but not extracted only have an accuracy
+            fields.setdefault(field, (schema_field, None))
+            field_accuracy[field] = value
+        field_confidence = flatten_confidence(result.confidence or {})
+        return fields, field_accuracy, field_confidence, accuracy.get('overall'), (result.confidence or {}).get('_overall')
+
+    if isinstance(result, DataClassificationResult):
+        fields = {field: (schema_field, value) for field, schema_field, value in iter_flatten_fields(result.classification or {})}
+        return fields, field_accuracy, {}, result.accuracy, None
+
+    if isinstance(result, DataRedactionResult):
+        field_confidence = flatten_confidence(result.confidence or {})
+        return {'redacted': ('redacted', result.redacted)}, field_accuracy, field_confidence, None, (result.confidence or {}).get('_overall')
+
+    raise TypeError(f"Unsupported result type: {type(result).__name__}")
+
+
+def _create_record_batch(
+    results: list[tuple[str, ProcessingResult]],
+    run: Optional[str]
+) -> pa.RecordBatch:
+    columns = {field.name: [] for field in RESULTS_SCHEMA}
+
+    for doc, result in results:
+        fields, field_accuracy, field_confidence, document_accuracy, document_confidence = _get_result_fields(result)
+        result_type = type(result).__name__
+        prompt_tokens = getattr(result, 'prompt_tokens', None)
+        completion_tokens = getattr(result, 'completion_tokens', None)
+        stage_timings = list((getattr(result, 'stage_timings', None) or {}).items())
+
+        # A document without fields, e.g., a failed or empty extraction, keeps one row with a null field for its document-level columns
+        for field, (schema_field, value) in (fields.items() if fields else [(None, (None, None))]):
+            columns['run'].append(run)
+            columns['doc'].append(doc)
+            columns['result_type'].append(result_type)
+            columns['field'].append(field)
+            columns['schema_field'].append(schema_field)
+            columns['value'].append(None if value is None else dumps_json(value).decode('utf-8'))
+            columns['confidence'].append(field_confidence.get(field))
+            columns['accuracy'].append(field_accuracy.get(field))
+            columns['document_confidence'].append(document_confidence)
+            columns['document_accuracy'].append(document_accuracy)
+            columns['prompt_tokens'].append(prompt_tokens)
+            columns['completion_tokens'].append(completion_tokens)
+            columns['execution_time'].append(result.execution_time)
+            columns['stage_timings'].append(stage_timings)
+
+    return pa.RecordBatch.from_pydict(columns, schema=RESULTS_SCHEMA)
+
+
+def results_to_arrow(
+    results: Iterable[tuple[str, ProcessingResult]],
+    run: Optional[str] = None
+) -> pa.Table:
+    """
+    Flattens processing results into an Arrow table with the field-level RESULTS_SCHEMA.
+
+    Args:
+        results: The document id and result of each document, e.g., the items of a dictionary of results or a JsonlResultReader.
+        run: The name of the run the results belong to, e.g., its date, to tell runs apart when they are analyzed together.
+
+    Returns:
+        pa.Table: The flattened results, with one row per field of each document, or a single row with a null 'field' for a document without fields.
+    """
+
+    return pa.Table.from_batches([_create_record_batch(list(results), run)], schema=RESULTS_SCHEMA)
+
+
+def write_results_parquet(
+    results: Iterable[tuple[str, ProcessingResult]],
+    fpath: str,
+    run: Optional[str] = None,
+    batch_size: int = 1000,
+    compression: str = 'zstd'
+) -> int:
+    """
+    Exports processing results to a Parquet file with the field-level RESULTS_SCHEMA.
+
+    The results are flattened and written in batches of documents, each as its own row group, so that exports of large runs
+    never hold more than one batch in memory, and queries over a column only read that column's pages.
+
+    Args:
+        results: The document id and result of each document, e.g., the items of a dictionary of results or a JsonlResultReader.
+        fpath: The path of the Parquet file to write.
+        run: The name of the run the results belong to, e.g., its date, to tell runs apart when they are analyzed together.
+        batch_size: The number of documents flattened and written together.
+        compression: The Parquet compression codec.
+
+    Returns:
+        int: The number of rows written.
+    """
+
+    rows = 0
+    with pq.ParquetWriter(fpath, RESULTS_SCHEMA, compression=compression) as writer:
+        batch = []
+        for item in results:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                record_batch = _create_record_batch(batch, run)
+                writer.write_batch(record_batch)
+                rows += record_batch.num_rows
+                batch = []
+
+        if batch:
+            record_batch = _create_record_batch(batch, run)
+            writer.write_batch(record_batch)
+            rows += record_batch.num_rows
+
+    return rows
+
+
+def read_results_parquet(
+    path: Union[str, list[str]],
+    columns: Optional[list[str]] = None,
+    filters: Optional[list] = None
+) -> pd.DataFrame:
+    """
+    Reads exported results into a DataFrame, e.g., all of the Parquet files of a month of runs.
+
+    Only the requested columns are read, and row groups that cannot match the filters are skipped using their statistics.
+
+    Args:
+        path: The path of a Parquet file, a directory of Parquet files, or a list of Parquet files.
+        columns: The columns to read, or None for all columns.
+        filters: The row filters in pyarrow's disjunctive normal form, e.g., [('schema_field', '=', 'items_*_total')].
+
+    Returns:
+        pd.DataFrame: The results, with one row per field of each document.
+    """
+
+    return pq.read_table(path, columns=columns, filters=filters).to_pandas()
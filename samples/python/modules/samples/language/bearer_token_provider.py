@@ -0,0 +1,88 @@
+import asyncio
+import inspect
+import threading
+import time
+from typing import Optional
+from azure.core.credentials import AccessToken
+
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+
+class BearerTokenProvider:
+    """
+    A class for sharing a cached bearer token across many requests, refreshing it shortly before it expires.
+
+    Supports both synchronous (TokenCredential) and asynchronous (AsyncTokenCredential) credentials.
+
+    Attributes:
+        scope (str): The scope to request the token for.
+        refresh_margin (float): The number of seconds before expiry at which the token is refreshed.
+    """
+
+    def __init__(
+        self,
+        credential: any,
+        scope: str = COGNITIVE_SERVICES_SCOPE,
+        refresh_margin: float = 300
+    ):
+        """
+        Initializes a new instance of the BearerTokenProvider class.
+
+        Args:
+            credential: The TokenCredential or AsyncTokenCredential to use for authentication.
+            scope: The scope to request the token for.
+            refresh_margin: The number of seconds before expiry at which the token is refreshed.
+        """
+
+        self._credential = credential
+        self.scope = scope
+        self.refresh_margin = refresh_margin
+        self._access_token: Optional[AccessToken] = None
+        self._lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    def _needs_refresh(self) -> bool:
+        return (
+            self._access_token is None
+            or self._access_token.expires_on - self.refresh_margin <= time.time()
+        )
+
+    def get_token(self) -> str:
+        """
+        Gets a valid bearer token, requesting a new one from the credential only when required.
+
+        Returns:
+            str: The bearer token.
+        """
+
+        if self._needs_refresh():
+            with self._lock:
+                if self._needs_refresh():
+                    self._access_token = self._credential.get_token(self.scope)
+
+        return self._access_token.token
+
+    async def get_token_async(self) -> str:
+        """
+        Gets a valid bearer token asynchronously, ensuring that concurrent callers share a single refresh.
+
+        Returns:
+            str: The bearer token.
+        """
+
+        if not self._needs_refresh():
+            return self._access_token.token
+
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+
+        async with self._async_lock:
+            if self._needs_refresh():
+                if inspect.iscoroutinefunction(self._credential.get_token):
+                    access_token = await self._credential.get_token(self.scope)
+                else:
+                    # Avoid blocking the event loop while a synchronous credential acquires a token
+                    access_token = await asyncio.to_thread(self._credential.get_token, self.scope)
+                self._access_token = access_token
+
+        return self._access_token.token
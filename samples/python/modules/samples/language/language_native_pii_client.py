@@ -1,8 +1,24 @@
+import asyncio
+import heapq
+import math
+import os
+from urllib.parse import quote
 from azure.core.credentials import TokenCredential
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.storage.blob import ContainerClient
+import httpx
 import requests
 from pydantic import BaseModel, Field
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Union
 from datetime import datetime
+from samples.language.bearer_token_provider import BearerTokenProvider
+from samples.language.operation_poller import OperationPoller, PollingMetrics, get_retry_after
+
+DEFAULT_API_VERSION = "2024-11-15-preview"
+TERMINAL_JOB_STATUSES = {"succeeded", "partiallycompleted", "failed", "cancelled"}
+MAX_DOCUMENTS_PER_JOB = 20
+MAX_DOCUMENT_SIZE_BYTES = 10 * 1024 * 1024
+MAX_JOB_SIZE_BYTES = MAX_DOCUMENT_SIZE_BYTES * MAX_DOCUMENTS_PER_JOB
 
 
 class AnalyzeResultError(BaseModel):
@@ -64,6 +80,7 @@ class AnalyzeDocumentRequestInputDocument(BaseModel):
     id: str
     source: AnalyzeDocumentRequestInputDocumentLocation
     target: AnalyzeDocumentRequestInputDocumentLocation
+    size_in_bytes: Optional[int] = Field(None, exclude=True)
 
 
 class AnalyzeDocumentRequestInput(BaseModel):
@@ -94,77 +111,463 @@ class AnalyzeDocumentRequest(BaseModel):
     tasks: List[AnalyzeDocumentRequestTask]
 
 
+class BulkAnalyzeDocumentResult(BaseModel):
+    id: str
+    source: str
+    job_id: Optional[str] = None
+    targets: List[AnalyzeResultDocumentLocation] = []
+    warnings: List[str] = []
+    error: Optional[dict] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and len(self.targets) > 0
+
+
+def get_documents_from_container(
+    container_client: ContainerClient,
+    prefix: str,
+    target_location: str,
+    language: str = "en"
+) -> List[AnalyzeDocumentRequestInputDocument]:
+    """
+    Gets the documents to analyze from all blobs in a container that start with the given prefix.
+
+    Args:
+        container_client: The client for the container holding the source documents.
+        prefix: The blob name prefix, e.g., 'raw/'.
+        target_location: The URL of the container folder to write the redacted documents to.
+        language: The language of the documents.
+
+    Returns:
+        List[AnalyzeDocumentRequestInputDocument]: The documents, including their sizes for batching.
+    """
+
+    return [
+        AnalyzeDocumentRequestInputDocument(
+            language=language,
+            id=blob.name,
+            source=AnalyzeDocumentRequestInputDocumentLocation(
+                location=f"{container_client.url}/{quote(blob.name)}"),
+            target=AnalyzeDocumentRequestInputDocumentLocation(
+                location=target_location),
+            size_in_bytes=blob.size
+        )
+        for blob in container_client.list_blobs(name_starts_with=prefix)
+    ]
+
+
+def get_documents_from_directory(
+    directory: str,
+    source_location: str,
+    target_location: str,
+    language: str = "en"
+) -> List[AnalyzeDocumentRequestInputDocument]:
+    """
+    Gets the documents to analyze from a local directory whose files have been uploaded to the given source location.
+
+    Args:
+        directory: The local directory containing the documents.
+        source_location: The URL of the container folder that the directory has been uploaded to.
+        target_location: The URL of the container folder to write the redacted documents to.
+        language: The language of the documents.
+
+    Returns:
+        List[AnalyzeDocumentRequestInputDocument]: The documents, including their sizes for batching.
+    """
+
+    documents = []
+    for root, _, files in os.walk(directory):
+        for fname in sorted(files):
+            fpath = os.path.join(root, fname)
+            relative_path = os.path.relpath(fpath, directory).replace(os.sep, "/")
+            documents.append(AnalyzeDocumentRequestInputDocument(
+                language=language,
+                id=relative_path,
+                source=AnalyzeDocumentRequestInputDocumentLocation(
+                    location=f"{source_location.rstrip('/')}/{quote(relative_path)}"),
+                target=AnalyzeDocumentRequestInputDocumentLocation(
+                    location=target_location),
+                size_in_bytes=os.path.getsize(fpath)
+            ))
+
+    return documents
+
+
+def create_document_batches(
+    documents: List[AnalyzeDocumentRequestInputDocument],
+    max_documents_per_job: int = MAX_DOCUMENTS_PER_JOB,
+    max_job_size_bytes: int = MAX_JOB_SIZE_BYTES
+) -> List[List[AnalyzeDocumentRequestInputDocument]]:
+    """
+    Splits documents into the fewest batches that fit the per-job limits, balancing the total size of each batch so that concurrent jobs finish at a similar time.
+
+    Args:
+        documents: The documents to split.
+        max_documents_per_job: The maximum number of documents in a single job.
+        max_job_size_bytes: The maximum total size of the documents in a single job.
+
+    Returns:
+        List[List[AnalyzeDocumentRequestInputDocument]]: The batches of documents.
+    """
+
+    if not documents:
+        return []
+
+    total_size = sum(document.size_in_bytes or 0 for document in documents)
+    batch_count = max(
+        math.ceil(len(documents) / max_documents_per_job),
+        math.ceil(total_size / max_job_size_bytes)
+    )
+
+    # Assign the largest documents first, each to the batch with the smallest total size that still has room
+    batches = [[] for _ in range(batch_count)]
+    heap = [(0, i) for i in range(batch_count)]
+    for document in sorted(documents, key=lambda d: d.size_in_bytes or 0, reverse=True):
+        size = document.size_in_bytes or 0
+        skipped = []
+        while heap:
+            batch_size, i = heapq.heappop(heap)
+            if len(batches[i]) < max_documents_per_job and (batch_size + size <= max_job_size_bytes or not batches[i]):
+                break
+            skipped.append((batch_size, i))
+        else:
+            batches.append([])
+            batch_size, i = 0, len(batches) - 1
+
+        batches[i].append(document)
+        heapq.heappush(heap, (batch_size + size, i))
+        for item in skipped:
+            if len(batches[item[1]]) < max_documents_per_job:
+                heapq.heappush(heap, item)
+
+    return [batch for batch in batches if batch]
+
+
+def _to_request_body(analyze_request: Union[AnalyzeDocumentRequest, dict]) -> dict:
+    if isinstance(analyze_request, BaseModel):
+        return analyze_request.model_dump(by_alias=True, exclude_none=True)
+    return analyze_request
+
+
+def _is_job_done(response: any) -> bool:
+    return response.json().get("status", "").lower() in TERMINAL_JOB_STATUSES
+
+
+def _validate_analyze_result(analyze_result: AnalyzeResult) -> AnalyzeResult:
+    if analyze_result.errors:
+        raise Exception(analyze_result.errors)
+
+    if analyze_result.status.lower() in ("failed", "cancelled") or analyze_result.tasks.failed > 0:
+        raise Exception(
+            f"Analyze operation {analyze_result.jobId} {analyze_result.status}")
+
+    for task in analyze_result.tasks.items:
+        if task.results.errors:
+            raise Exception(task.results.errors)
+
+    return analyze_result
+
+
 class LanguageNativePIIClient:
     """
     A class for interacting with the Azure AI Language Native PII APIs.
     """
 
-    def __init__(self, endpoint: str, credential: TokenCredential):
+    def __init__(
+        self,
+        endpoint: str,
+        credential: TokenCredential,
+        api_version: str = DEFAULT_API_VERSION,
+        poller: Optional[OperationPoller] = None,
+        session: Optional[requests.Session] = None
+    ):
         """
         Initializes a new instance of the LanguageNativePIIClient class.
 
         Args:
             endpoint (str): The endpoint of the Azure AI Language service.
             credential (TokenCredential): The credential to use for authentication.
+            api_version (str): The API version of the Azure AI Language service.
+            poller (Optional[OperationPoller]): The poller used to wait for jobs to complete and to retry throttled requests. A default poller is used if not provided.
+            session (Optional[requests.Session]): The HTTP session to reuse for all requests. A new session is created if not provided.
         """
 
-        self._endpoint = endpoint
-        self._credential = credential
+        self._endpoint = endpoint.rstrip("/")
+        self._api_version = api_version
+        self._token_provider = BearerTokenProvider(credential)
+        self._poller = poller or OperationPoller()
+        self._session = session or requests.Session()
 
     def begin_analyze_document(
         self,
-        analyze_request: AnalyzeDocumentRequest
+        analyze_request: AnalyzeDocumentRequest,
+        polling_metrics: Optional[PollingMetrics] = None
     ) -> AnalyzeResult:
         """
-        Initiates an analyze document operation.
+        Initiates an analyze document operation and waits for it to complete.
 
         Args:
             analyze_request (AnalyzeDocumentRequest): The request to analyze the document.
-        """
+            polling_metrics (Optional[PollingMetrics]): The metrics object to record the polling metrics of the operation in.
 
-        # Get a bearer token for the request
-        access_token = self._credential.get_token(
-            "https://cognitiveservices.azure.com/.default")
+        Returns:
+            AnalyzeResult: The result of the completed analyze document operation.
+        """
 
         # Initiate the analyze document request
-        response = requests.post(
-            f"{self._endpoint}/language/analyze-documents/jobs?api-version=2024-11-15-preview",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {access_token.token}"
-            },
-            json=analyze_request
-        )
+        response = self._poller.send(lambda: self._session.post(
+            f"{self._endpoint}/language/analyze-documents/jobs?api-version={self._api_version}",
+            headers=self._get_headers(),
+            json=_to_request_body(analyze_request)
+        ))
 
-        status = response.status_code
         operation_location = response.headers.get("operation-location")
 
         # Poll the operation location until the operation is complete
-        finished = False
+        response = self._poller.poll(
+            lambda: self._session.get(
+                operation_location, headers=self._get_headers()),
+            _is_job_done,
+            initial_delay=get_retry_after(response.headers),
+            metrics=polling_metrics
+        )
+
+        return _validate_analyze_result(AnalyzeResult.model_validate(response.json()))
+
+    def close(self):
+        """
+        Closes the underlying HTTP session.
+        """
+
+        self._session.close()
+
+    def _get_headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self._token_provider.get_token()}"}
+
+
+class AsyncLanguageNativePIIClient:
+    """
+    A class for interacting with the Azure AI Language Native PII APIs asynchronously.
 
-        while not finished:
-            response = requests.get(
-                operation_location,
-                headers={
-                    "Authorization": f"Bearer {access_token.token}"
-                }
-            )
+    A single pooled HTTP client and a shared bearer token are reused across all requests, allowing many analyze document jobs to run concurrently.
+    """
 
-            status = response.status_code
-            analyze_result = AnalyzeResult.model_validate(response.json())
+    def __init__(
+        self,
+        endpoint: str,
+        credential: Union[TokenCredential, AsyncTokenCredential],
+        api_version: str = DEFAULT_API_VERSION,
+        poller: Optional[OperationPoller] = None,
+        max_connections: int = 100,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        """
+        Initializes a new instance of the AsyncLanguageNativePIIClient class.
 
-            if status == 200:
-                if analyze_result.status == "succeeded":
-                    finished = True
+        Args:
+            endpoint (str): The endpoint of the Azure AI Language service, e.g., a local mock server URL for testing.
+            credential (Union[TokenCredential, AsyncTokenCredential]): The credential to use for authentication.
+            api_version (str): The API version of the Azure AI Language service.
+            poller (Optional[OperationPoller]): The poller used to wait for jobs to complete and to retry throttled requests. A default poller is used if not provided.
+            max_connections (int): The maximum number of pooled connections when creating the HTTP client.
+            http_client (Optional[httpx.AsyncClient]): The HTTP client to reuse for all requests. A new pooled client is created if not provided.
+        """
+
+        self._endpoint = endpoint.rstrip("/")
+        self._api_version = api_version
+        self._token_provider = BearerTokenProvider(credential)
+        self._poller = poller or OperationPoller()
+        self._http_client = http_client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=httpx.Timeout(30.0)
+        )
+
+    async def __aenter__(self) -> 'AsyncLanguageNativePIIClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def begin_analyze_document(
+        self,
+        analyze_request: AnalyzeDocumentRequest,
+        polling_metrics: Optional[PollingMetrics] = None
+    ) -> AnalyzeResult:
+        """
+        Initiates an analyze document operation and waits for it to complete without blocking the event loop.
 
-                    if analyze_result.errors:
-                        raise Exception(analyze_result.errors)
+        Args:
+            analyze_request (AnalyzeDocumentRequest): The request to analyze the document.
+            polling_metrics (Optional[PollingMetrics]): The metrics object to record the polling metrics of the operation in.
+
+        Returns:
+            AnalyzeResult: The result of the completed analyze document operation.
+        """
+
+        return _validate_analyze_result(await self._run_job(analyze_request, polling_metrics))
+
+    async def analyze_documents(
+        self,
+        analyze_requests: List[AnalyzeDocumentRequest],
+        max_concurrency: int = 10,
+        return_exceptions: bool = False
+    ) -> List[Union[AnalyzeResult, BaseException]]:
+        """
+        Runs many analyze document operations concurrently.
+
+        Args:
+            analyze_requests (List[AnalyzeDocumentRequest]): The requests to analyze.
+            max_concurrency (int): The maximum number of operations in progress at any time.
+            return_exceptions (bool): Whether to return exceptions in place of failed results instead of raising the first one.
+
+        Returns:
+            List[Union[AnalyzeResult, BaseException]]: The results, in the same order as the requests.
+        """
 
-                    if analyze_result.tasks.failed > 0:
-                        raise Exception("Analyze operation failed")
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-                    for task in analyze_result.tasks.items:
-                        if task.results.errors:
-                            raise Exception(task.results.errors)
+        async def analyze(analyze_request: AnalyzeDocumentRequest) -> AnalyzeResult:
+            async with semaphore:
+                return await self.begin_analyze_document(analyze_request)
 
-        return analyze_result
+        return await asyncio.gather(
+            *(analyze(analyze_request) for analyze_request in analyze_requests),
+            return_exceptions=return_exceptions
+        )
+
+    async def begin_analyze_documents_bulk(
+        self,
+        documents: List[AnalyzeDocumentRequestInputDocument],
+        tasks: List[AnalyzeDocumentRequestTask],
+        display_name: str = "Bulk document PII redaction",
+        max_documents_per_job: int = MAX_DOCUMENTS_PER_JOB,
+        max_job_size_bytes: int = MAX_JOB_SIZE_BYTES,
+        max_concurrency: int = 10
+    ) -> List[BulkAnalyzeDocumentResult]:
+        """
+        Analyzes many documents by submitting them in as few multi-document jobs as possible and tracking the jobs concurrently.
+
+        Failures are reported per document rather than raised, so that a single failed document or job does not discard the results of the others.
+
+        Args:
+            documents (List[AnalyzeDocumentRequestInputDocument]): The documents to analyze, e.g., from get_documents_from_container.
+            tasks (List[AnalyzeDocumentRequestTask]): The tasks to run for every document.
+            display_name (str): The display name prefix for the jobs.
+            max_documents_per_job (int): The maximum number of documents in a single job.
+            max_job_size_bytes (int): The maximum total size of the documents in a single job.
+            max_concurrency (int): The maximum number of jobs in progress at any time.
+
+        Returns:
+            List[BulkAnalyzeDocumentResult]: The result for each document, in the same order as the documents.
+
+        Raises:
+            ValueError: If more than one document has the same id, as the results of each job are matched to the documents by id.
+        """
+
+        document_ids = set()
+        for document in documents:
+            if document.id in document_ids:
+                raise ValueError(f"Duplicate document id '{document.id}'. Each document in a bulk analysis must have a unique id.")
+            document_ids.add(document.id)
+
+        batches = create_document_batches(
+            documents, max_documents_per_job, max_job_size_bytes)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def analyze_batch(index: int, batch: List[AnalyzeDocumentRequestInputDocument]) -> dict[str, BulkAnalyzeDocumentResult]:
+            results = {
+                document.id: BulkAnalyzeDocumentResult(
+                    id=document.id, source=document.source.location)
+                for document in batch
+            }
+
+            analyze_request = {
+                "displayName": f"{display_name} ({index + 1}/{len(batches)})",
+                "analysisInput": {
+                    "documents": [document.model_dump(by_alias=True) for document in batch]
+                },
+                "tasks": [_to_request_body(task) for task in tasks]
+            }
+
+            try:
+                async with semaphore:
+                    analyze_result = await self._run_job(analyze_request)
+            except Exception as e:
+                for result in results.values():
+                    result.error = {"code": "JobFailed", "message": str(e)}
+                return results
+
+            for result in results.values():
+                result.job_id = analyze_result.jobId
+
+            if analyze_result.errors:
+                for error in analyze_result.errors:
+                    if error.id in results:
+                        results[error.id].error = error.error
+
+            for task in analyze_result.tasks.items:
+                for document in task.results.documents:
+                    if document.id in results:
+                        results[document.id].targets.extend(document.targets)
+                        results[document.id].warnings.extend(
+                            document.warnings or [])
+                for error in task.results.errors or []:
+                    if error.id in results:
+                        results[error.id].error = error.error
+
+            return results
+
+        batch_results = await asyncio.gather(
+            *(analyze_batch(i, batch) for i, batch in enumerate(batches)))
+
+        results_by_id = {
+            document_id: result
+            for results in batch_results
+            for document_id, result in results.items()
+        }
+
+        return [results_by_id[document.id] for document in documents]
+
+    async def close(self):
+        """
+        Closes the underlying HTTP client.
+        """
+
+        await self._http_client.aclose()
+
+    async def _run_job(
+        self,
+        analyze_request: Union[AnalyzeDocumentRequest, dict],
+        polling_metrics: Optional[PollingMetrics] = None
+    ) -> AnalyzeResult:
+        # Initiate the analyze document request
+        response = await self._poller.send_async(lambda: self._request(
+            "POST",
+            f"{self._endpoint}/language/analyze-documents/jobs?api-version={self._api_version}",
+            json=_to_request_body(analyze_request)
+        ))
+
+        operation_location = response.headers.get("operation-location")
+
+        # Poll the operation location until the operation is complete
+        response = await self._poller.poll_async(
+            lambda: self._request("GET", operation_location),
+            _is_job_done,
+            initial_delay=get_retry_after(response.headers),
+            metrics=polling_metrics
+        )
+
+        return AnalyzeResult.model_validate_json(response.content)
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        token = await self._token_provider.get_token_async()
+        return await self._http_client.request(
+            method,
+            url,
+            headers={"Authorization": f"Bearer {token}"},
+            **kwargs
+        )
@@ -3,6 +3,10 @@ import requests
 from pydantic import BaseModel, Field
 from typing import Optional, List, Literal
 from datetime import datetime
+from samples.language.bearer_token_provider import BearerTokenProvider
+from samples.language.operation_poller import OperationPoller, PollingMetrics, get_retry_after
+
+TERMINAL_OPERATION_STATUSES = {"succeeded", "failed", "cancelled", "validationfailed"}
 
 
 class AnalyzeResultError(BaseModel):
@@ -47,73 +51,93 @@ class AnalyzeDocumentRequest(BaseModel):
     inputs: List[AnalyzeDocumentRequestInput]
 
 
+def _is_operation_done(response: any) -> bool:
+    response_json = response.json()
+    return (
+        response_json.get("status", "").lower() in TERMINAL_OPERATION_STATUSES
+        or response_json.get("error") is not None
+    )
+
+
 class LanguageNativeTranslatorClient:
     """
     A class for interacting with the Azure AI Language Native Translator APIs.
     """
 
-    def __init__(self, endpoint: str, credential: TokenCredential):
+    def __init__(
+        self,
+        endpoint: str,
+        credential: TokenCredential,
+        poller: Optional[OperationPoller] = None,
+        session: Optional[requests.Session] = None
+    ):
         """
         Initializes a new instance of the LanguageNativeTranslatorClient class.
 
         Args:
             endpoint (str): The endpoint of the Azure AI Translator service.
             credential (TokenCredential): The credential to use for authentication.
+            poller (Optional[OperationPoller]): The poller used to wait for operations to complete and to retry throttled requests. A default poller is used if not provided.
+            session (Optional[requests.Session]): The HTTP session to reuse for all requests. A new session is created if not provided.
         """
 
-        self._endpoint = endpoint
-        self._credential = credential
+        self._endpoint = endpoint.rstrip("/")
+        self._token_provider = BearerTokenProvider(credential)
+        self._poller = poller or OperationPoller()
+        self._session = session or requests.Session()
 
     def begin_analyze_document(
         self,
-        analyze_request: AnalyzeDocumentRequest
+        analyze_request: AnalyzeDocumentRequest,
+        polling_metrics: Optional[PollingMetrics] = None
     ):
         """
         Initiates an analyze document operation.
 
         Args:
             analyze_request (AnalyzeDocumentRequest): The request to analyze the document.
+            polling_metrics (Optional[PollingMetrics]): The metrics object to record the polling metrics of the operation in.
         """
 
-        # Get a bearer token for the request
-        access_token = self._credential.get_token(
-            "https://cognitiveservices.azure.com/.default")
+        if isinstance(analyze_request, BaseModel):
+            analyze_request = analyze_request.model_dump(by_alias=True)
 
         # Initiate the analyze document request
-        response = requests.post(
+        response = self._poller.send(lambda: self._session.post(
             f"{self._endpoint}/translator/text/batch/v1.1/batches",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {access_token.token}"
-            },
+            headers=self._get_headers(),
             json=analyze_request
-        )
+        ))
 
-        status = response.status_code
         operation_location = response.headers.get("operation-location")
 
         # Poll the operation location until the operation is complete
-        finished = False
+        response = self._poller.poll(
+            lambda: self._session.get(
+                operation_location, headers=self._get_headers()),
+            _is_operation_done,
+            initial_delay=get_retry_after(response.headers),
+            metrics=polling_metrics
+        )
+
+        analyze_result = AnalyzeResult.from_dict(response.json())
 
-        while not finished:
-            response = requests.get(
-                operation_location,
-                headers={
-                    "Authorization": f"Bearer {access_token.token}"
-                }
-            )
+        if analyze_result.error:
+            raise Exception(
+                f"Analyze operation failed: {analyze_result.error.code} - {analyze_result.error.message}")
 
-            status = response.status_code
-            response_json = response.json()
+        if analyze_result.status.lower() != "succeeded":
+            raise Exception(
+                f"Analyze operation {analyze_result.id} {analyze_result.status}")
 
-            analyze_result = AnalyzeResult.from_dict(response_json)
+        return analyze_result
 
-            if status == 200:
-                if analyze_result.status.lower() == "succeeded" or analyze_result.error:
-                    finished = True
+    def close(self):
+        """
+        Closes the underlying HTTP session.
+        """
 
-                    if analyze_result.error:
-                        raise Exception(
-                            f"Analyze operation failed: {analyze_result.error.code} - {analyze_result.error.message}")
+        self._session.close()
 
-        return analyze_result
+    def _get_headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self._token_provider.get_token()}"}
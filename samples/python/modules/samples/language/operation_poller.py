@@ -0,0 +1,340 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Mapping, Optional
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class OperationCancelledError(Exception):
+    """
+    An exception raised when polling of a long-running operation is cancelled.
+    """
+
+
+class PollingMetrics:
+    """
+    A class representing the metrics collected while polling a long-running operation.
+
+    Attributes:
+        poll_count (int): The number of status requests made, including throttled requests.
+        time_to_first_result (Optional[float]): The seconds from the start of polling until the first successful status response.
+        time_to_completion (Optional[float]): The seconds from the start of polling until the operation reached a terminal state.
+        total_wait (float): The total seconds spent waiting between status requests.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new instance of the PollingMetrics class.
+        """
+
+        self.poll_count = 0
+        self.time_to_first_result = None
+        self.time_to_completion = None
+        self.total_wait = 0.0
+
+    def to_dict(self) -> dict:
+        """
+        Converts the PollingMetrics object to a dictionary.
+
+        Returns:
+            dict: The PollingMetrics object as a dictionary.
+        """
+
+        return {
+            'poll_count': self.poll_count,
+            'time_to_first_result': self.time_to_first_result,
+            'time_to_completion': self.time_to_completion,
+            'total_wait': self.total_wait
+        }
+
+
+def get_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Gets the number of seconds to wait before the next request from the response headers.
+
+    Supports the 'retry-after-ms', 'x-ms-retry-after-ms', and 'Retry-After' (seconds or HTTP-date) headers.
+
+    Args:
+        headers: The response headers.
+
+    Returns:
+        Optional[float]: The number of seconds to wait, or None if no retry hint was provided.
+    """
+
+    for header in ("retry-after-ms", "x-ms-retry-after-ms"):
+        value = headers.get(header)
+        if value:
+            try:
+                return max(float(value) / 1000, 0.0)
+            except ValueError:
+                pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class _PollingState:
+    def __init__(self, poller: 'OperationPoller', metrics: Optional[PollingMetrics], initial_delay: Optional[float]):
+        self.poller = poller
+        self.metrics = metrics or PollingMetrics()
+        self.start = time.perf_counter()
+        self.deadline = self.start + poller.timeout if poller.timeout is not None else None
+        self.attempt = 0
+        self.retries = 0
+        self.next_delay = initial_delay if initial_delay is not None else poller.polling_interval
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.perf_counter()
+
+    def check_deadline(self):
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise TimeoutError(
+                f"Operation did not complete within {self.poller.timeout} seconds")
+
+    def delay(self) -> float:
+        delay = self.next_delay
+        remaining = self.remaining()
+        if remaining is not None:
+            delay = min(delay, max(remaining, 0.0))
+        self.metrics.total_wait += delay
+        return delay
+
+    def handle(self, response: any, is_done: Callable[[any], bool]) -> bool:
+        self.metrics.poll_count += 1
+
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            # Consecutive throttled or transiently failed status requests are retried up to max_retries times, as with send
+            if self.retries >= self.poller.max_retries:
+                response.raise_for_status()
+            self.retries += 1
+            self._backoff(response)
+            return False
+
+        self.retries = 0
+        response.raise_for_status()
+
+        if self.metrics.time_to_first_result is None:
+            self.metrics.time_to_first_result = self.elapsed()
+
+        if is_done(response):
+            self.metrics.time_to_completion = self.elapsed()
+            return True
+
+        self._backoff(response)
+        return False
+
+    def _backoff(self, response: any):
+        self.attempt += 1
+        retry_after = get_retry_after(response.headers)
+        if retry_after is not None:
+            self.next_delay = retry_after
+        else:
+            self.next_delay = self.poller.get_backoff_delay(self.attempt)
+
+
+class OperationPoller:
+    """
+    A class for polling long-running operations until they reach a terminal state.
+
+    Waits between status requests use the service's Retry-After hint when provided, otherwise an exponential backoff with jitter.
+    Throttled (429) and transient (5xx) responses are retried up to max_retries consecutive times; other error responses are raised.
+
+    Attributes:
+        polling_interval (float): The initial number of seconds to wait between status requests.
+        max_polling_interval (float): The maximum number of seconds to wait between status requests.
+        backoff_factor (float): The multiplier applied to the wait after each status request.
+        jitter (float): The fraction of the wait to randomize by, spreading concurrent pollers apart.
+        timeout (Optional[float]): The maximum number of seconds to poll for before raising a TimeoutError.
+        max_retries (int): The maximum number of consecutive times a throttled or transiently failed request or status request is retried.
+    """
+
+    def __init__(
+        self,
+        polling_interval: float = 1.0,
+        max_polling_interval: float = 30.0,
+        backoff_factor: float = 2.0,
+        jitter: float = 0.2,
+        timeout: Optional[float] = None,
+        max_retries: int = 10
+    ):
+        """
+        Initializes a new instance of the OperationPoller class.
+
+        Args:
+            polling_interval: The initial number of seconds to wait between status requests.
+            max_polling_interval: The maximum number of seconds to wait between status requests.
+            backoff_factor: The multiplier applied to the wait after each status request.
+            jitter: The fraction of the wait to randomize by, spreading concurrent pollers apart.
+            timeout: The maximum number of seconds to poll for before raising a TimeoutError.
+            max_retries: The maximum number of consecutive times a throttled or transiently failed request or status request is retried.
+        """
+
+        self.polling_interval = polling_interval
+        self.max_polling_interval = max_polling_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+    def get_backoff_delay(self, attempt: int) -> float:
+        """
+        Gets the jittered exponential backoff delay for the given attempt.
+
+        Args:
+            attempt: The number of attempts made so far, starting at 1.
+
+        Returns:
+            float: The number of seconds to wait.
+        """
+
+        delay = min(
+            self.polling_interval * (self.backoff_factor ** (attempt - 1)),
+            self.max_polling_interval
+        )
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def send(self, send_request: Callable[[], any]) -> any:
+        """
+        Sends a request, retrying it while it is throttled or transiently failing.
+
+        Args:
+            send_request: The function that sends the request, returning a response with 'status_code', 'headers', and 'raise_for_status'.
+
+        Returns:
+            any: The successful response.
+        """
+
+        attempt = 0
+        while True:
+            response = send_request()
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                response.raise_for_status()
+                return response
+
+            attempt += 1
+            time.sleep(get_retry_after(response.headers)
+                       or self.get_backoff_delay(attempt))
+
+    async def send_async(self, send_request: Callable[[], Awaitable[any]]) -> any:
+        """
+        Sends a request asynchronously, retrying it while it is throttled or transiently failing.
+
+        Args:
+            send_request: The coroutine function that sends the request, returning a response with 'status_code', 'headers', and 'raise_for_status'.
+
+        Returns:
+            any: The successful response.
+        """
+
+        attempt = 0
+        while True:
+            response = await send_request()
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                response.raise_for_status()
+                return response
+
+            attempt += 1
+            await asyncio.sleep(get_retry_after(response.headers)
+                                or self.get_backoff_delay(attempt))
+
+    def poll(
+        self,
+        get_status: Callable[[], any],
+        is_done: Callable[[any], bool],
+        initial_delay: Optional[float] = None,
+        metrics: Optional[PollingMetrics] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> any:
+        """
+        Polls a long-running operation until it reaches a terminal state.
+
+        Args:
+            get_status: The function that requests the current status, returning a response with 'status_code', 'headers', and 'raise_for_status'.
+            is_done: The function that determines whether a successful status response is terminal.
+            initial_delay: The number of seconds to wait before the first status request, e.g., the Retry-After of the initial response.
+            metrics: The metrics object to record polling metrics in.
+            cancel_event: The event that cancels polling when set, raising an OperationCancelledError.
+
+        Returns:
+            any: The terminal status response.
+        """
+
+        state = _PollingState(self, metrics, initial_delay)
+
+        while True:
+            state.check_deadline()
+
+            delay = state.delay()
+            if cancel_event is not None:
+                if cancel_event.wait(delay):
+                    raise OperationCancelledError("Operation polling was cancelled")
+            else:
+                time.sleep(delay)
+
+            response = get_status()
+            if state.handle(response, is_done):
+                return response
+
+    async def poll_async(
+        self,
+        get_status: Callable[[], Awaitable[any]],
+        is_done: Callable[[any], bool],
+        initial_delay: Optional[float] = None,
+        metrics: Optional[PollingMetrics] = None,
+        cancel_event: Optional[asyncio.Event] = None
+    ) -> any:
+        """
+        Polls a long-running operation asynchronously until it reaches a terminal state.
+
+        Polling can also be cancelled by cancelling the awaiting task.
+
+        Args:
+            get_status: The coroutine function that requests the current status, returning a response with 'status_code', 'headers', and 'raise_for_status'.
+            is_done: The function that determines whether a successful status response is terminal.
+            initial_delay: The number of seconds to wait before the first status request, e.g., the Retry-After of the initial response.
+            metrics: The metrics object to record polling metrics in.
+            cancel_event: The event that cancels polling when set, raising an OperationCancelledError.
+
+        Returns:
+            any: The terminal status response.
+        """
+
+        state = _PollingState(self, metrics, initial_delay)
+
+        while True:
+            state.check_deadline()
+
+            delay = state.delay()
+            if cancel_event is not None:
+                try:
+                    await asyncio.wait_for(cancel_event.wait(), timeout=delay)
+                    raise OperationCancelledError("Operation polling was cancelled")
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(delay)
+
+            response = await get_status()
+            if state.handle(response, is_done):
+                return response
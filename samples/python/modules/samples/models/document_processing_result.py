@@ -13,6 +13,7 @@ class DataExtractionResult:
         prompt_tokens: The number of tokens in the prompt.
         completion_tokens: The number of tokens in the completion.
         execution_time: The execution time of the data extraction.
+        stage_timings: The execution time of each stage of the data extraction, keyed by stage name.
     """
 
     def __init__(
@@ -22,7 +23,8 @@ class DataExtractionResult:
             accuracy: Optional[dict],
             prompt_tokens: Optional[int],
             completion_tokens: Optional[int],
-            execution_time: Optional[float]
+            execution_time: Optional[float],
+            stage_timings: Optional[dict[str, float]] = None
     ):
         """
         Initializes a new instance of the DataExtractionResult class.
@@ -34,6 +36,7 @@ class DataExtractionResult:
             prompt_tokens: The number of tokens in the prompt.
             completion_tokens: The number of tokens in the completion.
             execution_time: The execution time of the data extraction.
+            stage_timings: The execution time of each stage of the data extraction, keyed by stage name.
         """
 
         self.data = extract_result
@@ -42,6 +45,7 @@ class DataExtractionResult:
         self.prompt_tokens = prompt_tokens
         self.completion_tokens = completion_tokens
         self.execution_time = execution_time
+        self.stage_timings = stage_timings
 
     def to_dict(self) -> dict:
         """
@@ -57,7 +61,8 @@ class DataExtractionResult:
             'accuracy': self.accuracy,
             'prompt_tokens': self.prompt_tokens,
             'completion_tokens': self.completion_tokens,
-            'execution_time': self.execution_time
+            'execution_time': self.execution_time,
+            'stage_timings': self.stage_timings
         }
 
 
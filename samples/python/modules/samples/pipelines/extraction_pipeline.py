@@ -0,0 +1,309 @@
+import asyncio
+import base64
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+from azure.ai.documentintelligence.models import AnalyzeResult, DocumentContentFormat
+from openai import AsyncAzureOpenAI
+from pdf2image import convert_from_bytes
+from pydantic import BaseModel
+
+from samples.confidence.confidence_utils import merge_confidence_values
+from samples.confidence.document_intelligence_confidence import evaluate_confidence as evaluate_di_confidence
+from samples.confidence.openai_confidence import evaluate_confidence as evaluate_openai_confidence
+from samples.evaluation.accuracy_evaluator import AccuracyEvaluator
+from samples.models.document_processing_result import DataExtractionResult
+from samples.utils.document_intelligence_sharding import analyze_document_sharded
+from samples.utils.profiling import get_profiler
+from samples.utils.tracing import Tracer, bind_context, get_tracer
+
+
+def _read_file(fpath: str) -> bytes:
+    with open(fpath, "rb") as f:
+        return f.read()
+
+
+def encode_page(page) -> dict:
+    """
+    Encodes a rendered page image as a base64 PNG image content block for the OpenAI API.
+
+    Args:
+        page: The PIL image of the page.
+
+    Returns:
+        dict: The image content block.
+    """
+
+    byte_io = io.BytesIO()
+    page.save(byte_io, format='PNG')
+    base64_data = base64.b64encode(byte_io.getvalue()).decode('utf-8')
+    return {
+        "type": "image_url",
+        "image_url": {
+            "url": f"data:image/png;base64,{base64_data}"
+        }
+    }
+
+
+class ExtractionPipeline:
+    """
+    A class representing an asynchronous data extraction pipeline using Azure AI Document Intelligence and Azure OpenAI.
+
+    Page rendering and encoding run concurrently with the Azure AI Document Intelligence layout analysis.
+    The chat completion starts as soon as both inputs are ready, and many documents are processed with bounded concurrency.
+
+    Attributes:
+        response_format (type[BaseModel]): The structured output model to extract.
+        include_markdown (bool): Whether the Azure AI Document Intelligence Markdown is included in the prompt and used for confidence.
+        include_images (bool): Whether the page images are included in the prompt.
+        max_concurrency (int): The maximum number of documents processed concurrently.
+        pages_per_shard (Optional[int]): The maximum number of pages analyzed together, with the page ranges of longer documents analyzed concurrently.
+        tracer (Tracer): The tracer that records a span for each document and each of its stages.
+        credential (Optional[any]): The asynchronous credential of the clients, if any, closed together with them.
+    """
+
+    def __init__(
+        self,
+        openai_client: AsyncAzureOpenAI,
+        deployment: str,
+        response_format: type[BaseModel],
+        user_prompt: str,
+        document_intelligence_client: Optional[DocumentIntelligenceClient] = None,
+        system_prompt: str = "You are an AI assistant that extracts data from documents.",
+        include_markdown: bool = True,
+        include_images: bool = True,
+        evaluator: Optional[AccuracyEvaluator] = None,
+        max_concurrency: int = 4,
+        max_render_workers: Optional[int] = None,
+        model_id: str = "prebuilt-layout",
+        model: str = "gpt-4o",
+        max_tokens: int = 4096,
+        pages_per_shard: Optional[int] = None,
+        tracer: Optional[Tracer] = None,
+        credential: Optional[any] = None
+    ):
+        """
+        Initializes a new instance of the ExtractionPipeline class.
+
+        Args:
+            openai_client: The asynchronous Azure OpenAI client.
+            deployment: The name of the Azure OpenAI chat model deployment.
+            response_format: The structured output model to extract.
+            user_prompt: The user prompt describing the extraction.
+            document_intelligence_client: The asynchronous Azure AI Document Intelligence client. Required if include_markdown is True.
+            system_prompt: The system prompt.
+            include_markdown: Whether the Azure AI Document Intelligence Markdown is included in the prompt and used for confidence.
+            include_images: Whether the page images are included in the prompt.
+            evaluator: The evaluator used to determine accuracy when expected values are provided.
+            max_concurrency: The maximum number of documents processed concurrently.
+            max_render_workers: The maximum number of threads used to render and encode page images.
+            model_id: The Azure AI Document Intelligence model to analyze documents with.
+            model: The OpenAI model name used to determine the token encoding for confidence.
+            max_tokens: The maximum number of tokens in the completion.
+            pages_per_shard: The maximum number of pages analyzed together, with the page ranges of longer documents analyzed concurrently. Defaults to analyzing each document at once.
+            tracer: The tracer that records a span for each document and each of its stages. Defaults to the default tracer.
+            credential: The asynchronous credential of the clients, if any, closed together with them by aclose.
+        """
+
+        if include_markdown and document_intelligence_client is None:
+            raise ValueError(
+                "A document_intelligence_client is required when include_markdown is True")
+
+        self.openai_client = openai_client
+        self.deployment = deployment
+        self.response_format = response_format
+        self.user_prompt = user_prompt
+        self.document_intelligence_client = document_intelligence_client
+        self.system_prompt = system_prompt
+        self.include_markdown = include_markdown
+        self.include_images = include_images
+        self.evaluator = evaluator
+        self.max_concurrency = max_concurrency
+        self.model_id = model_id
+        self.model = model
+        self.max_tokens = max_tokens
+        self.pages_per_shard = pages_per_shard
+        self.tracer = tracer or get_tracer()
+        self.credential = credential
+        self._render_executor = ThreadPoolExecutor(
+            max_workers=max_render_workers)
+
+    def close(self):
+        """
+        Shuts down the page rendering threads.
+        """
+
+        self._render_executor.shutdown(wait=False)
+
+    async def aclose(self):
+        """
+        Shuts down the page rendering threads, and closes the service clients and their credential, within the event loop that used them.
+        """
+
+        self.close()
+        for client in (self.openai_client, self.document_intelligence_client, self.credential):
+            if client is not None:
+                await client.close()
+
+    async def run(
+        self,
+        pdf_fpath: str,
+        expected: Optional[dict] = None
+    ) -> DataExtractionResult:
+        """
+        Runs the extraction pipeline for a single document.
+
+        Args:
+            pdf_fpath: The path of the PDF document.
+            expected: The expected values used to determine accuracy, if available.
+
+        Returns:
+            DataExtractionResult: The extraction result, including the execution time of each stage.
+        """
+
+        pdf_fname = os.path.basename(pdf_fpath)
+        with self.tracer.span("extraction", document=pdf_fname) as span, get_profiler().document(pdf_fname):
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            stage_timings = {}
+
+            document_bytes = await asyncio.to_thread(_read_file, pdf_fpath)
+            span.set_attribute("bytes", len(document_bytes))
+
+            # Render the page images while Azure AI Document Intelligence analyzes the document
+            analyze_task = asyncio.create_task(self._timed(
+                stage_timings, "document_intelligence", self._analyze(document_bytes)))
+            images_task = asyncio.create_task(self._timed(
+                stage_timings, "image_processing", self._render_pages(loop, document_bytes)))
+
+            analyze_result, images = await asyncio.gather(analyze_task, images_task)
+            if analyze_result is not None:
+                span.set_attribute("pages", len(analyze_result.pages or []))
+
+            user_content = [{"type": "text", "text": self.user_prompt}]
+            if analyze_result is not None:
+                user_content.append({"type": "text", "text": analyze_result.content})
+            user_content.extend(images)
+
+            completion = await self._timed(stage_timings, "openai", self.openai_client.beta.chat.completions.parse(
+                model=self.deployment,
+                messages=[
+                    {"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": user_content}
+                ],
+                response_format=self.response_format,
+                max_tokens=self.max_tokens,
+                temperature=0.1,
+                top_p=0.1,
+                logprobs=True
+            ))
+            span.set_attributes(
+                prompt_tokens=completion.usage.prompt_tokens,
+                completion_tokens=completion.usage.completion_tokens)
+
+            extract_result = completion.choices[0].message.parsed.model_dump()
+
+            confidence = await self._timed(stage_timings, "confidence", loop.run_in_executor(
+                None, bind_context(self._evaluate_confidence), extract_result, completion.choices[0], analyze_result))
+
+            accuracy = None
+            if expected is not None and self.evaluator is not None:
+                with self.tracer.span("accuracy"):
+                    accuracy = self.evaluator.evaluate(
+                        expected=expected, actual=extract_result)
+
+            return DataExtractionResult(
+                extract_result,
+                confidence,
+                accuracy,
+                completion.usage.prompt_tokens,
+                completion.usage.completion_tokens,
+                time.perf_counter() - start,
+                stage_timings=stage_timings
+            )
+
+    async def run_many(
+        self,
+        pdf_fpaths: list[str],
+        expected: Optional[list[Optional[dict]]] = None,
+        return_exceptions: bool = False
+    ) -> list[DataExtractionResult | BaseException]:
+        """
+        Runs the extraction pipeline for many documents, with at most max_concurrency documents in progress at any time.
+
+        Args:
+            pdf_fpaths: The paths of the PDF documents.
+            expected: The expected values for each document, if available.
+            return_exceptions: Whether to return exceptions in place of failed results instead of raising the first one.
+
+        Returns:
+            list[DataExtractionResult | BaseException]: The extraction results, in the same order as the documents.
+        """
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        expected = expected or [None] * len(pdf_fpaths)
+
+        async def run(pdf_fpath: str, document_expected: Optional[dict]) -> DataExtractionResult:
+            async with semaphore:
+                return await self.run(pdf_fpath, document_expected)
+
+        return await asyncio.gather(
+            *(run(pdf_fpath, document_expected)
+              for pdf_fpath, document_expected in zip(pdf_fpaths, expected)),
+            return_exceptions=return_exceptions
+        )
+
+    async def _analyze(self, document_bytes: bytes) -> Optional[AnalyzeResult]:
+        if not self.include_markdown:
+            return None
+
+        if self.pages_per_shard is not None:
+            return await analyze_document_sharded(
+                self.document_intelligence_client,
+                self.model_id,
+                document_bytes,
+                pages_per_shard=self.pages_per_shard,
+                output_content_format=DocumentContentFormat.MARKDOWN,
+                content_type="application/pdf"
+            )
+
+        poller = await self.document_intelligence_client.begin_analyze_document(
+            model_id=self.model_id,
+            body=document_bytes,
+            output_content_format=DocumentContentFormat.MARKDOWN,
+            content_type="application/pdf"
+        )
+        return await poller.result()
+
+    async def _render_pages(self, loop: asyncio.AbstractEventLoop, document_bytes: bytes) -> list[dict]:
+        if not self.include_images:
+            return []
+
+        pages = await loop.run_in_executor(
+            self._render_executor, convert_from_bytes, document_bytes)
+        return list(await asyncio.gather(
+            *(loop.run_in_executor(self._render_executor, encode_page, page) for page in pages)))
+
+    def _evaluate_confidence(self, extract_result: dict, choice: any, analyze_result: Optional[AnalyzeResult]) -> dict:
+        with self.tracer.span("openai_confidence"):
+            oai_confidence = evaluate_openai_confidence(
+                extract_result, choice, self.model, self.response_format)
+
+        if analyze_result is None:
+            return oai_confidence
+
+        with self.tracer.span("document_intelligence_confidence"):
+            di_confidence = evaluate_di_confidence(extract_result, analyze_result, self.response_format)
+        return merge_confidence_values(di_confidence, oai_confidence, self.response_format)
+
+    async def _timed(self, stage_timings: dict[str, float], stage: str, awaitable):
+        # The span is entered in the awaiting task, so that stages of concurrent documents are nested in their own document's span
+        with self.tracer.span(stage):
+            start = time.perf_counter()
+            try:
+                return await awaitable
+            finally:
+                stage_timings[stage] = time.perf_counter() - start
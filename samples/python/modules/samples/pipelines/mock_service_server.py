@@ -0,0 +1,440 @@
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from samples.pipelines.recorded_clients import get_recording_key
+
+SERVICES = ("document_intelligence", "openai", "language")
+
+_DI_ANALYZE_PATH = re.compile(
+    r"^/documentintelligence/documentModels/(?P<model_id>[^/:]+):analyze$")
+_DI_RESULT_PATH = re.compile(
+    r"^/documentintelligence/documentModels/(?P<model_id>[^/]+)/analyzeResults/(?P<operation_id>[^/]+)$")
+_OPENAI_CHAT_PATH = re.compile(
+    r"^/openai/deployments/(?P<deployment>[^/]+)/chat/completions$")
+_LANGUAGE_JOBS_PATH = re.compile(r"^/language/analyze-documents/jobs$")
+_LANGUAGE_JOB_PATH = re.compile(
+    r"^/language/analyze-documents/jobs/(?P<operation_id>[^/]+)$")
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _load_recordings(recordings_dir: Optional[str], service: str) -> dict[str, dict]:
+    if not recordings_dir:
+        return {}
+
+    recordings = {}
+    for fpath in sorted(glob.glob(os.path.join(recordings_dir, service, "*.json"))):
+        with open(fpath, 'r') as f:
+            recordings[os.path.basename(fpath)[:-len(".json")]] = json.load(f)
+
+    return recordings
+
+
+class _Operation:
+    def __init__(self, response: dict, latency: float):
+        self.response = response
+        self.created = _utc_now()
+        self.completes_at = time.perf_counter() + latency
+
+    def remaining(self) -> float:
+        return max(self.completes_at - time.perf_counter(), 0.0)
+
+
+class MockServiceServer:
+    """
+    A class representing a local stand-in for the Azure AI Document Intelligence, Azure OpenAI, and Azure AI Language native document APIs.
+
+    Replays the responses recorded by the RecordedDocumentIntelligenceClient and RecordedChatCompletionsClient, so that pipelines can be benchmarked
+    and load tested on a disconnected machine using the unmodified SDK clients pointed at the server's endpoint with a key credential.
+
+    Recordings are read from the 'document_intelligence', 'openai', and 'language' folders of the recordings directory.
+    Requests are matched to recordings by the same keys as the recorded clients. Language recordings are keyed by the hash of the job request body.
+    When no recording matches, the recordings are replayed in turn, and PII jobs are answered with a generated successful result.
+
+    Attributes:
+        latency (dict[str, float]): The seconds each service takes to respond, or for its long-running operations to complete.
+        replay_latency (bool): Whether the originally recorded latency is used instead, when available.
+        throttle_rate (float): The fraction of requests rejected with a 429 response.
+        retry_after (float): The seconds returned in the retry headers of throttled and in-progress responses.
+        strict (bool): Whether requests without a matching recording are rejected with a 404 response.
+        request_counts (Counter): The number of requests received per service.
+        throttled_counts (Counter): The number of requests rejected with a 429 response per service.
+    """
+
+    def __init__(
+        self,
+        recordings_dir: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float | dict[str, float] = 0.0,
+        replay_latency: bool = False,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.1,
+        strict: bool = False,
+        seed: Optional[int] = None
+    ):
+        """
+        Initializes a new instance of the MockServiceServer class.
+
+        Args:
+            recordings_dir: The directory the recordings are stored in.
+            host: The host name to listen on.
+            port: The port to listen on. Use 0 to pick a free port.
+            latency: The seconds each service takes to respond, as a single value or keyed by 'document_intelligence', 'openai', and 'language'.
+            replay_latency: Whether the originally recorded latency is used instead, when available.
+            throttle_rate: The fraction of requests rejected with a 429 response, between 0 and 1.
+            retry_after: The seconds returned in the retry headers of throttled and in-progress responses.
+            strict: Whether requests without a matching recording are rejected with a 404 response.
+            seed: The seed of the random throttling, for reproducible runs.
+        """
+
+        if isinstance(latency, dict):
+            self.latency = {service: latency.get(service, 0.0) for service in SERVICES}
+        else:
+            self.latency = {service: latency for service in SERVICES}
+
+        self.replay_latency = replay_latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.strict = strict
+        self.request_counts = Counter()
+        self.throttled_counts = Counter()
+
+        self._recordings = {
+            service: _load_recordings(recordings_dir, service) for service in SERVICES}
+        self._fallback_counts = Counter()
+        self._operations: dict[str, _Operation] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self._server = ThreadingHTTPServer((host, port), self._create_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def endpoint(self) -> str:
+        """
+        Gets the endpoint of the server, used in place of the Azure resource endpoints.
+
+        Returns:
+            str: The endpoint, e.g., 'http://127.0.0.1:8080'.
+        """
+
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockServiceServer':
+        """
+        Starts serving requests on a background thread.
+
+        Returns:
+            MockServiceServer: The started server.
+        """
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops serving requests and closes the listening socket.
+        """
+
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self):
+        """
+        Serves requests on the current thread until interrupted.
+        """
+
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def __enter__(self) -> 'MockServiceServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _should_throttle(self, service: str) -> bool:
+        with self._lock:
+            self.request_counts[service] += 1
+            if self.throttle_rate <= 0 or self._random.random() >= self.throttle_rate:
+                return False
+            self.throttled_counts[service] += 1
+            return True
+
+    def _get_recording(self, service: str, key: str, suffix: str = "") -> Optional[dict]:
+        recordings = self._recordings[service]
+        if key in recordings:
+            return recordings[key]
+
+        if self.strict:
+            return None
+
+        # Replay the recordings in turn when the request was not recorded, e.g., for load tests over generated documents
+        candidates = [name for name in recordings if name.endswith(suffix)]
+        if not candidates:
+            return None
+
+        with self._lock:
+            index = self._fallback_counts[service]
+            self._fallback_counts[service] += 1
+
+        return recordings[candidates[index % len(candidates)]]
+
+    def _get_latency(self, service: str, recording: Optional[dict]) -> float:
+        if self.replay_latency and recording is not None and "elapsed" in recording:
+            return recording["elapsed"]
+        return self.latency[service]
+
+    def _add_operation(self, response: dict, latency: float, operation_id: Optional[str] = None) -> str:
+        operation_id = operation_id or str(uuid.uuid4())
+        with self._lock:
+            self._operations[operation_id] = _Operation(response, latency)
+        return operation_id
+
+    def _get_operation(self, operation_id: str) -> Optional[_Operation]:
+        with self._lock:
+            return self._operations.get(operation_id)
+
+    def _analyze_document(self, model_id: str, body: bytes, query: str) -> tuple[int, dict, Optional[dict]]:
+        # Page ranges are keyed like the RecordedDocumentIntelligenceClient, so that each page range of a document replays its own recording
+        pages = parse_qs(query).get("pages")
+        suffix = f".{model_id}.pages-{pages[0]}" if pages else f".{model_id}"
+        recording = self._get_recording(
+            "document_intelligence", f"{get_recording_key(body)}{suffix}", suffix=suffix)
+        if recording is None:
+            return 404, {}, {"error": {"code": "NotFound", "message": "No recording matches the document"}}
+
+        operation_id = self._add_operation(
+            recording["response"], self._get_latency("document_intelligence", recording))
+        operation_location = f"{self.endpoint}/documentintelligence/documentModels/{model_id}/analyzeResults/{operation_id}?{query}"
+        return 202, {"Operation-Location": operation_location, "apim-request-id": operation_id}, None
+
+    def _get_analyze_result(self, operation_id: str) -> tuple[int, dict, Optional[dict]]:
+        operation = self._get_operation(operation_id)
+        if operation is None:
+            return 404, {}, {"error": {"code": "NotFound", "message": "Operation not found"}}
+
+        remaining = operation.remaining()
+        status = {
+            "status": "running" if remaining > 0 else "succeeded",
+            "createdDateTime": operation.created,
+            "lastUpdatedDateTime": _utc_now()
+        }
+        if remaining > 0:
+            return 200, {"retry-after-ms": str(int(min(remaining, self.retry_after) * 1000))}, status
+
+        return 200, {}, {**status, "analyzeResult": operation.response}
+
+    def _create_chat_completion(self, body: dict) -> tuple[int, dict, Optional[dict]]:
+        response_format = body.get("response_format") or {}
+        key = get_recording_key({
+            "messages": body.get("messages"),
+            "response_format": response_format.get("json_schema", {}).get("name"),
+            **{name: value for name, value in body.items() if name not in ("model", "messages", "response_format", "stream")}
+        })
+
+        recording = self._get_recording("openai", key)
+        if recording is None:
+            return 404, {}, {"error": {"code": "NotFound", "message": "No recording matches the request"}}
+
+        time.sleep(self._get_latency("openai", recording))
+        return 200, {}, recording["response"]
+
+    def _submit_language_job(self, body: dict, query: str) -> tuple[int, dict, Optional[dict]]:
+        recording = self._recordings["language"].get(get_recording_key(body))
+        if recording is None and self.strict:
+            return 404, {}, {"error": {"code": "NotFound", "message": "No recording matches the job"}}
+
+        operation_id = str(uuid.uuid4())
+        response = recording["response"] if recording else self._generate_language_job_result(body)
+        self._add_operation(
+            {**response, "jobId": operation_id}, self._get_latency("language", recording), operation_id)
+
+        operation_location = f"{self.endpoint}/language/analyze-documents/jobs/{operation_id}?{query}"
+        return 202, {"operation-location": operation_location}, None
+
+    def _get_language_job(self, operation_id: str) -> tuple[int, dict, Optional[dict]]:
+        operation = self._get_operation(operation_id)
+        if operation is None:
+            return 404, {}, {"error": {"code": "NotFound", "message": "Job not found"}}
+
+        remaining = operation.remaining()
+        if remaining > 0:
+            return 200, {"retry-after-ms": str(int(min(remaining, self.retry_after) * 1000))}, {
+                "jobId": operation_id,
+                "status": "running",
+                "createdDateTime": operation.created,
+                "lastUpdatedDateTime": _utc_now()
+            }
+
+        return 200, {}, operation.response
+
+    @staticmethod
+    def _generate_language_job_result(body: dict) -> dict:
+        now = datetime.now(timezone.utc)
+        documents = body.get("analysisInput", {}).get("documents", [])
+        tasks = body.get("tasks", [])
+
+        return {
+            "jobId": "",
+            "createdDateTime": now.isoformat(),
+            "lastUpdatedDateTime": now.isoformat(),
+            "expirationDateTime": (now + timedelta(days=1)).isoformat(),
+            "status": "succeeded",
+            "errors": [],
+            "displayName": body.get("displayName", ""),
+            "tasks": {
+                "completed": len(tasks),
+                "failed": 0,
+                "inProgress": 0,
+                "total": len(tasks),
+                "items": [{
+                    "kind": f"{task.get('kind', '')}LROResults",
+                    "taskName": task.get("taskName", ""),
+                    "lastUpdateDateTime": now.isoformat(),
+                    "status": "succeeded",
+                    "results": {
+                        "documents": [{
+                            "id": document["id"],
+                            "source": {"kind": "AzureBlob", "location": document["source"]["location"]},
+                            "targets": [{
+                                "kind": "AzureBlob",
+                                "location": f"{document['target']['location'].rstrip('/')}/{os.path.basename(urlparse(document['source']['location']).path)}"
+                            }],
+                            "warnings": []
+                        } for document in documents],
+                        "errors": [],
+                        "modelVersion": "mock"
+                    }
+                } for task in tasks]
+            }
+        }
+
+    def _route(self, method: str, path: str, query: str, body: bytes) -> tuple[Optional[str], Optional[Callable[[], tuple[int, dict, Optional[dict]]]]]:
+        if method == "POST" and (match := _DI_ANALYZE_PATH.match(path)):
+            return "document_intelligence", lambda: self._analyze_document(match["model_id"], body, query)
+        if method == "GET" and (match := _DI_RESULT_PATH.match(path)):
+            return "document_intelligence", lambda: self._get_analyze_result(match["operation_id"])
+        if method == "POST" and (match := _OPENAI_CHAT_PATH.match(path)):
+            return "openai", lambda: self._create_chat_completion(json.loads(body))
+        if method == "POST" and _LANGUAGE_JOBS_PATH.match(path):
+            return "language", lambda: self._submit_language_job(json.loads(body), query)
+        if method == "GET" and (match := _LANGUAGE_JOB_PATH.match(path)):
+            return "language", lambda: self._get_language_job(match["operation_id"])
+        return None, None
+
+    def _create_handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self, method: str):
+                url = urlparse(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+                service, handle = server._route(method, url.path, url.query, body)
+                if service is None:
+                    self._respond(404, {}, {"error": {"code": "NotFound", "message": f"{method} {url.path} is not supported"}})
+                    return
+
+                if server._should_throttle(service):
+                    # Azure services send both headers, and some clients only retry throttled POST requests when 'Retry-After' is present
+                    self._respond(429, {
+                        "Retry-After": str(math.ceil(server.retry_after)),
+                        "retry-after-ms": str(int(server.retry_after * 1000))
+                    }, {
+                        "error": {"code": "429", "message": "Rate limit is exceeded. Try again later."}})
+                    return
+
+                self._respond(*handle())
+
+            def _respond(self, status_code: int, headers: dict, body: Optional[dict]):
+                content = json.dumps(body).encode('utf-8') if body is not None else b""
+                self.send_response(status_code)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serves recorded Azure AI Document Intelligence, Azure OpenAI, and Azure AI Language responses locally.")
+    parser.add_argument("--recordings-dir",
+                        help="The directory the recordings are stored in.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="The host name to listen on.")
+    parser.add_argument("--port", type=int, default=8080,
+                        help="The port to listen on.")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="The seconds each service takes to respond, or for its long-running operations to complete.")
+    parser.add_argument("--replay-latency", action="store_true",
+                        help="Whether the originally recorded latency is used instead, when available.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="The fraction of requests rejected with a 429 response.")
+    parser.add_argument("--retry-after", type=float, default=0.1,
+                        help="The seconds returned in the retry headers of throttled and in-progress responses.")
+    parser.add_argument("--strict", action="store_true",
+                        help="Whether requests without a matching recording are rejected with a 404 response.")
+    parser.add_argument("--seed", type=int,
+                        help="The seed of the random throttling.")
+    args = parser.parse_args()
+
+    server = MockServiceServer(
+        recordings_dir=args.recordings_dir,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        replay_latency=args.replay_latency,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        strict=args.strict,
+        seed=args.seed
+    )
+
+    print(f"Serving on {server.endpoint}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
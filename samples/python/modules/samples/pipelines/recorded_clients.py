@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from types import SimpleNamespace
+from typing import Literal, Optional
+from azure.ai.documentintelligence.models import AnalyzeResult
+from openai.types.chat import ParsedChatCompletion
+
+from samples.utils.storage_utils import create_json_file
+
+RecordingMode = Literal["record", "replay"]
+
+
+def get_recording_key(value: any) -> str:
+    """
+    Gets the key of a recording from the document bytes or request it was recorded for.
+
+    Args:
+        value: The document bytes, or a JSON serializable request.
+
+    Returns:
+        str: The SHA-256 hash of the value.
+    """
+
+    if isinstance(value, bytes):
+        return hashlib.sha256(value).hexdigest()
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _read_recording(fpath: str) -> dict:
+    if not os.path.exists(fpath):
+        raise FileNotFoundError(
+            f"No recording found at {fpath}. Run in 'record' mode against the live services first.")
+
+    with open(fpath, 'r') as f:
+        return json.load(f)
+
+
+class _CompletedPoller:
+    def __init__(self, result: AnalyzeResult):
+        self._result = result
+
+    async def result(self) -> AnalyzeResult:
+        return self._result
+
+
+class RecordedDocumentIntelligenceClient:
+    """
+    A class wrapping an asynchronous Azure AI Document Intelligence client to record analysis results, or to replay them offline.
+
+    Recordings are keyed by a hash of the document and the model, and the page range if any, so replays are independent of file names
+    and the shards of a sharded analysis are recorded separately.
+
+    Attributes:
+        recordings_dir (str): The directory the recordings are stored in.
+        mode (RecordingMode): Whether results are recorded from the live service or replayed from the recordings.
+        replay_latency (bool): Whether replays wait for the originally recorded latency.
+    """
+
+    def __init__(
+        self,
+        recordings_dir: str,
+        mode: RecordingMode,
+        client: Optional[any] = None,
+        replay_latency: bool = False
+    ):
+        """
+        Initializes a new instance of the RecordedDocumentIntelligenceClient class.
+
+        Args:
+            recordings_dir: The directory the recordings are stored in.
+            mode: Whether results are recorded from the live service or replayed from the recordings.
+            client: The asynchronous DocumentIntelligenceClient. Required in 'record' mode.
+            replay_latency: Whether replays wait for the originally recorded latency.
+        """
+
+        if mode == "record" and client is None:
+            raise ValueError("A client is required in 'record' mode")
+
+        self.recordings_dir = os.path.join(recordings_dir, "document_intelligence")
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._client = client
+
+    async def begin_analyze_document(self, model_id: str, body: bytes, **kwargs) -> _CompletedPoller:
+        """
+        Analyzes a document, or replays the recorded analysis of the same document, model, and page range.
+
+        Args:
+            model_id: The Azure AI Document Intelligence model to analyze the document with.
+            body: The document bytes.
+            **kwargs: The additional arguments passed to the live client.
+
+        Returns:
+            _CompletedPoller: A poller whose result is the AnalyzeResult.
+        """
+
+        pages = f".pages-{kwargs['pages']}" if kwargs.get('pages') else ""
+        fpath = os.path.join(
+            self.recordings_dir, f"{get_recording_key(body)}.{model_id}{pages}.json")
+
+        if self.mode == "replay":
+            recording = await asyncio.to_thread(_read_recording, fpath)
+            if self.replay_latency:
+                await asyncio.sleep(recording["elapsed"])
+            return _CompletedPoller(AnalyzeResult(recording["response"]))
+
+        start = time.perf_counter()
+        poller = await self._client.begin_analyze_document(model_id=model_id, body=body, **kwargs)
+        result: AnalyzeResult = await poller.result()
+        elapsed = time.perf_counter() - start
+
+        await asyncio.to_thread(create_json_file, fpath, {
+            "elapsed": elapsed,
+            "response": result.as_dict()
+        })
+
+        return _CompletedPoller(result)
+
+    async def close(self):
+        """
+        Closes the wrapped live client, if any.
+        """
+
+        if self._client is not None:
+            await self._client.close()
+
+
+class RecordedChatCompletionsClient:
+    """
+    A class wrapping an asynchronous Azure OpenAI client to record structured output chat completions, or to replay them offline.
+
+    Exposes the same 'beta.chat.completions.parse' shape as the wrapped client. Recordings are keyed by a hash of the request, excluding the deployment name.
+
+    Attributes:
+        recordings_dir (str): The directory the recordings are stored in.
+        mode (RecordingMode): Whether completions are recorded from the live service or replayed from the recordings.
+        replay_latency (bool): Whether replays wait for the originally recorded latency.
+    """
+
+    def __init__(
+        self,
+        recordings_dir: str,
+        mode: RecordingMode,
+        client: Optional[any] = None,
+        replay_latency: bool = False
+    ):
+        """
+        Initializes a new instance of the RecordedChatCompletionsClient class.
+
+        Args:
+            recordings_dir: The directory the recordings are stored in.
+            mode: Whether completions are recorded from the live service or replayed from the recordings.
+            client: The asynchronous AzureOpenAI client. Required in 'record' mode.
+            replay_latency: Whether replays wait for the originally recorded latency.
+        """
+
+        if mode == "record" and client is None:
+            raise ValueError("A client is required in 'record' mode")
+
+        self.recordings_dir = os.path.join(recordings_dir, "openai")
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._client = client
+        self.beta = SimpleNamespace(chat=SimpleNamespace(completions=self))
+
+    async def close(self):
+        """
+        Closes the wrapped live client, if any.
+        """
+
+        if self._client is not None:
+            await self._client.close()
+
+    async def parse(self, model: str, messages: list[dict], response_format: type, **kwargs) -> ParsedChatCompletion:
+        """
+        Creates a structured output chat completion, or replays the recorded completion of the same request.
+
+        Args:
+            model: The name of the chat model deployment.
+            messages: The chat messages.
+            response_format: The structured output model.
+            **kwargs: The additional arguments passed to the live client.
+
+        Returns:
+            ParsedChatCompletion: The parsed chat completion.
+        """
+
+        # The deployment name is excluded from the key so that recordings can be replayed without the live settings
+        key = get_recording_key({
+            "messages": messages,
+            "response_format": response_format.__name__,
+            **kwargs
+        })
+        fpath = os.path.join(self.recordings_dir, f"{key}.json")
+
+        if self.mode == "replay":
+            recording = await asyncio.to_thread(_read_recording, fpath)
+            if self.replay_latency:
+                await asyncio.sleep(recording["elapsed"])
+            return ParsedChatCompletion[response_format].model_validate(recording["response"])
+
+        start = time.perf_counter()
+        completion = await self._client.beta.chat.completions.parse(
+            model=model,
+            messages=messages,
+            response_format=response_format,
+            **kwargs
+        )
+        elapsed = time.perf_counter() - start
+
+        await asyncio.to_thread(create_json_file, fpath, {
+            "elapsed": elapsed,
+            "response": completion.model_dump(mode="json")
+        })
+
+        return completion
@@ -0,0 +1,257 @@
+import fnmatch
+import mimetypes
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from azure.storage.blob import BlobClient, BlobServiceClient, ContentSettings
+from samples.utils.storage_utils import create_directory
+
+# Chunk sizes used for parallel block uploads and ranged downloads.
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+DEFAULT_SINGLE_PUT_SIZE = 8 * 1024 * 1024
+DEFAULT_CHUNK_GET_SIZE = 4 * 1024 * 1024
+DEFAULT_SINGLE_GET_SIZE = 8 * 1024 * 1024
+
+
+def create_blob_service_client(
+    account_url: Optional[str] = None,
+    credential: any = None,
+    connection_string: Optional[str] = None,
+    max_block_size: int = DEFAULT_BLOCK_SIZE,
+    max_single_put_size: int = DEFAULT_SINGLE_PUT_SIZE,
+    max_chunk_get_size: int = DEFAULT_CHUNK_GET_SIZE,
+    max_single_get_size: int = DEFAULT_SINGLE_GET_SIZE
+) -> BlobServiceClient:
+    """
+    Creates a BlobServiceClient configured for chunked, parallel transfers.
+
+    A single client should be shared across all transfers so that its connection pool is reused.
+    Use a connection string, e.g., 'UseDevelopmentStorage=true', to target a local storage emulator such as Azurite.
+
+    Args:
+        account_url: The URL of the storage account, e.g., 'https://<account>.blob.core.windows.net'.
+        credential: The credential to use for authentication with the account URL.
+        connection_string: The connection string to use instead of the account URL and credential.
+        max_block_size: The size of each block when uploading in chunks.
+        max_single_put_size: The maximum size of a blob uploaded in a single request.
+        max_chunk_get_size: The size of each range when downloading in chunks.
+        max_single_get_size: The size of the first range downloaded in a single request.
+
+    Returns:
+        BlobServiceClient: The configured BlobServiceClient.
+    """
+
+    transfer_options = {
+        'max_block_size': max_block_size,
+        'max_single_put_size': max_single_put_size,
+        'max_chunk_get_size': max_chunk_get_size,
+        'max_single_get_size': max_single_get_size
+    }
+
+    if connection_string:
+        return BlobServiceClient.from_connection_string(connection_string, **transfer_options)
+
+    return BlobServiceClient(account_url=account_url, credential=credential, **transfer_options)
+
+
+def upload_file(
+    blob_service_client: BlobServiceClient,
+    container_name: str,
+    blob_name: str,
+    fpath: str,
+    max_concurrency: int = 4,
+    overwrite: bool = True
+) -> str:
+    """
+    Uploads a local file to a blob, streaming it from disk in parallel blocks.
+
+    Args:
+        blob_service_client: The shared BlobServiceClient.
+        container_name: The name of the container to upload to.
+        blob_name: The name of the blob to upload to.
+        fpath: The path of the local file to upload.
+        max_concurrency: The maximum number of blocks uploaded in parallel.
+        overwrite: Whether to overwrite the blob if it exists.
+
+    Returns:
+        str: The URL of the uploaded blob.
+    """
+
+    blob_client = blob_service_client.get_blob_client(container_name, blob_name)
+    content_type, _ = mimetypes.guess_type(fpath)
+
+    with open(fpath, 'rb') as f:
+        blob_client.upload_blob(
+            f,
+            length=os.path.getsize(fpath),
+            overwrite=overwrite,
+            max_concurrency=max_concurrency,
+            content_settings=ContentSettings(content_type=content_type) if content_type else None
+        )
+
+    return blob_client.url
+
+
+def download_file(
+    blob_service_client: BlobServiceClient,
+    container_name: str,
+    blob_name: str,
+    fpath: str,
+    max_concurrency: int = 4
+) -> str:
+    """
+    Downloads a blob to a local file, streaming parallel ranges straight to disk.
+
+    The file is written to a temporary path and moved into place once complete, so a partially downloaded file is never left at the destination.
+
+    Args:
+        blob_service_client: The shared BlobServiceClient.
+        container_name: The name of the container to download from.
+        blob_name: The name of the blob to download.
+        fpath: The path of the local file to write.
+        max_concurrency: The maximum number of ranges downloaded in parallel.
+
+    Returns:
+        str: The path of the downloaded file.
+    """
+
+    if os.path.dirname(fpath) and not os.path.exists(os.path.dirname(fpath)):
+        create_directory(os.path.dirname(fpath))
+
+    blob_client = blob_service_client.get_blob_client(container_name, blob_name)
+    downloader = blob_client.download_blob(max_concurrency=max_concurrency)
+
+    tmp_fpath = f"{fpath}.partial"
+    try:
+        with open(tmp_fpath, 'wb') as f:
+            downloader.readinto(f)
+        os.replace(tmp_fpath, fpath)
+    finally:
+        if os.path.exists(tmp_fpath):
+            os.remove(tmp_fpath)
+
+    return fpath
+
+
+def download_file_from_url(
+    blob_service_client: BlobServiceClient,
+    blob_url: str,
+    fpath: str,
+    max_concurrency: int = 4
+) -> str:
+    """
+    Downloads a blob identified by its URL, e.g., a redacted or translated document target location, to a local file.
+
+    Args:
+        blob_service_client: The shared BlobServiceClient.
+        blob_url: The URL of the blob to download.
+        fpath: The path of the local file to write.
+        max_concurrency: The maximum number of ranges downloaded in parallel.
+
+    Returns:
+        str: The path of the downloaded file.
+    """
+
+    blob_client = BlobClient.from_blob_url(blob_url)
+    return download_file(
+        blob_service_client,
+        blob_client.container_name,
+        blob_client.blob_name,
+        fpath,
+        max_concurrency=max_concurrency
+    )
+
+
+def upload_directory(
+    blob_service_client: BlobServiceClient,
+    container_name: str,
+    directory: str,
+    prefix: str = '',
+    pattern: str = '*',
+    max_file_concurrency: int = 8,
+    max_concurrency: int = 4,
+    overwrite: bool = True
+) -> list[str]:
+    """
+    Uploads the files in a local directory that match a pattern, processing several files concurrently.
+
+    Args:
+        blob_service_client: The shared BlobServiceClient.
+        container_name: The name of the container to upload to.
+        directory: The local directory to upload.
+        prefix: The blob name prefix for the uploaded files, e.g., 'raw/'.
+        pattern: The file name pattern to match, e.g., '*.pdf'.
+        max_file_concurrency: The maximum number of files uploaded concurrently.
+        max_concurrency: The maximum number of blocks uploaded in parallel per file.
+        overwrite: Whether to overwrite blobs that exist.
+
+    Returns:
+        list[str]: The URLs of the uploaded blobs.
+    """
+
+    uploads = []
+    for root, _, files in os.walk(directory):
+        for fname in sorted(fnmatch.filter(files, pattern)):
+            fpath = os.path.join(root, fname)
+            relative_path = os.path.relpath(fpath, directory).replace(os.sep, '/')
+            uploads.append((f"{prefix}{relative_path}", fpath))
+
+    with ThreadPoolExecutor(max_workers=max_file_concurrency) as executor:
+        return list(executor.map(
+            lambda upload: upload_file(
+                blob_service_client, container_name, upload[0], upload[1], max_concurrency, overwrite),
+            uploads
+        ))
+
+
+def download_directory(
+    blob_service_client: BlobServiceClient,
+    container_name: str,
+    prefix: str,
+    directory: str,
+    max_file_concurrency: int = 8,
+    max_concurrency: int = 4
+) -> list[str]:
+    """
+    Downloads all blobs that start with a prefix to a local directory, processing several blobs concurrently.
+
+    Args:
+        blob_service_client: The shared BlobServiceClient.
+        container_name: The name of the container to download from.
+        prefix: The blob name prefix to download, e.g., 'processed/'.
+        directory: The local directory to download to, preserving the blob names relative to the prefix.
+        max_file_concurrency: The maximum number of blobs downloaded concurrently.
+        max_concurrency: The maximum number of ranges downloaded in parallel per blob.
+
+    Returns:
+        list[str]: The paths of the downloaded files.
+
+    Raises:
+        ValueError: If a blob name resolves to a path outside the directory, e.g., with '..' segments. No blobs are downloaded in that case.
+    """
+
+    container_client = blob_service_client.get_container_client(container_name)
+    root = os.path.realpath(directory)
+
+    downloads = []
+    for blob in container_client.list_blobs(name_starts_with=prefix):
+        file_path = os.path.realpath(
+            os.path.join(root, *blob.name[len(prefix):].lstrip('/').split('/')))
+        if file_path == root:
+            # The prefix itself, e.g., a directory marker blob, has no file to download to
+            continue
+        if os.path.commonpath([root, file_path]) != root:
+            raise ValueError(f"Blob '{blob.name}' resolves to a path outside of '{directory}'.")
+        downloads.append((blob.name, file_path))
+
+    with ThreadPoolExecutor(max_workers=max_file_concurrency) as executor:
+        return list(executor.map(
+            lambda download: download_file(
+                blob_service_client,
+                container_name,
+                download[0],
+                download[1],
+                max_concurrency
+            ),
+            downloads
+        ))
@@ -1,4 +1,26 @@
 import json
+from functools import lru_cache
+from operator import methodcaller
+from typing import Callable, Optional
+
+
+@lru_cache(maxsize=None)
+def get_json_converter(obj_type: type) -> Optional[Callable[[any], any]]:
+    """
+    Gets the function that converts objects of a type to a JSON-compatible format.
+    The type is checked for a 'to_dict', 'as_dict', or 'model_dump' method once, and the result is cached for all later objects of the type.
+
+    Args:
+        obj_type: The type of the objects to convert.
+
+    Returns:
+        Optional[Callable[[any], any]]: The function that calls the object's dictionary method, or None if the type has none.
+    """
+
+    for method in ('to_dict', 'as_dict', 'model_dump'):
+        if callable(getattr(obj_type, method, None)):
+            return methodcaller(method)
+    return None
 
 
 class CustomJsonEncoder(json.JSONEncoder):
@@ -10,6 +32,7 @@ class CustomJsonEncoder(json.JSONEncoder):
         """
         Serializes the object to a JSON-compatible format.
         Checks if the object has a 'to_dict', 'as_dict', or 'model_dump' method and calls it to get the dictionary representation.
+        The method is looked up once per type.
 
         Args:
             obj: The object to serialize.
@@ -18,10 +41,7 @@ class CustomJsonEncoder(json.JSONEncoder):
             str: The serialized object as a JSON-compatible format.
         """
 
-        if hasattr(obj, 'to_dict'):
-            return obj.to_dict()
-        if hasattr(obj, 'as_dict'):
-            return obj.as_dict()
-        if hasattr(obj, 'model_dump'):
-            return obj.model_dump()
+        converter = get_json_converter(type(obj))
+        if converter is not None:
+            return converter(obj)
         return super().default(obj)
@@ -0,0 +1,280 @@
+import asyncio
+import heapq
+import itertools
+import time
+from enum import Enum
+from typing import AsyncIterator, Iterable, Optional
+from azure.ai.documentintelligence.models import AnalyzeResult
+from azure.core.rest import HttpRequest
+
+from samples.language.operation_poller import OperationPoller, PollingMetrics, RETRYABLE_STATUS_CODES, get_retry_after
+
+DEFAULT_API_VERSION = "2024-11-30"
+
+
+class BulkAnalyzeResult:
+    """
+    A class representing the outcome of analyzing one document of a bulk analysis.
+
+    Attributes:
+        id (str): The id of the document.
+        result (Optional[AnalyzeResult]): The analysis result, if the analysis succeeded.
+        error (Optional[str]): The error, if the submission or analysis failed.
+        metrics (PollingMetrics): The metrics collected while polling the document's operation.
+    """
+
+    def __init__(self, id: str):
+        """
+        Initializes a new instance of the BulkAnalyzeResult class.
+
+        Args:
+            id: The id of the document.
+        """
+
+        self.id = id
+        self.result: Optional[AnalyzeResult] = None
+        self.error: Optional[str] = None
+        self.metrics = PollingMetrics()
+
+    def to_dict(self) -> dict:
+        """
+        Converts the BulkAnalyzeResult object to a dictionary.
+
+        Returns:
+            dict: The BulkAnalyzeResult object as a dictionary.
+        """
+
+        return {
+            'id': self.id,
+            'result': self.result,
+            'error': self.error,
+            'metrics': self.metrics
+        }
+
+
+class _Operation:
+    def __init__(self, outcome: BulkAnalyzeResult, location: str, initial_delay: float):
+        self.outcome = outcome
+        self.location = location
+        self.start = time.perf_counter()
+        self.attempt = 0
+        self.retries = 0
+        self.next_poll = self.start + initial_delay
+
+
+def _to_query_params(kwargs: dict) -> dict[str, str]:
+    # Converts the keyword arguments of begin_analyze_document, e.g., output_content_format, to the REST query parameters
+    params = {}
+    for key, value in kwargs.items():
+        if value is None:
+            continue
+        head, *tail = key.split('_')
+        name = head + ''.join(part.capitalize() for part in tail)
+        if isinstance(value, (list, tuple)):
+            value = ','.join(item.value if isinstance(item, Enum) else str(item) for item in value)
+        elif isinstance(value, Enum):
+            value = value.value
+        params[name] = str(value)
+    return params
+
+
+async def _analyze_documents_with_pollers(
+    client: any,
+    model_id: str,
+    documents: Iterable[tuple[str, bytes]],
+    max_in_flight: int,
+    **kwargs
+) -> AsyncIterator[BulkAnalyzeResult]:
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def analyze(doc_id: str, document_bytes: bytes) -> BulkAnalyzeResult:
+        outcome = BulkAnalyzeResult(doc_id)
+        start = time.perf_counter()
+        try:
+            async with semaphore:
+                poller = await client.begin_analyze_document(model_id=model_id, body=document_bytes, **kwargs)
+                outcome.result = await poller.result()
+            outcome.metrics.time_to_completion = time.perf_counter() - start
+        except Exception as e:
+            outcome.error = repr(e)
+        return outcome
+
+    for task in asyncio.as_completed([analyze(doc_id, document_bytes) for doc_id, document_bytes in documents]):
+        yield await task
+
+
+async def analyze_documents_bulk(
+    client: any,
+    model_id: str,
+    documents: Iterable[tuple[str, bytes]],
+    max_in_flight: int = 16,
+    poller: Optional[OperationPoller] = None,
+    api_version: str = DEFAULT_API_VERSION,
+    **kwargs
+) -> AsyncIterator[BulkAnalyzeResult]:
+    """
+    Analyzes many documents with Azure AI Document Intelligence, yielding each result as soon as its analysis completes.
+
+    Documents are submitted up front, up to max_in_flight operations at a time, and every operation is polled from this single task
+    on a shared schedule, honoring each operation's Retry-After hint or backing off with the poller's jittered exponential backoff.
+    Throttled submissions and status requests are retried up to the poller's max_retries consecutive times, operations are abandoned after
+    the poller's timeout, and a failed document is yielded with its error rather than raised.
+
+    Clients without send_request, e.g., a RecordedDocumentIntelligenceClient replaying offline, are analyzed with a poller per document instead.
+
+    Args:
+        client: The asynchronous DocumentIntelligenceClient.
+        model_id: The Azure AI Document Intelligence model to analyze the documents with, e.g., 'prebuilt-layout'.
+        documents: The id and bytes of each document. Documents are read from the iterable as operations complete.
+        max_in_flight: The maximum number of operations submitted and not yet completed, e.g., to stay within the resource's quota.
+        poller: The polling configuration, defaulting to an OperationPoller with its default intervals.
+        api_version: The Azure AI Document Intelligence REST API version.
+        **kwargs: The additional arguments of begin_analyze_document, e.g., output_content_format or pages.
+
+    Returns:
+        AsyncIterator[BulkAnalyzeResult]: The outcome of each document, in the order the analyses complete.
+    """
+
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be positive")
+
+    if not hasattr(client, 'send_request'):
+        async for outcome in _analyze_documents_with_pollers(client, model_id, documents, max_in_flight, **kwargs):
+            yield outcome
+        return
+
+    poller = poller or OperationPoller()
+    params = {"api-version": api_version, **_to_query_params(kwargs)}
+    documents = iter(documents)
+    schedule: list[tuple[float, int, _Operation]] = []
+    sequence = itertools.count()
+    exhausted = False
+
+    async def submit(doc_id: str, document_bytes: bytes) -> tuple[BulkAnalyzeResult, Optional[_Operation]]:
+        outcome = BulkAnalyzeResult(doc_id)
+        request = HttpRequest(
+            "POST",
+            f"/documentModels/{model_id}:analyze",
+            params=params,
+            headers={"Content-Type": "application/octet-stream"},
+            content=document_bytes
+        )
+
+        try:
+            response = await poller.send_async(lambda: client.send_request(request))
+        except Exception as e:
+            outcome.error = repr(e)
+            return outcome, None
+
+        location = response.headers.get("operation-location")
+        if not location:
+            outcome.error = f"The analyze response of {doc_id} has no Operation-Location header"
+            return outcome, None
+
+        initial_delay = get_retry_after(response.headers)
+        return outcome, _Operation(outcome, location, initial_delay if initial_delay is not None else poller.polling_interval)
+
+    async def get_status(operation: _Operation) -> any:
+        return await client.send_request(HttpRequest("GET", operation.location))
+
+    def reschedule(operation: _Operation, response: Optional[any]):
+        operation.attempt += 1
+        delay = get_retry_after(response.headers) if response is not None else None
+        if delay is None:
+            delay = poller.get_backoff_delay(operation.attempt)
+        operation.outcome.metrics.total_wait += delay
+        operation.next_poll = time.perf_counter() + delay
+        heapq.heappush(schedule, (operation.next_poll, next(sequence), operation))
+
+    # Submissions run as tasks, so that throttled submissions retrying with backoff do not stall polling the submitted operations
+    pending: set[asyncio.Task] = set()
+
+    try:
+        while True:
+            # Submit documents until the in-flight limit is reached
+            while not exhausted and len(schedule) + len(pending) < max_in_flight:
+                document = next(documents, None)
+                if document is None:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(submit(*document)))
+
+            # Schedule the first poll of the operations of completed submissions
+            for task in [task for task in pending if task.done()]:
+                pending.discard(task)
+                outcome, operation = task.result()
+                if operation is None:
+                    yield outcome
+                else:
+                    outcome.metrics.total_wait += operation.next_poll - operation.start
+                    heapq.heappush(schedule, (operation.next_poll, next(sequence), operation))
+
+            if not schedule and not pending:
+                if exhausted:
+                    return
+                continue
+
+            # Wait for the next due poll, or for a submission to complete
+            delay = schedule[0][0] - time.perf_counter() if schedule else None
+            if pending and (delay is None or delay > 0):
+                await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            elif delay is not None and delay > 0:
+                await asyncio.sleep(delay)
+
+            # Poll every operation that is due in one round of concurrent status requests
+            now = time.perf_counter()
+            due = []
+            while schedule and schedule[0][0] <= now:
+                due.append(heapq.heappop(schedule)[2])
+
+            responses = await asyncio.gather(*(get_status(operation) for operation in due), return_exceptions=True)
+
+            for operation, response in zip(due, responses):
+                outcome = operation.outcome
+                metrics = outcome.metrics
+                elapsed = time.perf_counter() - operation.start
+
+                if isinstance(response, BaseException):
+                    outcome.error = repr(response)
+                    yield outcome
+                    continue
+
+                metrics.poll_count += 1
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    # Consecutive throttled or transiently failed status requests are retried up to the poller's max_retries
+                    if operation.retries >= poller.max_retries:
+                        outcome.error = (f"Status request failed with {response.status_code} after {operation.retries} retries: "
+                                         f"{response.text()}")
+                        yield outcome
+                        continue
+                    operation.retries += 1
+                elif response.status_code >= 400:
+                    outcome.error = f"Status request failed with {response.status_code}: {response.text()}"
+                    yield outcome
+                    continue
+                else:
+                    operation.retries = 0
+                    if metrics.time_to_first_result is None:
+                        metrics.time_to_first_result = elapsed
+
+                    body = response.json()
+                    status = body.get("status")
+                    if status == "succeeded":
+                        metrics.time_to_completion = elapsed
+                        outcome.result = AnalyzeResult(body["analyzeResult"])
+                        yield outcome
+                        continue
+                    if status in ("failed", "canceled"):
+                        metrics.time_to_completion = elapsed
+                        outcome.error = str(body.get("error") or status)
+                        yield outcome
+                        continue
+
+                if poller.timeout is not None and elapsed >= poller.timeout:
+                    outcome.error = repr(TimeoutError(f"Operation did not complete within {poller.timeout} seconds"))
+                    yield outcome
+                else:
+                    reschedule(operation, response)
+    finally:
+        for task in pending:
+            task.cancel()
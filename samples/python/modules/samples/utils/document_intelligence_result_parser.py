@@ -1,6 +1,8 @@
 from __future__ import annotations
-from typing import Any, Dict, List
-from azure.ai.documentintelligence.models import DocumentField
+import os
+from collections.abc import Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
 VALUE_KEY_BY_TYPE: dict[str, str | None] = {
     "string": "valueString",
@@ -12,54 +14,127 @@ VALUE_KEY_BY_TYPE: dict[str, str | None] = {
     "array": None,
 }
 
+FALLBACK_VALUE_KEYS = (
+    "valueString",
+    "valueNumber",
+    "valueBoolean",
+    "valueSelectionGroup",
+    "valueAddress",
+    "valueObject",
+    "valueArray",
+)
 
-def __extract(node: Any) -> Any:
-    if isinstance(node, DocumentField):
-        node = node.as_dict()
-
-    if not isinstance(node, dict):
-        return node
+# The values of typed fields without a value, created per field for mutable defaults
+_DEFAULT_BY_TYPE = {
+    "string": lambda: "",
+    "number": lambda: 0.0,
+    "boolean": lambda: False,
+    "selectionGroup": list,
+    "address": dict,
+}
 
-    node_type: str | None = node.get("type")
 
-    if node_type == "object":
-        inner: Dict[str, Any] = node.get("valueObject", {})
-        return {k: __extract(v) for k, v in inner.items()}
+def __copy(value: Any) -> Any:
+    # Copies the nested fields, e.g., of an address, as plain dictionaries and lists, as DocumentField.as_dict would
+    if isinstance(value, Mapping):
+        return {k: __copy(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [__copy(item) for item in value]
+    return value
 
-    if node_type == "array":
-        inner_list: List[Any] = node.get("valueArray", [])
-        return [__extract(item) for item in inner_list]
 
+def __extract_value(node: Mapping, node_type: str | None) -> Any:
     value_key = VALUE_KEY_BY_TYPE.get(node_type)
     if value_key is not None:
         if value_key in node:
-            return node[value_key]
-        else:
-            if node_type == "string":
-                return ""
-            elif node_type == "number":
-                return 0.0
-            elif node_type == "boolean":
-                return False
-            elif node_type == "selectionGroup" or node_type == "array":
-                return []
-            elif node_type == "object" or node_type == "address":
-                return {}
-
-    for fallback in (
-        "valueString",
-        "valueNumber",
-        "valueBoolean",
-        "valueSelectionGroup",
-        "valueAddress",
-        "valueObject",
-        "valueArray",
-    ):
+            return __copy(node[value_key])
+        return _DEFAULT_BY_TYPE[node_type]()
+
+    for fallback in FALLBACK_VALUE_KEYS:
         if fallback in node:
-            return node[fallback]
+            return __copy(node[fallback])
+
+    return __copy(node)
+
+
+def __extract(root: Any) -> Any:
+    # Walks the field tree with an explicit stack, reading the DocumentField mappings in place rather than converting them with as_dict.
+    # Each entry is a node, and the container and key to store its value in.
+    result = [None]
+    stack = [(root, result, 0)]
+
+    while stack:
+        node, container, key = stack.pop()
+
+        if not isinstance(node, Mapping):
+            container[key] = __copy(node) if isinstance(node, (dict, list)) else node
+            continue
+
+        node_type = node.get("type")
+
+        if node_type == "object":
+            inner: Dict[str, Any] = node.get("valueObject") or {}
+            value = dict.fromkeys(inner)
+            stack.extend((item, value, k) for k, item in inner.items())
+        elif node_type == "array":
+            inner_list: List[Any] = node.get("valueArray") or []
+            value = [None] * len(inner_list)
+            stack.extend((item, value, idx) for idx, item in enumerate(inner_list))
+        else:
+            value = __extract_value(node, node_type)
+
+        container[key] = value
 
-    return node
+    return result[0]
 
 
 def parse_document_fields(raw_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parses the fields of a document analyzed with an Azure AI Document Intelligence prebuilt or custom model into their values.
+
+    Objects and arrays are unwrapped into dictionaries and lists, typed values into their value, e.g., 'valueString', or a default
+    value when missing, and fields of other types, e.g., dates, into a dictionary of the field.
+
+    Args:
+        raw_result: The fields of the analyzed document, e.g., result.documents[0].fields.
+
+    Returns:
+        Dict[str, Any]: The value of each field.
+    """
+
     return {k: __extract(v) for k, v in raw_result.items()}
+
+
+def parse_many_document_fields(
+    raw_results: List[Dict[str, Any]],
+    max_workers: Optional[int] = None,
+    use_processes: bool = True,
+    executor: Optional[Executor] = None
+) -> List[Dict[str, Any]]:
+    """
+    Parses the fields of many analyzed documents in parallel workers, e.g., the tax forms of a batch of returns.
+
+    Each worker parses a chunk of documents, so that only the fields and their values are transferred between processes.
+
+    Args:
+        raw_results: The fields of each analyzed document, e.g., result.documents[0].fields.
+        max_workers: The maximum number of workers. Defaults to the number of CPUs.
+        use_processes: Whether to parse in worker processes, which run in parallel, rather than threads.
+        executor: An existing executor to parse in, instead of creating one.
+
+    Returns:
+        List[Dict[str, Any]]: The value of each field of each document, in the order of the documents.
+    """
+
+    if not raw_results:
+        return []
+
+    max_workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(raw_results) // (max_workers * 4))
+
+    if executor is not None:
+        return list(executor.map(parse_document_fields, raw_results, chunksize=chunksize))
+
+    pool_type = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_type(max_workers=max_workers) as pool:
+        return list(pool.map(parse_document_fields, raw_results, chunksize=chunksize))
@@ -0,0 +1,150 @@
+import asyncio
+from typing import Optional
+
+from samples.models.classification import Classification
+from samples.utils.pdf_utils import get_page_count, split_pdf
+
+
+class ClassifiedSection:
+    """
+    A class representing a classified page range of a document and its analysis with the Azure AI Document Intelligence model of its classification.
+
+    Attributes:
+        index (int): The index of the section's classification in the classifications of the document.
+        classification (Optional[str]): The classification of the section.
+        model_id (Optional[str]): The model the section is analyzed with, or None if the classification has no model.
+        first_page (int): The page number of the first page of the section in the document, starting at 1.
+        last_page (int): The page number of the last page of the section in the document.
+        document_bytes (Optional[bytes]): The bytes of the section's PDF sub-document, or None if the section is not analyzed.
+        result (Optional[AnalyzeResult]): The analysis result of the section, or None if the section is not analyzed.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        classification: Optional[str],
+        model_id: Optional[str],
+        first_page: int,
+        last_page: int
+    ):
+        """
+        Initializes a new instance of the ClassifiedSection class.
+
+        Args:
+            index: The index of the section's classification in the classifications of the document.
+            classification: The classification of the section.
+            model_id: The model the section is analyzed with, or None if the classification has no model.
+            first_page: The page number of the first page of the section in the document, starting at 1.
+            last_page: The page number of the last page of the section in the document.
+        """
+
+        self.index = index
+        self.classification = classification
+        self.model_id = model_id
+        self.first_page = first_page
+        self.last_page = last_page
+        self.document_bytes = None
+        self.result = None
+
+    def to_dict(self) -> dict:
+        """
+        Converts the ClassifiedSection object to a dictionary.
+
+        Returns:
+            dict: The ClassifiedSection object as a dictionary, without the bytes of the sub-document.
+        """
+
+        return {
+            'index': self.index,
+            'classification': self.classification,
+            'model_id': self.model_id,
+            'first_page': self.first_page,
+            'last_page': self.last_page,
+            'result': self.result
+        }
+
+
+def get_classified_sections(
+    classifications: list[Classification],
+    model_map: dict[str, str],
+    page_count: int
+) -> list[ClassifiedSection]:
+    """
+    Maps the page ranges of document classifications to the Azure AI Document Intelligence model of each classification.
+
+    A missing range start defaults to the first page, a missing range end to the range start, and ranges are clamped to the pages of the document.
+
+    Args:
+        classifications: The classifications of the document's pages, e.g., the classifications of a Classifications result.
+        model_map: The model of each classification, e.g., 'prebuilt-tax.us.1040' for 'US Tax Form 1040'.
+        page_count: The number of pages of the document.
+
+    Returns:
+        list[ClassifiedSection]: The section of each classification that starts within the document, in classification order, with the index
+            of its classification, e.g., to align it with the expected values of each classification.
+    """
+
+    sections = []
+    for index, classification in enumerate(classifications):
+        first_page = max(classification.image_range_start or 1, 1)
+        last_page = min(max(classification.image_range_end or first_page, first_page), page_count)
+        if first_page > page_count:
+            continue
+
+        sections.append(ClassifiedSection(
+            index,
+            classification.classification,
+            model_map.get(classification.classification),
+            first_page,
+            last_page
+        ))
+
+    return sections
+
+
+async def analyze_classified_sections(
+    client: any,
+    document_bytes: bytes,
+    classifications: list[Classification],
+    model_map: dict[str, str],
+    max_concurrency: int = 4,
+    **kwargs
+) -> list[ClassifiedSection]:
+    """
+    Analyzes each classified section of a document concurrently with the Azure AI Document Intelligence model of its classification.
+
+    The sections are sliced from the original PDF as sub-documents, without rendering the pages to images and re-encoding them,
+    so each model receives the original text layer. Sections whose classification has no model are returned without a result.
+
+    Args:
+        client: The asynchronous DocumentIntelligenceClient.
+        document_bytes: The bytes of the PDF document.
+        classifications: The classifications of the document's pages, e.g., the classifications of a Classifications result.
+        model_map: The model of each classification, e.g., 'prebuilt-tax.us.1040' for 'US Tax Form 1040'.
+        max_concurrency: The maximum number of sections analyzed concurrently.
+        **kwargs: The additional arguments of begin_analyze_document.
+
+    Returns:
+        list[ClassifiedSection]: The section of each classification with its sub-document and analysis result, in classification order.
+    """
+
+    page_count = await asyncio.to_thread(get_page_count, document_bytes)
+    sections = get_classified_sections(classifications, model_map, page_count)
+    routed = [section for section in sections if section.model_id is not None]
+
+    sub_documents = await asyncio.to_thread(
+        split_pdf, document_bytes, [(section.first_page, section.last_page) for section in routed])
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def analyze_section(section: ClassifiedSection, section_bytes: bytes):
+        section.document_bytes = section_bytes
+        async with semaphore:
+            poller = await client.begin_analyze_document(
+                model_id=section.model_id, body=section_bytes, **kwargs)
+            section.result = await poller.result()
+
+    await asyncio.gather(
+        *(analyze_section(section, section_bytes) for section, section_bytes in zip(routed, sub_documents)))
+
+    return sections
@@ -0,0 +1,200 @@
+import asyncio
+import re
+from typing import Optional
+from azure.ai.documentintelligence.models import AnalyzeResult
+
+from samples.utils.pdf_utils import get_page_count, split_pdf
+
+# The collections that elements reference by index, e.g., '/paragraphs/3' in the elements of a section or figure
+_ELEMENT_REFERENCE = re.compile(r'^/(\w+)/(\d+)$')
+
+_FIGURE_ID = re.compile(r'^(\d+)\.(\d+)$')
+
+_SHARD_SEPARATORS = {
+    'text': '\n',
+    'markdown': '\n<!-- PageBreak -->\n'
+}
+
+
+def get_page_ranges(page_count: int, pages_per_shard: int) -> list[tuple[int, int]]:
+    """
+    Splits the pages of a document into contiguous shards.
+
+    Args:
+        page_count: The number of pages of the document.
+        pages_per_shard: The maximum number of pages of each shard.
+
+    Returns:
+        list[tuple[int, int]]: The first and last page number of each shard, starting at 1.
+    """
+
+    if pages_per_shard < 1:
+        raise ValueError("pages_per_shard must be positive")
+
+    return [
+        (first_page, min(first_page + pages_per_shard - 1, page_count))
+        for first_page in range(1, page_count + 1, pages_per_shard)
+    ]
+
+
+class _ShardRemap:
+    def __init__(self, offset: int, page_offset: int, element_offsets: dict[str, int]):
+        self.offset = offset
+        self.page_offset = page_offset
+        self.element_offsets = element_offsets
+
+    def remap(self, node: any) -> any:
+        if isinstance(node, dict):
+            remapped = {}
+            for key, value in node.items():
+                if key == 'offset' and isinstance(value, int):
+                    remapped[key] = value + self.offset
+                elif key == 'pageNumber' and isinstance(value, int):
+                    remapped[key] = value + self.page_offset
+                elif key == 'elements' and isinstance(value, list):
+                    remapped[key] = [self.remap_reference(element) for element in value]
+                else:
+                    remapped[key] = self.remap(value)
+            return remapped
+
+        if isinstance(node, list):
+            return [self.remap(item) for item in node]
+
+        return node
+
+    def remap_reference(self, reference: any) -> any:
+        match = _ELEMENT_REFERENCE.match(reference) if isinstance(reference, str) else None
+        if match is None:
+            return reference
+
+        collection, index = match.groups()
+        return f"/{collection}/{int(index) + self.element_offsets.get(collection, 0)}"
+
+    def remap_figure_id(self, figure_id: any) -> any:
+        match = _FIGURE_ID.match(figure_id) if isinstance(figure_id, str) else None
+        if match is None or not self.page_offset:
+            return figure_id
+
+        page_number, index = match.groups()
+        return f"{int(page_number) + self.page_offset}.{index}"
+
+
+def merge_analyze_results(
+    results: list[AnalyzeResult],
+    first_pages: Optional[list[int]] = None
+) -> AnalyzeResult:
+    """
+    Merges the analysis results of consecutive page ranges of a document into one analysis result of the whole document.
+
+    The content of the shards is joined, with a page break between shards for Markdown content, and every span offset is shifted to
+    the shard's position in the merged content. Page numbers, including those of bounding regions and figure ids, are shifted so that
+    each shard starts at its first page, and element references, e.g., '/paragraphs/3' in sections and figures, are shifted to the
+    merged collections. All other collections, e.g., pages, paragraphs, tables, figures, sections, styles, and documents, are concatenated.
+
+    Offsets are shifted by the length of the content in code points, so the shards must be analyzed with the 'unicodeCodePoint' string index type.
+
+    Args:
+        results: The analysis results of the shards, in page order.
+        first_pages: The page number of the first page of each shard in the document. Defaults to the page numbers of the shards as analyzed,
+            e.g., when the shards were analyzed with the 'pages' option. Required when the shards were analyzed as separate documents.
+
+    Returns:
+        AnalyzeResult: The merged analysis result.
+    """
+
+    if not results:
+        raise ValueError("At least one analysis result is required")
+
+    shards = [result.as_dict() for result in results]
+    if len(shards) == 1 and first_pages is None:
+        return results[0]
+
+    separator = _SHARD_SEPARATORS.get(shards[0].get('contentFormat'), '\n')
+    merged = {key: value for key, value in shards[0].items() if not isinstance(value, list) and key != 'content'}
+    content = []
+    collections: dict[str, list] = {}
+    offset = 0
+
+    for idx, shard in enumerate(shards):
+        page_offset = 0
+        if first_pages is not None:
+            page_numbers = [page['pageNumber'] for page in shard.get('pages', [])]
+            page_offset = first_pages[idx] - min(page_numbers) if page_numbers else 0
+
+        remap = _ShardRemap(
+            offset,
+            page_offset,
+            {collection: len(items) for collection, items in collections.items()}
+        )
+
+        for key, value in shard.items():
+            if not isinstance(value, list):
+                continue
+
+            items = remap.remap(value)
+            if key == 'figures':
+                for figure in items:
+                    if 'id' in figure:
+                        figure['id'] = remap.remap_figure_id(figure['id'])
+            collections.setdefault(key, []).extend(items)
+
+        shard_content = shard.get('content', '')
+        content.append(shard_content)
+        offset += len(shard_content) + len(separator)
+
+    merged['content'] = separator.join(content)
+    merged.update(collections)
+    return AnalyzeResult(merged)
+
+
+async def analyze_document_sharded(
+    client: any,
+    model_id: str,
+    document_bytes: bytes,
+    pages_per_shard: int = 20,
+    max_concurrency: int = 4,
+    page_count: Optional[int] = None,
+    **kwargs
+) -> AnalyzeResult:
+    """
+    Analyzes the page ranges of a document concurrently with Azure AI Document Intelligence, and merges them into one analysis result.
+
+    Each shard is analyzed as a sub-document sliced from the original PDF, so only its own pages are uploaded, and the pages are copied
+    rather than re-rendered. The merged result has the same page numbers, content, and spans as an analysis of the whole document,
+    so the line extraction, confidence, and redaction functions work unchanged.
+
+    Args:
+        client: The asynchronous DocumentIntelligenceClient, or a RecordedDocumentIntelligenceClient to replay recorded shards offline.
+        model_id: The Azure AI Document Intelligence model to analyze the document with.
+        document_bytes: The bytes of the PDF document.
+        pages_per_shard: The maximum number of pages of each shard.
+        max_concurrency: The maximum number of shards analyzed concurrently.
+        page_count: The number of pages of the document, if known. Defaults to the page count of the PDF.
+        **kwargs: The additional arguments of begin_analyze_document, e.g., output_content_format.
+
+    Returns:
+        AnalyzeResult: The analysis result of the whole document.
+    """
+
+    if page_count is None:
+        page_count = await asyncio.to_thread(get_page_count, document_bytes)
+
+    page_ranges = get_page_ranges(page_count, pages_per_shard)
+    if len(page_ranges) == 1:
+        poller = await client.begin_analyze_document(model_id=model_id, body=document_bytes, **kwargs)
+        return await poller.result()
+
+    # Offsets are merged in code points, independent of how text elements are counted
+    kwargs.setdefault('string_index_type', 'unicodeCodePoint')
+    shards = await asyncio.to_thread(split_pdf, document_bytes, page_ranges)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def analyze_shard(shard_bytes: bytes) -> AnalyzeResult:
+        async with semaphore:
+            poller = await client.begin_analyze_document(model_id=model_id, body=shard_bytes, **kwargs)
+            return await poller.result()
+
+    results = await asyncio.gather(*(analyze_shard(shard_bytes) for shard_bytes in shards))
+
+    return await asyncio.to_thread(
+        merge_analyze_results, list(results), [first_page for first_page, _ in page_ranges])
@@ -0,0 +1,164 @@
+import json
+import os
+from typing import Callable, Literal, Optional
+
+from samples.utils.custom_json_encoder import CustomJsonEncoder, get_json_converter
+from samples.utils.profiling import profiled
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _create_default() -> Callable[[any], any]:
+    # Objects referenced from several places, e.g., the Document Intelligence lines matched by several fields, are converted once per call.
+    # The converted objects are kept alive by the cache, so that their ids are not reused during the call.
+    converted = {}
+
+    def default(obj: any) -> any:
+        cached = converted.get(id(obj))
+        if cached is not None:
+            return cached[1]
+
+        converter = get_json_converter(type(obj))
+        if converter is None:
+            raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+        value = converter(obj)
+        converted[id(obj)] = (obj, value)
+        return value
+
+    return default
+
+
+@profiled("serialization")
+def dumps_json(data: any, indent: Optional[int] = None) -> bytes:
+    """
+    Serializes data to UTF-8 JSON, converting objects with a 'to_dict', 'as_dict', or 'model_dump' method like the CustomJsonEncoder.
+
+    orjson is used when it is installed, for compact output or an indent of 2, and each object is only converted once, however often it is referenced.
+    Other indents, and data that orjson cannot serialize, e.g., dictionaries with non-string keys or integers larger than 64 bits, fall back to the standard library.
+
+    Args:
+        data: The data to serialize.
+        indent: The number of spaces to indent nested values with, or None for compact output.
+
+    Returns:
+        bytes: The serialized data.
+    """
+
+    if orjson is not None and indent in (None, 2):
+        option = orjson.OPT_INDENT_2 if indent == 2 else 0
+        try:
+            return orjson.dumps(data, default=_create_default(), option=option | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass
+
+    separators = None if indent is not None else (',', ':')
+    return json.dumps(data, indent=indent, separators=separators, ensure_ascii=False, cls=CustomJsonEncoder).encode('utf-8')
+
+
+def loads_json(data: bytes | str) -> any:
+    """
+    Deserializes JSON, with orjson when it is installed.
+
+    Args:
+        data: The JSON to deserialize.
+
+    Returns:
+        any: The deserialized data.
+    """
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class JsonStreamWriter:
+    """
+    A class representing a writer of a JSON array or object to a file one value at a time, so that large results are never held in memory as a single string.
+
+    Each value is serialized with dumps_json, and the array or object is closed when the writer is closed or its context exits.
+    """
+
+    def __init__(
+        self,
+        fpath: str,
+        container: Literal["array", "object"] = "array",
+        indent: Optional[int] = None
+    ):
+        """
+        Initializes a new instance of the JsonStreamWriter class, creating the file and its parent directory.
+
+        Args:
+            fpath: The path of the JSON file to write.
+            container: Whether values are written as items of an array or as entries of an object.
+            indent: The number of spaces to indent each value with, or None for compact output.
+        """
+
+        if container not in ("array", "object"):
+            raise ValueError(f"Invalid container: {container}")
+
+        directory = os.path.dirname(fpath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.container = container
+        self.indent = indent
+        self.count = 0
+        self._file = open(fpath, 'wb')
+        self._file.write(b'[' if container == "array" else b'{')
+
+    def write(self, value: any):
+        """
+        Writes the next item of the array.
+
+        Args:
+            value: The item to write.
+        """
+
+        if self.container != "array":
+            raise ValueError("Items can only be written to an array, use write_entry for objects.")
+
+        self._write_separator()
+        self._file.write(dumps_json(value, self.indent))
+
+    def write_entry(self, key: str, value: any):
+        """
+        Writes the next entry of the object.
+
+        Args:
+            key: The key of the entry.
+            value: The value of the entry.
+        """
+
+        if self.container != "object":
+            raise ValueError("Entries can only be written to an object, use write for arrays.")
+
+        self._write_separator()
+        self._file.write(dumps_json(str(key)))
+        self._file.write(b':')
+        self._file.write(dumps_json(value, self.indent))
+
+    def close(self):
+        """
+        Closes the array or object and the file.
+        """
+
+        if self._file.closed:
+            return
+
+        self._file.write(b'\n' if self.count else b'')
+        self._file.write(b']' if self.container == "array" else b'}')
+        self._file.close()
+
+    def _write_separator(self):
+        self._file.write(b',\n' if self.count else b'\n')
+        self.count += 1
+
+    def __enter__(self) -> 'JsonStreamWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
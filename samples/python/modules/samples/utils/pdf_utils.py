@@ -0,0 +1,53 @@
+from io import BytesIO
+from pypdf import PdfReader, PdfWriter
+
+
+def get_page_count(document_bytes: bytes) -> int:
+    """
+    Gets the number of pages of a PDF document from its page tree, without rendering it.
+
+    Args:
+        document_bytes: The bytes of the PDF document.
+
+    Returns:
+        int: The number of pages.
+    """
+
+    return len(PdfReader(BytesIO(document_bytes)).pages)
+
+
+def split_pdf(
+    document_bytes: bytes,
+    page_ranges: list[tuple[int, int]]
+) -> list[bytes]:
+    """
+    Slices the page ranges of a PDF document into separate PDF documents, without rendering or re-encoding the pages.
+
+    The document is parsed once, and the pages of each range are copied into a new document together with the objects they reference,
+    e.g., content streams, fonts, and images, so each sub-document keeps the original text layer and image quality.
+
+    Args:
+        document_bytes: The bytes of the PDF document.
+        page_ranges: The first and last page number of each sub-document, starting at 1. Ranges may overlap.
+
+    Returns:
+        list[bytes]: The bytes of the PDF document of each page range.
+    """
+
+    reader = PdfReader(BytesIO(document_bytes))
+    page_count = len(reader.pages)
+    documents = []
+
+    for first_page, last_page in page_ranges:
+        if not 1 <= first_page <= last_page <= page_count:
+            raise ValueError(f"Invalid page range {first_page}-{last_page} for a document with {page_count} pages")
+
+        writer = PdfWriter()
+        for page_index in range(first_page - 1, last_page):
+            writer.add_page(reader.pages[page_index])
+
+        buffer = BytesIO()
+        writer.write(buffer)
+        documents.append(buffer.getvalue())
+
+    return documents
@@ -0,0 +1,438 @@
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Literal, Optional
+
+ProfileMode = Literal["cprofile", "sampling", "memory"]
+
+PROFILE_MODES = ("cprofile", "sampling", "memory")
+
+_current_document: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('profiled_document', default=None)
+
+# The current stage propagates with the document, so calls nested in a stage, including in executor threads, are part of the stage
+_current_stage: contextvars.ContextVar[Optional['_Stage']] = contextvars.ContextVar('profiled_stage', default=None)
+
+# Frames a thread is blocked in while it is idle, e.g., the event loop waiting for I/O or an executor thread waiting for work
+_IDLE_FRAMES = {
+    ('selectors.py', 'select'),
+    ('threading.py', 'wait'),
+    ('queue.py', 'get'),
+    ('thread.py', '_worker')
+}
+
+_UNSAFE_FILENAME_CHARACTERS = re.compile(r'[^\w.-]')
+
+# From Python 3.12, cProfile uses sys.monitoring, which allows one active profiler per process that profiles all threads
+_SHARED_CPROFILE = sys.version_info >= (3, 12)
+
+
+def _write_text(fpath: str, text: str):
+    # Written without the storage utils, so that the serialization functions they use can be profiled
+    with open(fpath, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+class _Stage:
+    """
+    A stage being profiled, and the threads its cProfile statistics are collected in.
+    """
+
+    def __init__(self, doc_id: str, name: str):
+        self.doc_id = doc_id
+        self.name = name
+        self.thread_ids = {threading.get_ident()}
+
+
+class Profiler:
+    """
+    A class representing opt-in profiling of the stages of processing documents, e.g., confidence evaluation, accuracy evaluation, and serialization.
+
+    Each mode is enabled separately:
+    - 'cprofile' captures deterministic cProfile statistics of each stage of each document.
+    - 'sampling' samples the Python stacks of all threads at an interval while sampling is running, aggregated over a batch.
+    - 'memory' traces allocations with tracemalloc and records the peak memory of each stage of each document.
+
+    Stages are the outermost calls of functions decorated with profiled, or with blocks of stage, so that nested hot functions are included
+    in the profile of their caller. The document and the stage are propagated to asyncio tasks, and to executor threads with
+    tracing.bind_context, so the work a stage runs in executor threads is part of the stage rather than stages of its own.
+
+    tracemalloc tracks the peak of the whole process, so the memory of stages that run concurrently overlaps; profile with a concurrency of 1
+    for exact per-stage peaks. Likewise, from Python 3.12 only one cProfile profiler can be active in the process, so stages that run
+    concurrently share one reference-counted profile, attributed to its stage if it ran alone, or else to the 'batch' document's
+    'concurrent_stages' stage.
+
+    Attributes:
+        modes (frozenset[str]): The enabled profiling modes.
+        enabled (bool): Whether any profiling mode is enabled.
+        sampling_interval (float): The number of seconds between stack samples.
+    """
+
+    def __init__(
+        self,
+        modes: Iterable[ProfileMode] = (),
+        sampling_interval: float = 0.005
+    ):
+        """
+        Initializes a new instance of the Profiler class.
+
+        Args:
+            modes: The profiling modes to enable.
+            sampling_interval: The number of seconds between stack samples.
+        """
+
+        self.sampling_interval = sampling_interval
+        self._lock = threading.Lock()
+        self._profiles: dict[tuple[str, str], list[cProfile.Profile]] = {}
+        self._shared_profile: Optional[cProfile.Profile] = None
+        self._shared_profile_count = 0
+        self._shared_profile_stages: set[tuple[str, str]] = set()
+        self._memory: list[dict] = []
+        self._samples: dict[str, int] = {}
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampling = threading.Event()
+        self.set_modes(modes)
+
+    def set_modes(self, modes: Iterable[ProfileMode]):
+        """
+        Sets the enabled profiling modes.
+
+        Args:
+            modes: The profiling modes to enable.
+        """
+
+        modes = frozenset(modes)
+        unknown = modes.difference(PROFILE_MODES)
+        if unknown:
+            raise ValueError(f"Unknown profiling modes: {', '.join(sorted(unknown))}")
+
+        self.modes = modes
+        self.enabled = bool(modes)
+
+    @contextmanager
+    def document(self, doc_id: str) -> Iterator[None]:
+        """
+        Attributes the stages profiled within the with block to a document.
+
+        Args:
+            doc_id: The id of the document, e.g., its file name.
+        """
+
+        token = _current_document.set(doc_id)
+        try:
+            yield
+        finally:
+            _current_document.reset(token)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Profiles the with block as a stage of the current document, unless it is nested in another stage, e.g., in an executor thread of one.
+
+        Args:
+            name: The name of the stage, e.g., 'extract_lines'.
+        """
+
+        if not self.enabled:
+            yield
+            return
+
+        enclosing = _current_stage.get()
+        if enclosing is not None:
+            with self._nested_stage(enclosing):
+                yield
+            return
+
+        doc_id = _current_document.get() or 'batch'
+        profile = None
+        base_memory = 0
+        start = time.perf_counter()
+        token = _current_stage.set(_Stage(doc_id, name))
+
+        try:
+            if "memory" in self.modes:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                base_memory = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+
+            if "cprofile" in self.modes:
+                profile = self._enable_profile(doc_id, name)
+
+            start = time.perf_counter()
+            yield
+        finally:
+            if profile is not None:
+                self._disable_profile(profile, doc_id, name)
+
+            if "memory" in self.modes and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                with self._lock:
+                    self._memory.append({
+                        'document': doc_id,
+                        'stage': name,
+                        'seconds': time.perf_counter() - start,
+                        'peak_bytes': max(peak - base_memory, 0),
+                        'retained_bytes': current - base_memory
+                    })
+
+            _current_stage.reset(token)
+
+    @contextmanager
+    def _nested_stage(self, stage: _Stage) -> Iterator[None]:
+        # Before Python 3.12, cProfile only profiles the thread it is enabled in, so each other thread a stage runs work in is profiled
+        # separately and attributed to the stage. The memory of nested work is part of the stage's peak, so it is not traced separately.
+        thread_id = threading.get_ident()
+        if _SHARED_CPROFILE or "cprofile" not in self.modes:
+            yield
+            return
+
+        with self._lock:
+            profiled_thread = thread_id in stage.thread_ids
+            stage.thread_ids.add(thread_id)
+
+        if profiled_thread:
+            yield
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                stage.thread_ids.discard(thread_id)
+                self._profiles.setdefault((stage.doc_id, stage.name), []).append(profile)
+
+    def _enable_profile(self, doc_id: str, name: str) -> cProfile.Profile:
+        if not _SHARED_CPROFILE:
+            profile = cProfile.Profile()
+            profile.enable()
+            return profile
+
+        with self._lock:
+            if self._shared_profile is None:
+                profile = cProfile.Profile()
+                profile.enable()
+                self._shared_profile = profile
+            self._shared_profile_count += 1
+            self._shared_profile_stages.add((doc_id, name))
+            return self._shared_profile
+
+    def _disable_profile(self, profile: cProfile.Profile, doc_id: str, name: str):
+        if not _SHARED_CPROFILE:
+            profile.disable()
+            with self._lock:
+                self._profiles.setdefault((doc_id, name), []).append(profile)
+            return
+
+        with self._lock:
+            self._shared_profile_count -= 1
+            if self._shared_profile_count:
+                return
+
+            profile.disable()
+            stages = self._shared_profile_stages
+            key = next(iter(stages)) if len(stages) == 1 else ('batch', 'concurrent_stages')
+            self._profiles.setdefault(key, []).append(profile)
+            self._shared_profile = None
+            self._shared_profile_stages = set()
+
+    def start_sampling(self):
+        """
+        Starts sampling the stacks of all threads in a background thread, if the 'sampling' mode is enabled.
+        """
+
+        if "sampling" not in self.modes or self._sampler is not None:
+            return
+
+        self._stop_sampling.clear()
+        self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop_sampling(self):
+        """
+        Stops sampling the stacks of all threads.
+        """
+
+        if self._sampler is None:
+            return
+
+        self._stop_sampling.set()
+        self._sampler.join()
+        self._sampler = None
+
+    @contextmanager
+    def sampling(self) -> Iterator[None]:
+        """
+        Samples the stacks of all threads while the with block runs, if the 'sampling' mode is enabled, e.g., around a whole batch.
+        """
+
+        self.start_sampling()
+        try:
+            yield
+        finally:
+            self.stop_sampling()
+
+    def _sample(self):
+        sampler_id = threading.get_ident()
+        while not self._stop_sampling.wait(self.sampling_interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+
+                key = ';'.join(reversed(stack))
+                with self._lock:
+                    self._samples[key] = self._samples.get(key, 0) + 1
+
+    def get_sampling_summary(self, limit: int = 40) -> list[tuple[str, int]]:
+        """
+        Gets the functions that most samples were taken in, excluding threads that were idle.
+
+        Args:
+            limit: The maximum number of functions.
+
+        Returns:
+            list[tuple[str, int]]: The 'file:function' and number of samples of each function, with the most samples first.
+        """
+
+        counts = {}
+        with self._lock:
+            samples = list(self._samples.items())
+
+        for stack, count in samples:
+            leaf = stack.rsplit(';', 1)[-1]
+            fname, _, function = leaf.rpartition(':')
+            if (fname, function) in _IDLE_FRAMES:
+                continue
+            counts[leaf] = counts.get(leaf, 0) + count
+
+        return sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def dump(self, output_dir: str, limit: int = 40) -> str:
+        """
+        Writes the collected profiles to a directory, e.g., next to the outputs of a batch run.
+
+        - 'cprofile/{document}.{stage}.prof': The cProfile statistics of each stage of each document, e.g., for snakeviz or pstats.
+        - 'cprofile_summary.txt': The functions with the highest cumulative time, across all stages of all documents.
+        - 'sampling.folded': The sampled stacks in the folded stack format of flamegraph tools, e.g., flamegraph.pl or speedscope.
+        - 'sampling_summary.txt': The functions that most samples were taken in, excluding idle threads.
+        - 'memory.json': The duration, peak memory, and retained memory of each stage of each document.
+
+        Args:
+            output_dir: The directory to write the profiles to.
+            limit: The maximum number of functions in the summaries.
+
+        Returns:
+            str: The directory the profiles were written to.
+        """
+
+        os.makedirs(output_dir, exist_ok=True)
+        with self._lock:
+            profiles = {key: list(values) for key, values in self._profiles.items()}
+            memory = list(self._memory)
+            samples = dict(self._samples)
+
+        if profiles:
+            profile_dir = os.path.join(output_dir, "cprofile")
+            os.makedirs(profile_dir, exist_ok=True)
+            combined = None
+            for (doc_id, stage), stage_profiles in profiles.items():
+                stats = pstats.Stats(*stage_profiles)
+                stats.dump_stats(os.path.join(
+                    profile_dir, _UNSAFE_FILENAME_CHARACTERS.sub('_', f"{doc_id}.{stage}.prof")))
+                if combined is None:
+                    combined = pstats.Stats(*stage_profiles)
+                else:
+                    combined.add(*stage_profiles)
+
+            stream = io.StringIO()
+            combined.stream = stream
+            combined.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+            _write_text(os.path.join(output_dir, "cprofile_summary.txt"), stream.getvalue())
+
+        if samples:
+            _write_text(os.path.join(output_dir, "sampling.folded"), '\n'.join(
+                f"{stack} {count}" for stack, count in sorted(samples.items())))
+            _write_text(os.path.join(output_dir, "sampling_summary.txt"), '\n'.join(
+                f"{count:>8} {function}" for function, count in self.get_sampling_summary(limit)))
+
+        if memory:
+            _write_text(os.path.join(output_dir, "memory.json"), json.dumps(memory, indent=4))
+
+        return output_dir
+
+    def clear(self):
+        """
+        Removes the collected profiles.
+        """
+
+        with self._lock:
+            self._profiles = {}
+            self._memory = []
+            self._samples = {}
+
+
+def _parse_modes(value: str) -> list[str]:
+    modes = [mode.strip().lower() for mode in value.split(',') if mode.strip()]
+    if modes == ['all']:
+        return list(PROFILE_MODES)
+    return [mode for mode in modes if mode in PROFILE_MODES]
+
+
+_default_profiler = Profiler(_parse_modes(os.environ.get('SAMPLES_PROFILE', '')))
+
+
+def get_profiler() -> Profiler:
+    """
+    Gets the default profiler, whose modes are set by the SAMPLES_PROFILE environment variable, e.g., 'cprofile,memory' or 'all'.
+
+    Returns:
+        Profiler: The default profiler.
+    """
+
+    return _default_profiler
+
+
+def profiled(stage: Optional[str] = None) -> Callable:
+    """
+    Creates a decorator that profiles each outermost call of a function as a stage with the default profiler.
+
+    When profiling is disabled, the decorated function is called directly after a single check.
+
+    Args:
+        stage: The name of the stage, defaulting to the function's qualified name.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        stage_name = stage or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _default_profiler.enabled:
+                return func(*args, **kwargs)
+            with _default_profiler.stage(stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
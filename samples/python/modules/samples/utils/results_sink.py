@@ -0,0 +1,390 @@
+import gzip
+import os
+import re
+import zlib
+from typing import BinaryIO, Iterator, Optional, Union
+
+from samples.models.document_processing_result import (
+    DataClassificationResult,
+    DataExtractionResult,
+    DataRedactionResult
+)
+from samples.utils.json_utils import dumps_json, loads_json
+
+ProcessingResult = Union[DataExtractionResult, DataClassificationResult, DataRedactionResult]
+
+_RESULT_TYPES = {
+    'DataExtractionResult': lambda result: DataExtractionResult(
+        result['data'],
+        result['confidence'],
+        result['accuracy'],
+        result['prompt_tokens'],
+        result['completion_tokens'],
+        result['execution_time'],
+        result.get('stage_timings')
+    ),
+    'DataClassificationResult': lambda result: DataClassificationResult(
+        result['classification'],
+        result['accuracy'],
+        result['execution_time']
+    ),
+    'DataRedactionResult': lambda result: DataRedactionResult(
+        result['redacted'],
+        result['confidence'],
+        result['execution_time']
+    )
+}
+
+# Records are written compactly with the id first, so that ids are read without parsing whole records
+_ID_PATTERN = re.compile(rb'^\{"id":("(?:[^"\\]|\\.)*")')
+
+_READ_CHUNK_SIZE = 1024 * 1024
+
+# The location of a record in a shard: the offset and length of the line, or of the compressed gzip member that contains it,
+# and the start and end of the line in the member's content
+IndexEntry = tuple[str, int, int, int, int]
+
+
+def _shard_pattern(prefix: str) -> re.Pattern:
+    return re.compile(rf'^{re.escape(prefix)}-(\d+)\.jsonl(\.gz)?$')
+
+
+def _list_shards(directory: str, prefix: str) -> list[tuple[int, str]]:
+    if not os.path.isdir(directory):
+        return []
+
+    pattern = _shard_pattern(prefix)
+    shards = []
+    for fname in os.listdir(directory):
+        match = pattern.match(fname)
+        if match:
+            shards.append((int(match.group(1)), fname))
+    return sorted(shards)
+
+
+def _read_id(line: bytes) -> Optional[str]:
+    match = _ID_PATTERN.match(line)
+    if match is None:
+        return None
+    return loads_json(match.group(1))
+
+
+def _iter_lines(content: bytes) -> Iterator[tuple[int, int]]:
+    start = 0
+    while True:
+        end = content.find(b'\n', start)
+        if end < 0:
+            # A line without a newline is the torn tail of an interrupted write
+            return
+        yield start, end
+        start = end + 1
+
+
+def _iter_gzip_members(f: BinaryIO) -> Iterator[tuple[int, int, bytes]]:
+    # Yields the offset, compressed length, and content of each complete gzip member, stopping at a torn or corrupt member
+    offset = 0
+    pending = b''
+    while True:
+        decompressor = zlib.decompressobj(wbits=31)
+        parts = []
+        consumed = 0
+        data = pending
+        try:
+            while not decompressor.eof:
+                if not data:
+                    data = f.read(_READ_CHUNK_SIZE)
+                    if not data:
+                        return
+                parts.append(decompressor.decompress(data))
+                consumed += len(data)
+                data = b''
+        except zlib.error:
+            return
+
+        pending = decompressor.unused_data
+        consumed -= len(pending)
+        yield offset, consumed, b''.join(parts)
+        offset += consumed
+
+
+def _scan_shard(fpath: str, fname: str) -> Iterator[tuple[str, IndexEntry]]:
+    with open(fpath, 'rb') as f:
+        if fname.endswith('.gz'):
+            for offset, length, content in _iter_gzip_members(f):
+                for start, end in _iter_lines(content):
+                    doc_id = _read_id(content[start:end])
+                    if doc_id is not None:
+                        yield doc_id, (fname, offset, length, start, end)
+            return
+
+        offset = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                return
+            doc_id = _read_id(line)
+            if doc_id is not None:
+                yield doc_id, (fname, offset, len(line), 0, len(line) - 1)
+            offset += len(line)
+
+
+class JsonlResultSink:
+    """
+    A class representing an append-only sink of document processing results, written as JSON Lines to rotated shards in a directory.
+
+    Each record is a compact JSON line with the document 'id', the result 'type', and the 'result'.
+    Records are buffered and written in batches of whole lines, or of whole gzip members when compressed, so that an interrupted run
+    leaves at most a torn tail that readers skip. When a shard is full, an index of its records is written next to it for the JsonlResultReader.
+
+    Each sink writes to new shards, so several runs can write to the same directory; readers return the latest record of each document.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = 'results',
+        max_records_per_shard: int = 10000,
+        batch_size: int = 100,
+        compress: bool = False,
+        fsync: bool = False
+    ):
+        """
+        Initializes a new instance of the JsonlResultSink class, creating the directory if it does not exist.
+
+        Args:
+            directory: The directory to write the shards to.
+            prefix: The prefix of the shard file names, e.g., 'results' for 'results-00001.jsonl'.
+            max_records_per_shard: The number of records after which a new shard is started.
+            batch_size: The number of records buffered before they are written.
+            compress: Whether the shards are gzip compressed, with one gzip member per batch.
+            fsync: Whether each batch is flushed to disk before the write returns, at the cost of throughput.
+        """
+
+        if max_records_per_shard < 1 or batch_size < 1:
+            raise ValueError("The shard and batch sizes must be positive.")
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.prefix = prefix
+        self.max_records_per_shard = max_records_per_shard
+        self.batch_size = batch_size
+        self.compress = compress
+        self.fsync = fsync
+        self.count = 0
+
+        shards = _list_shards(directory, prefix)
+        self._next_shard = shards[-1][0] + 1 if shards else 1
+        self._pending: list[tuple[str, bytes]] = []
+        self._file: Optional[BinaryIO] = None
+        self._fname: Optional[str] = None
+        self._index: list[list] = []
+
+    def write(self, doc_id: str, result: ProcessingResult):
+        """
+        Buffers the result of a document, writing the buffered records when the batch is full.
+
+        Args:
+            doc_id: The id of the document, e.g., its file name.
+            result: The result of the document.
+        """
+
+        line = dumps_json({
+            'id': doc_id,
+            'type': type(result).__name__,
+            'result': result
+        }) + b'\n'
+        self._pending.append((doc_id, line))
+        self.count += 1
+
+        shard_records = len(self._index) + len(self._pending)
+        if len(self._pending) >= self.batch_size or shard_records >= self.max_records_per_shard:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered records to the current shard, and starts a new shard when it is full.
+        """
+
+        if not self._pending:
+            return
+
+        if self._file is None:
+            self._open_shard()
+
+        offset = self._file.tell()
+        if self.compress:
+            content = b''.join(line for _, line in self._pending)
+            member = gzip.compress(content, compresslevel=6)
+            start = 0
+            for doc_id, line in self._pending:
+                self._index.append([doc_id, offset, len(member), start, start + len(line) - 1])
+                start += len(line)
+            self._file.write(member)
+        else:
+            for doc_id, line in self._pending:
+                self._index.append([doc_id, offset, len(line), 0, len(line) - 1])
+                offset += len(line)
+            self._file.writelines(line for _, line in self._pending)
+
+        self._pending = []
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+        if len(self._index) >= self.max_records_per_shard:
+            self._close_shard()
+
+    def close(self):
+        """
+        Writes the buffered records and closes the current shard, writing its index.
+        """
+
+        self.flush()
+        self._close_shard()
+
+    def _open_shard(self):
+        extension = '.jsonl.gz' if self.compress else '.jsonl'
+        self._fname = f"{self.prefix}-{self._next_shard:05d}{extension}"
+        self._next_shard += 1
+        self._file = open(os.path.join(self.directory, self._fname), 'ab')
+
+    def _close_shard(self):
+        if self._file is None:
+            return
+
+        self._file.close()
+
+        # The index is written to a temporary file and renamed, so that a partial index is never read
+        fpath = os.path.join(self.directory, f"{self._fname}.idx")
+        with open(f"{fpath}.tmp", 'wb') as f:
+            f.write(dumps_json(self._index))
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(f"{fpath}.tmp", fpath)
+
+        self._file = None
+        self._fname = None
+        self._index = []
+
+    def __enter__(self) -> 'JsonlResultSink':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class JsonlResultReader:
+    """
+    A class representing a reader of the results written by a JsonlResultSink, which looks up records by document id.
+
+    The record locations are loaded from the index of each closed shard, and only shards without an index, e.g., of an interrupted run,
+    are scanned. Looking up a record reads only its line, or its gzip member when compressed.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = 'results'
+    ):
+        """
+        Initializes a new instance of the JsonlResultReader class, indexing the shards in the directory.
+
+        Args:
+            directory: The directory the shards were written to.
+            prefix: The prefix of the shard file names.
+        """
+
+        self.directory = directory
+        self.prefix = prefix
+        self._files: dict[str, BinaryIO] = {}
+        self._index: dict[str, IndexEntry] = {}
+
+        for _, fname in _list_shards(directory, prefix):
+            fpath = os.path.join(directory, fname)
+            index_fpath = f"{fpath}.idx"
+            if os.path.exists(index_fpath):
+                with open(index_fpath, 'rb') as f:
+                    for doc_id, offset, length, start, end in loads_json(f.read()):
+                        self._index[doc_id] = (fname, offset, length, start, end)
+            else:
+                for doc_id, entry in _scan_shard(fpath, fname):
+                    self._index[doc_id] = entry
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._index
+
+    def ids(self) -> list[str]:
+        """
+        Gets the ids of all documents with a result.
+
+        Returns:
+            list[str]: The document ids, in the order they were first written.
+        """
+
+        return list(self._index)
+
+    def get_record(self, doc_id: str) -> dict:
+        """
+        Reads the latest record of a document.
+
+        Args:
+            doc_id: The id of the document.
+
+        Returns:
+            dict: The record, with the document 'id', the result 'type', and the 'result' as a dictionary.
+
+        Raises:
+            KeyError: If there is no result for the document.
+        """
+
+        fname, offset, length, start, end = self._index[doc_id]
+
+        f = self._files.get(fname)
+        if f is None:
+            f = self._files[fname] = open(os.path.join(self.directory, fname), 'rb')
+
+        f.seek(offset)
+        data = f.read(length)
+        if fname.endswith('.gz'):
+            data = zlib.decompress(data, wbits=31)
+        return loads_json(data[start:end])
+
+    def get(self, doc_id: str) -> ProcessingResult:
+        """
+        Reads the latest result of a document.
+
+        Args:
+            doc_id: The id of the document.
+
+        Returns:
+            ProcessingResult: The result, as the DataExtractionResult, DataClassificationResult, or DataRedactionResult it was written from.
+
+        Raises:
+            KeyError: If there is no result for the document.
+        """
+
+        record = self.get_record(doc_id)
+        return _RESULT_TYPES[record['type']](record['result'])
+
+    def __iter__(self) -> Iterator[tuple[str, ProcessingResult]]:
+        for doc_id in self._index:
+            yield doc_id, self.get(doc_id)
+
+    def close(self):
+        """
+        Closes the open shard files.
+        """
+
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+    def __enter__(self) -> 'JsonlResultReader':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,188 @@
+from functools import lru_cache
+from typing import Literal, Optional
+from pydantic import BaseModel
+
+FieldKind = Literal["value", "object", "list"]
+
+
+class SchemaField:
+    """
+    A class representing a field of an object in a schema plan.
+
+    Attributes:
+        key (str): The name of the field in its parent object.
+        path (tuple[str, ...]): The names of the fields from the root object to the field.
+        parent (int): The index of the field's parent object in the plan, or -1 for the fields of the root object.
+        kind (FieldKind): Whether the field is a primitive value, a nested object, or a list.
+        keys (tuple[str, ...]): For objects, the names of all of the object's properties in schema order, including ignored properties.
+        ignores_keys (bool): For objects, whether any of the object's properties are ignored and excluded from the plan.
+        descendants (int): The number of fields nested in the field, which directly follow it in the plan.
+        items (Optional[SchemaPlan]): For lists of objects, the plan of each item.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        path: tuple[str, ...],
+        parent: int,
+        kind: FieldKind,
+        keys: tuple[str, ...] = (),
+        ignores_keys: bool = False,
+        items: Optional['SchemaPlan'] = None
+    ):
+        """
+        Initializes a new instance of the SchemaField class.
+
+        Args:
+            key: The name of the field in its parent object.
+            path: The names of the fields from the root object to the field.
+            parent: The index of the field's parent object in the plan, or -1 for the fields of the root object.
+            kind: Whether the field is a primitive value, a nested object, or a list.
+            keys: For objects, the names of all of the object's properties in schema order, including ignored properties.
+            ignores_keys: For objects, whether any of the object's properties are ignored and excluded from the plan.
+            items: For lists of objects, the plan of each item.
+        """
+
+        self.key = key
+        self.path = path
+        self.parent = parent
+        self.kind = kind
+        self.keys = keys
+        self.ignores_keys = ignores_keys
+        self.descendants = 0
+        self.items = items
+
+
+class SchemaPlan:
+    """
+    A class representing the fields of a JSON schema object as a flat list, precompiled once per schema.
+
+    Nested objects are flattened depth-first, so that each object field is directly followed by its descendants and a document
+    can be walked with a single loop over the fields. Lists of objects have a nested plan for their items.
+
+    Attributes:
+        keys (tuple[str, ...]): The names of all of the root object's properties in schema order, including ignored properties.
+        ignores_keys (bool): Whether any of the root object's properties are ignored and excluded from the plan.
+        fields (list[SchemaField]): The fields of the object and its nested objects, depth-first.
+    """
+
+    def __init__(
+        self,
+        keys: tuple[str, ...],
+        ignores_keys: bool,
+        fields: list[SchemaField]
+    ):
+        """
+        Initializes a new instance of the SchemaPlan class.
+
+        Args:
+            keys: The names of all of the root object's properties in schema order, including ignored properties.
+            ignores_keys: Whether any of the root object's properties are ignored and excluded from the plan.
+            fields: The fields of the object and its nested objects, depth-first.
+        """
+
+        self.keys = keys
+        self.ignores_keys = ignores_keys
+        self.fields = fields
+
+
+def _resolve_schema(schema: dict, defs: dict, refs: tuple[str, ...]) -> tuple[dict, tuple[str, ...]]:
+    while True:
+        if '$ref' in schema:
+            ref = schema['$ref']
+            if ref in refs:
+                # Recursive schemas are treated as primitive values
+                return {}, refs
+            refs = refs + (ref,)
+            schema = defs.get(ref.split('/')[-1], {})
+            continue
+
+        variants = schema.get('anyOf') or schema.get('oneOf') or schema.get('allOf')
+        if variants is not None:
+            variants = [variant for variant in variants if variant.get('type') != 'null']
+            if len(variants) != 1:
+                return {}, refs
+            schema = variants[0]
+            continue
+
+        return schema, refs
+
+
+def _compile_object(
+    schema: dict,
+    defs: dict,
+    refs: tuple[str, ...],
+    ignore_keys: frozenset[str],
+    path: tuple[str, ...],
+    parent: int,
+    fields: list[SchemaField]
+):
+    for key, property_schema in schema.get('properties', {}).items():
+        if key in ignore_keys:
+            continue
+
+        property_schema, property_refs = _resolve_schema(property_schema, defs, refs)
+        field_path = path + (key,)
+        index = len(fields)
+
+        if property_schema.get('type') == 'object' and 'properties' in property_schema:
+            keys = tuple(property_schema['properties'])
+            field = SchemaField(key, field_path, parent, "object", keys, not ignore_keys.isdisjoint(keys))
+            fields.append(field)
+            _compile_object(property_schema, defs, property_refs, ignore_keys, field_path, index, fields)
+            field.descendants = len(fields) - index - 1
+        elif property_schema.get('type') == 'array':
+            item_schema, item_refs = _resolve_schema(property_schema.get('items', {}), defs, property_refs)
+            items = None
+            if item_schema.get('type') == 'object' and 'properties' in item_schema:
+                items = _compile_plan(item_schema, defs, item_refs, ignore_keys)
+            fields.append(SchemaField(key, field_path, parent, "list", items=items))
+        else:
+            fields.append(SchemaField(key, field_path, parent, "value"))
+
+
+def _compile_plan(schema: dict, defs: dict, refs: tuple[str, ...], ignore_keys: frozenset[str]) -> SchemaPlan:
+    fields = []
+    _compile_object(schema, defs, refs, ignore_keys, (), -1, fields)
+    keys = tuple(schema.get('properties', {}))
+    return SchemaPlan(keys, not ignore_keys.isdisjoint(keys), fields)
+
+
+def compile_schema_plan(schema: dict, ignore_keys: Optional[list[str]] = None) -> SchemaPlan:
+    """
+    Compiles the flat field plan of a JSON schema object.
+
+    Optional values (anyOf with null) are resolved to their non-null schema, and references are resolved from the schema's $defs.
+    Values with several non-null schemas, and recursive references, are planned as primitive values.
+
+    Args:
+        schema: The JSON schema of an object, e.g., from a Pydantic model's model_json_schema().
+        ignore_keys: The names of properties to exclude from the plan at any depth.
+
+    Returns:
+        SchemaPlan: The plan of the schema's fields.
+    """
+
+    defs = schema.get('$defs', {})
+    schema, refs = _resolve_schema(schema, defs, ())
+    return _compile_plan(schema, defs, refs, frozenset(ignore_keys or []))
+
+
+@lru_cache(maxsize=None)
+def _get_schema_plan(model: type[BaseModel], ignore_keys: tuple[str, ...]) -> SchemaPlan:
+    return compile_schema_plan(model.model_json_schema(), list(ignore_keys))
+
+
+def get_schema_plan(model: type[BaseModel], ignore_keys: Optional[list[str]] = None) -> SchemaPlan:
+    """
+    Gets the flat field plan of a Pydantic model, compiling it from the model's JSON schema on first use.
+
+    Args:
+        model: The Pydantic model, e.g., Invoice.
+        ignore_keys: The names of fields to exclude from the plan at any depth.
+
+    Returns:
+        SchemaPlan: The cached plan of the model's fields.
+    """
+
+    return _get_schema_plan(model, tuple(sorted(ignore_keys or [])))
@@ -10,8 +10,14 @@ class Stopwatch:
         is_running (bool): A flag indicating whether the stopwatch is running
     """
 
-    elapsed = 0
-    is_running = False
+    def __init__(self):
+        """
+        Initializes a new instance of the Stopwatch class, stopped with no elapsed time.
+        """
+
+        self.elapsed = 0
+        self.is_running = False
+        self.start_time = None
 
     def __enter__(self):
         """
@@ -1,6 +1,8 @@
 import os
 import json
 from samples.utils.custom_json_encoder import CustomJsonEncoder
+from samples.utils.json_utils import dumps_json
+from samples.utils.profiling import profiled
 
 
 def create_directory(dir: str, clear_if_not_empty: bool = False) -> str:
@@ -15,10 +17,17 @@ def create_directory(dir: str, clear_if_not_empty: bool = False) -> str:
     return dir
 
 
-def create_json_file(fpath: str, data: any, indent: int = 4) -> None:
+@profiled("serialization")
+def create_json_file(fpath: str, data: any, indent: int = 4, compact: bool = False) -> None:
     if not os.path.exists(os.path.dirname(fpath)):
         create_directory(os.path.dirname(fpath))
 
+    if compact:
+        # Large results, e.g., confidence evaluations with matching lines, serialize much faster without indentation
+        with open(fpath, 'wb') as f:
+            f.write(dumps_json(data))
+        return
+
     with open(fpath, 'w') as f:
         json.dump(data, f, indent=indent, cls=CustomJsonEncoder)
 
@@ -0,0 +1,71 @@
+import json
+import re
+from functools import lru_cache
+from typing import TypeVar
+from pydantic import TypeAdapter
+
+T = TypeVar('T')
+
+# The opening and closing fences of a JSON Markdown code block, removed wherever they appear in a response
+_CODE_FENCE = re.compile(r'```(?:json)?')
+
+
+@lru_cache(maxsize=None)
+def get_prompt_schema(output_type: type) -> str:
+    """
+    Gets the JSON schema of a Pydantic model or type as compact JSON text to embed in an extraction prompt, generating it on first use.
+
+    Args:
+        output_type: The Pydantic model, e.g., Invoice, or any type supported by a TypeAdapter, e.g., list[Invoice].
+
+    Returns:
+        str: The cached JSON schema, as serialized with json.dumps.
+    """
+
+    return json.dumps(get_type_adapter(output_type).json_schema())
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(output_type: type) -> TypeAdapter:
+    """
+    Gets the TypeAdapter of a Pydantic model or type, building its validator on first use.
+
+    Args:
+        output_type: The Pydantic model, e.g., Invoice, or any type supported by a TypeAdapter, e.g., list[Invoice].
+
+    Returns:
+        TypeAdapter: The cached TypeAdapter.
+    """
+
+    return TypeAdapter(output_type)
+
+
+def strip_code_fences(content: str) -> str:
+    """
+    Removes any JSON Markdown code block fences from a model's response in one pass, e.g., for models without structured outputs.
+
+    Args:
+        content: The content of the response.
+
+    Returns:
+        str: The content without code block fences and surrounding whitespace.
+    """
+
+    if '```' in content:
+        content = _CODE_FENCE.sub('', content)
+    return content.strip()
+
+
+def parse_json_response(content: str, output_type: type[T]) -> T:
+    """
+    Parses the JSON content of a model's response into a Pydantic model or type, validating the JSON text directly without an intermediate dictionary.
+
+    Args:
+        content: The content of the response, optionally in a JSON Markdown code block.
+        output_type: The Pydantic model, e.g., Invoice, or any type supported by a TypeAdapter, e.g., list[Invoice].
+
+    Returns:
+        T: The validated response.
+    """
+
+    return get_type_adapter(output_type).validate_json(strip_code_fences(content))
@@ -0,0 +1,431 @@
+import contextvars
+import functools
+import inspect
+import os
+import random
+import time
+from typing import Callable, Optional
+
+from samples.utils.json_utils import dumps_json
+
+# Spans are timed with the monotonic performance counter, and converted to wall clock time on export
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """
+    A class representing a timed operation in a trace, nested in the span that was current when it started.
+
+    Attributes:
+        name (str): The name of the operation.
+        trace_id (str): The 32 character hex id of the trace the span belongs to.
+        span_id (str): The 16 character hex id of the span.
+        parent_id (Optional[str]): The id of the parent span, or None for the root span of a trace.
+        path (tuple[str, ...]): The names of the spans from the root span to the span.
+        attributes (dict[str, any]): The attributes of the operation, e.g., the number of pages, tokens, or bytes.
+        start_ns (int): The performance counter at the start of the span, in nanoseconds.
+        end_ns (Optional[int]): The performance counter at the end of the span, in nanoseconds, or None while the span is running.
+        error (Optional[str]): The exception raised in the span, if any.
+    """
+
+    def __init__(
+        self,
+        tracer: 'Tracer',
+        name: str,
+        parent: Optional['Span'],
+        attributes: dict[str, any]
+    ):
+        """
+        Initializes a new instance of the Span class.
+
+        Args:
+            tracer: The tracer the span is recorded to when it ends.
+            name: The name of the operation.
+            parent: The parent span, or None to start a new trace.
+            attributes: The initial attributes of the operation.
+        """
+
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.path = parent.path + (name,) if parent is not None else (name,)
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._tracer = tracer
+        self._token: Optional[contextvars.Token] = None
+
+    @property
+    def duration(self) -> float:
+        """
+        Gets the duration of the span in seconds, up to now if the span is still running.
+
+        Returns:
+            float: The duration in seconds.
+        """
+
+        end_ns = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end_ns - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: any):
+        """
+        Sets an attribute of the operation.
+
+        Args:
+            key: The name of the attribute, e.g., 'pages'.
+            value: The value of the attribute.
+        """
+
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: any):
+        """
+        Sets several attributes of the operation.
+
+        Args:
+            attributes: The attributes to set.
+        """
+
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> 'Span':
+        self._token = _current_span.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end_ns = time.perf_counter_ns()
+        if exc_value is not None:
+            self.error = repr(exc_value)
+        _current_span.reset(self._token)
+        self._tracer._spans.append(self)
+
+    def to_dict(self) -> dict:
+        """
+        Converts the Span object to a dictionary.
+
+        Returns:
+            dict: The Span object as a dictionary.
+        """
+
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration': self.duration,
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+
+class _NoopSpan:
+    # Returned by a disabled tracer, so that instrumented code costs one attribute check per span
+    name = None
+    attributes = {}
+    duration = 0.0
+    error = None
+
+    def set_attribute(self, key: str, value: any):
+        pass
+
+    def set_attributes(self, **attributes: any):
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    A class representing a collector of nested spans, e.g., the stages of processing many documents concurrently.
+
+    The current span is tracked in a context variable, so spans started in asyncio tasks are nested in the span that was current
+    when the task was created, and spans in other threads are nested when the function is wrapped with bind_context.
+    When the tracer is disabled, span returns a shared no-op span and nothing is recorded.
+
+    Attributes:
+        service_name (str): The name of the service in exported traces.
+        enabled (bool): Whether spans are recorded.
+    """
+
+    def __init__(
+        self,
+        service_name: str = "samples",
+        enabled: bool = True
+    ):
+        """
+        Initializes a new instance of the Tracer class.
+
+        Args:
+            service_name: The name of the service in exported traces.
+            enabled: Whether spans are recorded.
+        """
+
+        self.service_name = service_name
+        self.enabled = enabled
+        self._spans: list[Span] = []
+
+    @property
+    def spans(self) -> list[Span]:
+        """
+        Gets the finished spans, in the order they ended.
+
+        Returns:
+            list[Span]: The finished spans.
+        """
+
+        return list(self._spans)
+
+    def span(self, name: str, **attributes: any) -> Span:
+        """
+        Creates a span to time an operation in a with block, nested in the current span.
+
+        Args:
+            name: The name of the operation, e.g., 'document_intelligence'.
+            attributes: The initial attributes of the operation.
+
+        Returns:
+            Span: The span, or a no-op span if the tracer is disabled.
+        """
+
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, _current_span.get(), attributes)
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """
+        Creates a decorator that runs each call of a function or coroutine function in a span.
+
+        Args:
+            name: The name of the span, defaulting to the function's qualified name.
+
+        Returns:
+            Callable: The decorator.
+        """
+
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+
+        return decorator
+
+    def clear(self):
+        """
+        Removes the finished spans.
+        """
+
+        self._spans = []
+
+    def summarize(self) -> dict[str, dict]:
+        """
+        Aggregates the finished spans by their path from the root span, like the frames of a flamegraph.
+
+        Self time is the duration of a span minus the duration of its children. Children that run concurrently can add up to more than
+        their parent, in which case the self time is zero.
+
+        Returns:
+            dict[str, dict]: The 'count', 'total', 'mean', 'max', and 'self' seconds of each path, e.g., 'extraction;openai', sorted by path.
+        """
+
+        spans = self.spans
+        child_time = {}
+        for span in spans:
+            if span.parent_id is not None:
+                child_time[span.parent_id] = child_time.get(span.parent_id, 0.0) + span.duration
+
+        summary = {}
+        for span in spans:
+            duration = span.duration
+            stats = summary.setdefault(';'.join(span.path), {'count': 0, 'total': 0.0, 'max': 0.0, 'self': 0.0})
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+            stats['self'] += max(duration - child_time.get(span.span_id, 0.0), 0.0)
+
+        for stats in summary.values():
+            stats['mean'] = stats['total'] / stats['count']
+        return dict(sorted(summary.items()))
+
+    def to_folded(self) -> str:
+        """
+        Formats the self time of each span path in the folded stack format of flamegraph tools, e.g., flamegraph.pl or speedscope.
+
+        Returns:
+            str: One 'path;of;spans microseconds' line per path.
+        """
+
+        return '\n'.join(
+            f"{path} {round(stats['self'] * 1e6)}" for path, stats in self.summarize().items())
+
+    def format_summary(self) -> str:
+        """
+        Formats the summary of the finished spans as an indented tree.
+
+        Returns:
+            str: One line per span path with its count, total, mean, and self time.
+        """
+
+        lines = [f"{'span':<48} {'count':>7} {'total (s)':>11} {'mean (s)':>10} {'self (s)':>10}"]
+        for path, stats in self.summarize().items():
+            names = path.split(';')
+            label = '  ' * (len(names) - 1) + names[-1]
+            lines.append(
+                f"{label:<48} {stats['count']:>7} {stats['total']:>11.3f} {stats['mean']:>10.3f} {stats['self']:>10.3f}")
+        return '\n'.join(lines)
+
+    def to_otlp_json(self) -> dict:
+        """
+        Converts the finished spans to the OpenTelemetry protocol (OTLP) JSON format, e.g., for an OTLP/HTTP collector or Jaeger.
+
+        Returns:
+            dict: The spans as an OTLP 'resourceSpans' export request.
+        """
+
+        return {
+            'resourceSpans': [{
+                'resource': {
+                    'attributes': [_to_otlp_attribute('service.name', self.service_name)]
+                },
+                'scopeSpans': [{
+                    'scope': {'name': __name__},
+                    'spans': [_to_otlp_span(span) for span in self.spans]
+                }]
+            }]
+        }
+
+    def export_otlp_json(self, fpath: str):
+        """
+        Writes the finished spans to a file in the OpenTelemetry protocol (OTLP) JSON format.
+
+        Args:
+            fpath: The path of the JSON file to write.
+        """
+
+        directory = os.path.dirname(fpath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(fpath, 'wb') as f:
+            f.write(dumps_json(self.to_otlp_json()))
+
+    def dump(self, output_dir: str) -> str:
+        """
+        Writes the finished spans to a directory, e.g., next to the outputs of a batch run.
+
+        - 'spans.otlp.json': The spans in the OpenTelemetry protocol (OTLP) JSON format, e.g., for an OTLP/HTTP collector or Jaeger.
+        - 'spans.folded': The self time of each span path in the folded stack format of flamegraph tools, e.g., flamegraph.pl or speedscope.
+        - 'spans_summary.txt': The count, total, mean, and self time of each span path as an indented tree.
+
+        Args:
+            output_dir: The directory to write the spans to.
+
+        Returns:
+            str: The directory the spans were written to.
+        """
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.export_otlp_json(os.path.join(output_dir, 'spans.otlp.json'))
+
+        for fname, text in (('spans.folded', self.to_folded()), ('spans_summary.txt', self.format_summary())):
+            with open(os.path.join(output_dir, fname), 'w') as f:
+                f.write(text + '\n')
+
+        return output_dir
+
+
+def _to_otlp_value(value: any) -> dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [_to_otlp_value(item) for item in value]}}
+    return {'stringValue': str(value)}
+
+
+def _to_otlp_attribute(key: str, value: any) -> dict:
+    return {'key': key, 'value': _to_otlp_value(value)}
+
+
+def _to_otlp_span(span: Span) -> dict:
+    otlp_span = {
+        'traceId': span.trace_id,
+        'spanId': span.span_id,
+        'name': span.name,
+        'kind': 1,
+        'startTimeUnixNano': str(span.start_ns + _EPOCH_OFFSET_NS),
+        'endTimeUnixNano': str(span.end_ns + _EPOCH_OFFSET_NS),
+        'attributes': [_to_otlp_attribute(key, value) for key, value in span.attributes.items()],
+        # Status codes are 1 for ok and 2 for error
+        'status': {'code': 2, 'message': span.error} if span.error is not None else {'code': 1}
+    }
+    if span.parent_id is not None:
+        otlp_span['parentSpanId'] = span.parent_id
+    return otlp_span
+
+
+def bind_context(func: Callable) -> Callable:
+    """
+    Binds a function to a copy of the current context, so that spans it starts in another thread, e.g., with loop.run_in_executor,
+    are nested in the current span.
+
+    Args:
+        func: The function to bind.
+
+    Returns:
+        Callable: The function, run in the copied context.
+    """
+
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+def get_current_span() -> Optional[Span]:
+    """
+    Gets the span that is current in this thread or asyncio task.
+
+    Returns:
+        Optional[Span]: The current span, or None outside of any span.
+    """
+
+    return _current_span.get()
+
+
+_default_tracer = Tracer(enabled=os.environ.get('SAMPLES_TRACING', '').lower() in ('1', 'true'))
+
+
+def get_tracer() -> Tracer:
+    """
+    Gets the default tracer, which is enabled when the SAMPLES_TRACING environment variable is '1' or 'true'.
+
+    Returns:
+        Tracer: The default tracer.
+    """
+
+    return _default_tracer
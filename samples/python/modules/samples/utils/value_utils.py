@@ -1,4 +1,54 @@
-def flatten_dict(data, parent_key='', sep='_'):
+from typing import Iterator, Union
+
+
+def iter_flatten_dict(
+    data: dict,
+    parent_key: Union[str, tuple] = '',
+    sep: str = '_',
+    tuple_keys: bool = False
+) -> Iterator[tuple[Union[str, tuple], any]]:
+    """
+    Iterate over the flattened keys and values of a nested dictionary, depth-first and without recursion.
+
+    Args:
+        data: The dictionary to flatten.
+        parent_key: The parent key, prefixed to every key.
+        sep: The separator to use between keys. List indices are always separated by '_'.
+        tuple_keys: Whether to yield each key as a tuple of the dictionary keys and list indices on its path, e.g., ('items', 0, 'total'),
+            instead of a string.
+
+    Returns:
+        Iterator[tuple[Union[str, tuple], any]]: The flattened key and value of each leaf value.
+    """
+
+    if tuple_keys:
+        parent_key = parent_key or ()
+
+    # Each level holds the key of its parent, an iterator over its entries, and whether it is a list
+    stack = [(parent_key, iter(data.items()), False)]
+    while stack:
+        prefix, entries, is_list = stack[-1]
+        for k, v in entries:
+            if tuple_keys:
+                new_key = prefix + (k,)
+            elif is_list:
+                new_key = f"{prefix}_{k}"
+            else:
+                new_key = f"{prefix}{sep}{k}" if prefix else k
+
+            if isinstance(v, dict):
+                stack.append((new_key, iter(v.items()), False))
+                break
+            elif isinstance(v, list):
+                stack.append((new_key, enumerate(v), True))
+                break
+            else:
+                yield new_key, v
+        else:
+            stack.pop()
+
+
+def flatten_dict(data, parent_key='', sep='_', tuple_keys=False):
     """
     Flatten a nested dictionary.
 
@@ -6,23 +56,67 @@ def flatten_dict(data, parent_key='', sep='_'):
         data: The dictionary to flatten.
         parent_key: The parent key.
         sep: The separator to use between keys.
+        tuple_keys: Whether to key the values by tuples of the dictionary keys and list indices on their path instead of strings.
 
     Returns:
         dict: The flattened dictionary with keys separated by the separator.
     """
 
-    items = []
-    for k, v in data.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-        elif isinstance(v, list):
-            for i, item in enumerate(v):
-                items.extend(flatten_dict(
-                    {f"{new_key}_{i}": item}, '', sep=sep).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
+    return dict(iter_flatten_dict(data, parent_key, sep, tuple_keys))
+
+
+def iter_flatten_fields(value: any, field: str = '', schema_field: str = '') -> Iterator[tuple[str, str, any]]:
+    """
+    Iterate over the leaf values of a nested value with their flatten_dict keys and their schema fields, which replace list indices with '*'.
+
+    Args:
+        value: The value to flatten, e.g., the extracted data of a document.
+        field: The parent key, prefixed to every key.
+        schema_field: The parent schema field, prefixed to every schema field.
+
+    Returns:
+        Iterator[tuple[str, str, any]]: The key, e.g., 'items_0_total', the schema field, e.g., 'items_*_total', and the value of each leaf value.
+    """
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from iter_flatten_fields(
+                item, f"{field}_{key}" if field else key, f"{schema_field}_{key}" if schema_field else key)
+    elif isinstance(value, list):
+        for idx, item in enumerate(value):
+            yield from iter_flatten_fields(item, f"{field}_{idx}", f"{schema_field}_*")
+    else:
+        yield field, schema_field, value
+
+
+def flatten_confidence(confidence: any, field: str = '') -> dict[str, float]:
+    """
+    Flatten a confidence evaluation into the confidence of each field, keyed as by flatten_dict.
+
+    Args:
+        confidence: The confidence evaluation, with a 'confidence' value for each field, e.g., from evaluate_confidence.
+        field: The parent key, prefixed to every key.
+
+    Returns:
+        dict[str, float]: The confidence of each field. Keys starting with '_', e.g., '_overall', are skipped.
+    """
+
+    values = {}
+    _flatten_confidence(confidence, field, values)
+    return values
+
+
+def _flatten_confidence(confidence: any, field: str, values: dict[str, float]):
+    if isinstance(confidence, dict):
+        if 'confidence' in confidence:
+            values[field] = confidence['confidence']
+            return
+        for key, item in confidence.items():
+            if not key.startswith('_'):
+                _flatten_confidence(item, f"{field}_{key}" if field else key, values)
+    elif isinstance(confidence, list):
+        for idx, item in enumerate(confidence):
+            _flatten_confidence(item, f"{field}_{idx}", values)
 
 
 def value_match(value_a: any, value_b: any) -> bool: